@@ -1,21 +1,32 @@
-﻿import sqlite3
-from typing import Dict, Any, List
+﻿from typing import Dict, Any, List
+import concurrent.futures
+import csv
+import hashlib
+import io
 import json
-from functools import lru_cache
 import logging
 
 import streamlit as st
 import atexit
 
 import math
+from types import MappingProxyType
+
+import pandas as pd
+
+from db.manager import DatabaseManager, TableConfig
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, filename='biosensor.log',
                     format='%(asctime)s - %(levelname)s - %(message)s')
 
 
-def get_connection():
-    return sqlite3.connect("memristive_biosensor.db")
+# Сколько ждать фоновую предзагрузку страницы (секунды), прежде чем
+# выполнить запрос заново
+PREFETCH_WAIT = 0.05
+
+# Порция лучших комбинаций (кнопка «Показать ещё» догружает следующую)
+BEST_COMBINATIONS_PAGE = 50
 
 
 def debug(message):
@@ -23,564 +34,405 @@ def debug(message):
     print(f"DEBUG: {message}")
 
 
-class DatabaseManager:
-    """Класс для управления операциями с базой данных SQLite для приложения BiosensorGUI."""
-    def __init__(self, db_name="memristive_biosensor.db"):
-        self.db_name = db_name
-        self.logger = logging.getLogger(__name__)  # Инициализируем логгер ПЕРВЫМ
-        
-        # self.conn = sqlite3.connect(db_name)
-        conn = get_connection()
-        conn.execute("PRAGMA foreign_keys = ON")  # Включение поддержки внешних ключей
-        conn.close()
-
-        self.create_tables()
-
-    def create_tables(self):
-        """Создание таблиц базы данных, если они не существуют."""
-        tables = [
-            """
-            CREATE TABLE IF NOT EXISTS Analytes (
-                TA_ID VARCHAR PRIMARY KEY,
-                TA_Name VARCHAR NOT NULL,
-                PH_Min REAL,
-                PH_Max REAL,
-                T_Max REAL,
-                ST REAL,
-                HL REAL,
-                PC REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS BioRecognitionLayers (
-                BRE_ID VARCHAR PRIMARY KEY,
-                BRE_Name VARCHAR NOT NULL,
-                PH_Min REAL,
-                PH_Max REAL,
-                T_Min REAL,
-                T_Max REAL,
-                SN REAL,
-                DR_Min REAL,
-                DR_Max REAL,
-                RP REAL,
-                TR REAL,
-                ST REAL,
-                LOD REAL,
-                HL REAL,
-                PC REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS ImmobilizationLayers (
-                IM_ID VARCHAR PRIMARY KEY,
-                IM_Name VARCHAR NOT NULL,
-                PH_Min REAL,
-                PH_Max REAL,
-                T_Min REAL,
-                T_Max REAL,
-                MP REAL,
-                Adh VARCHAR,
-                Sol VARCHAR,
-                K_IM REAL,
-                RP REAL,
-                TR REAL,
-                ST REAL,
-                HL REAL,
-                PC REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS MemristiveLayers (
-                MEM_ID VARCHAR PRIMARY KEY,
-                MEM_Name VARCHAR NOT NULL,
-                PH_Min REAL,
-                PH_Max REAL,
-                T_Min REAL,
-                T_Max REAL,
-                MP REAL,
-                SN REAL,
-                DR_Min REAL,
-                DR_Max REAL,
-                RP REAL,
-                TR REAL,
-                ST REAL,
-                LOD REAL,
-                HL REAL,
-                PC REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS SensorCombinations (
-                Combo_ID VARCHAR PRIMARY KEY,
-                TA_ID VARCHAR NOT NULL,
-                BRE_ID VARCHAR NOT NULL,
-                IM_ID VARCHAR NOT NULL,
-                MEM_ID VARCHAR NOT NULL,
-                SN_total REAL,
-                TR_total REAL,
-                ST_total REAL,
-                RP_total REAL,
-                LOD_total REAL,
-                DR_total VARCHAR,
-                HL_total REAL,
-                PC_total REAL,
-                Score REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (TA_ID) REFERENCES Analytes (TA_ID),
-                FOREIGN KEY (BRE_ID) REFERENCES BioRecognitionLayers (BRE_ID),
-                FOREIGN KEY (IM_ID) REFERENCES ImmobilizationLayers (IM_ID),
-                FOREIGN KEY (MEM_ID) REFERENCES MemristiveLayers (MEM_ID)
-            );
-            """
-        ]
-        try:
-            # Создаем новое соединение для текущего потока
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                for table in tables:
-                    cursor.execute(table)
-                conn.commit()
-                self.logger.info("Таблицы успешно созданы")
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка создания таблиц: {e}")
-    
-    """Управление БД - БЕЗ Streamlit вызовов"""
-    def insert_analyte(self, data: Dict[str, Any]) -> bool:
-        """Вставка или замена аналита (создаёт новое соединение для каждого вызова)."""
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT TA_ID FROM Analytes WHERE TA_ID = ?", (data['TA_ID'],))
-                if cursor.fetchone():
-                    return "DUPLICATE"  # Сигнал о дубликате
-
-                query = """
-                INSERT OR REPLACE INTO Analytes (TA_ID, TA_Name, PH_Min, PH_Max, T_Max, ST, HL, PC)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                cursor.execute(query, (
-                    data['TA_ID'], data['TA_Name'], data.get('PH_Min'),
-                    data.get('PH_Max'), data.get('T_Max'), data.get('ST'),
-                    data.get('HL'), data.get('PC')
-                ))
-                conn.commit()
-                self.clear_cache()
-                self.logger.info(f"Аналит {data['TA_ID']} успешно вставлен")
-                return True
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка вставки аналита: {e}")
-            return False
-    
-    """Управление БД - БЕЗ Streamlit вызовов"""
-    def insert_bio_recognition_layer(self, data: Dict[str, Any]) -> bool:
-        """Вставка или замена биораспознающего слоя (создаёт новое соединение для каждого вызова)."""
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT BRE_ID FROM BioRecognitionLayers WHERE BRE_ID = ?", (data['BRE_ID'],))
-                if cursor.fetchone():
-                    return "DUPLICATE"
-
-                query = """
-                INSERT OR REPLACE INTO BioRecognitionLayers 
-                (BRE_ID, BRE_Name, PH_Min, PH_Max, T_Min, T_Max, SN, DR_Min, DR_Max, RP, TR, ST, LOD, HL, PC)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                cursor.execute(query, (
-                    data['BRE_ID'], data['BRE_Name'], data.get('PH_Min'), data.get('PH_Max'),
-                    data.get('T_Min'), data.get('T_Max'), data.get('SN'), data.get('DR_Min'),
-                    data.get('DR_Max'), data.get('RP'), data.get('TR'), data.get('ST'),
-                    data.get('LOD'), data.get('HL'), data.get('PC')
-                ))
-                conn.commit()
-                self.clear_cache()
-                self.logger.info(f"Биослой {data['BRE_ID']} успешно вставлен")
-                return True
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка вставки биослоя: {e}")
-            return False
-
-    """Управление БД - БЕЗ Streamlit вызовов"""
-    def insert_immobilization_layer(self, data: Dict[str, Any]) -> bool:
-        """Вставка или замена иммобилизационного слоя (создаёт новое соединение для каждого вызова)."""
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT IM_ID FROM ImmobilizationLayers WHERE IM_ID = ?", (data['IM_ID'],))
-                if cursor.fetchone():
-                    return "DUPLICATE"
-
-                query = """
-                INSERT OR REPLACE INTO ImmobilizationLayers 
-                (IM_ID, IM_Name, PH_Min, PH_Max, T_Min, T_Max, MP, Adh, Sol, K_IM, RP, TR, ST, HL, PC)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                cursor.execute(query, (
-                    data['IM_ID'], data['IM_Name'], data.get('PH_Min'), data.get('PH_Max'),
-                    data.get('T_Min'), data.get('T_Max'), data.get('MP'), data.get('Adh'),
-                    data.get('Sol'), data.get('K_IM'), data.get('RP'), data.get('TR'),
-                    data.get('ST'), data.get('HL'), data.get('PC')
-                ))
-                conn.commit()
-                self.clear_cache()
-                self.logger.info(f"Иммобилизационный слой {data['IM_ID']} успешно вставлен")
-                return True
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка вставки иммобилизационного слоя: {e}")
-            return False
-
-    def insert_memristive_layer(self, data: Dict[str, Any]) -> bool:
-        """Вставка или замена мемристивного слоя (создаёт новое соединение для каждого вызова)."""
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT MEM_ID FROM MemristiveLayers WHERE MEM_ID = ?", (data['MEM_ID'],))
-                if cursor.fetchone():
-                    return "DUPLICATE"
-
-                query = """
-                INSERT OR REPLACE INTO MemristiveLayers 
-                (MEM_ID, MEM_Name, PH_Min, PH_Max, T_Min, T_Max, MP, SN, DR_Min, DR_Max, RP, TR, ST, LOD, HL, PC)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                cursor.execute(query, (
-                    data['MEM_ID'], data['MEM_Name'], data.get('PH_Min'), data.get('PH_Max'),
-                    data.get('T_Min'), data.get('T_Max'), data.get('MP'), data.get('SN'),
-                    data.get('DR_Min'), data.get('DR_Max'), data.get('RP'), data.get('TR'),
-                    data.get('ST'), data.get('LOD'), data.get('HL'), data.get('PC')
-                ))
-                conn.commit()
-                self.clear_cache()
-                self.logger.info(f"Мемристивный слой {data['MEM_ID']} успешно вставлен")
-                return True
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка вставки мемристивного слоя: {e}")
-            return False
-
-    def insert_sensor_combination(self, data: Dict[str, Any]) -> bool:
-        """Вставка или замена комбинации сенсора (создаёт новое соединение для каждого вызова)."""
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT Combo_ID FROM SensorCombinations WHERE Combo_ID = ?", (data['Combo_ID'],))
-                if cursor.fetchone():
-                    return "DUPLICATE"
-
-                query = """
-                INSERT OR REPLACE INTO SensorCombinations 
-                (Combo_ID, TA_ID, BRE_ID, IM_ID, MEM_ID, SN_total, TR_total, ST_total, RP_total, LOD_total, DR_total, HL_total, PC_total, Score, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                cursor.execute(query, (
-                    data['Combo_ID'], data.get('TA_ID'), data.get('BRE_ID'), data.get('IM_ID'),
-                    data.get('MEM_ID'), data.get('SN_total'), data.get('TR_total'), data.get('ST_total'),
-                    data.get('RP_total'), data.get('LOD_total'), data.get('DR_total'), data.get('HL_total'),
-                    data.get('PC_total'), data.get('Score'), data.get('created_at')
-                ))
-                conn.commit()
-                self.clear_cache()
-                self.logger.info(f"Комбинация сенсора {data['Combo_ID']} успешно вставлена")
-                return True
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка вставки комбинации сенсора: {e}")
-            return False
-    
-    @lru_cache(maxsize=32)
-    def list_all_analytes(self) -> List[Dict[str, Any]]:
-        """Получение всех аналитов с выбором конкретных столбцов."""
-        query = """
-        SELECT TA_ID, TA_Name, PH_Min, PH_Max, T_Max, ST
-        FROM Analytes
-        ORDER BY TA_Name
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} аналитов")
-                return results
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения аналитов: {e}")
-            return []
-
-    @lru_cache(maxsize=32)
-    def list_all_bio_recognition_layers(self) -> List[Dict[str, Any]]:
-        """Получение всех биораспознающих слоев."""
-        query = """
-        SELECT BRE_ID, BRE_Name, PH_Min, PH_Max, T_Min, T_Max, SN
-        FROM BioRecognitionLayers
-        ORDER BY BRE_Name
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} биослоев")
-                return results
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения биослоев: {e}")
-            return []
-
-    @lru_cache(maxsize=32)
-    def list_all_immobilization_layers(self) -> List[Dict[str, Any]]:
-        """Получение всех иммобилизационных слоев."""
-        query = """
-        SELECT IM_ID, IM_Name, PH_Min, PH_Max, T_Min, T_Max, MP
-        FROM ImmobilizationLayers
-        ORDER BY IM_Name
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} иммобилизационных слоев")
-                return results
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения иммобилизационных слоев: {e}")
-            return []
-
-    @lru_cache(maxsize=32)
-    def list_all_memristive_layers(self) -> List[Dict[str, Any]]:
-        """Получение всех мемристивных слоев."""
-        query = """
-        SELECT MEM_ID, MEM_Name, PH_Min, PH_Max, T_Min, T_Max, SN
-        FROM MemristiveLayers
-        ORDER BY MEM_Name
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} мемристивных слоев")
-                return results
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения мемристивных слоев: {e}")
-            return []
-        
-    @lru_cache(maxsize=32)
-    def list_all_sensor_combinations(self) -> List[Dict[str, Any]]:
-        """Получение всех комбинаций сенсоров."""
-        query = """
-        SELECT Combo_ID, TA_ID, BRE_ID, IM_ID, MEM_ID, Score
-        FROM SensorCombinations
-        ORDER BY Combo_ID
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} комбинаций сенсоров")
-                return results
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения комбинаций сенсоров: {e}")
-            return []
-
-    def list_all_analytes_paginated(self, limit: int, offset: int) -> List[Dict[str, Any]]:
-        """Получение аналитов с пагинацией."""
-        query = """
-        SELECT TA_ID, TA_Name, PH_Min, PH_Max, T_Max, ST
-        FROM Analytes
-        ORDER BY TA_Name
-        LIMIT ? OFFSET ?
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (limit, offset))
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} аналитов (страница)")
-                return results
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения аналитов с пагинацией: {e}")
-            return []
-
-    def list_all_bio_recognition_layers_paginated(self, limit: int, offset: int) -> List[Dict[str, Any]]:
-        """Получение биослоев с пагинацией."""
-        query = """
-        SELECT BRE_ID, BRE_Name, PH_Min, PH_Max, T_Min, T_Max, SN
-        FROM BioRecognitionLayers
-        ORDER BY BRE_Name
-        LIMIT ? OFFSET ?
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (limit, offset))
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} биослоев (страница)")
-                return results
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения биослоев с пагинацией: {e}")
-            return []
-
-    def list_all_immobilization_layers_paginated(self, limit: int, offset: int) -> List[Dict[str, Any]]:
-        """Получение иммобилизационных слоев с пагинацией."""
-        query = """
-        SELECT IM_ID, IM_Name, PH_Min, PH_Max, T_Min, T_Max, MP
-        FROM ImmobilizationLayers
-        ORDER BY IM_Name
-        LIMIT ? OFFSET ?
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (limit, offset))
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} иммобилизационных слоев (страница)")
-                return results
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения иммобилизационных слоев с пагинацией: {e}")
-            return []
-
-    def list_all_memristive_layers_paginated(self, limit: int, offset: int) -> List[Dict[str, Any]]:
-        """Получение мемристивных слоев с пагинацией."""
-        query = """
-        SELECT MEM_ID, MEM_Name, PH_Min, PH_Max, T_Min, T_Max, SN
-        FROM MemristiveLayers
-        ORDER BY MEM_Name
-        LIMIT ? OFFSET ?
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (limit, offset))
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} мемристивных слоев (страница)")
-                return results
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения мемристивных слоев с пагинацией: {e}")
-            return []
-    
-    def list_all_sensor_combinations_paginated(self, limit: int, offset: int) -> List[Dict[str, Any]]:
-        """Получение всех комбинаций сенсоров."""
-        query = """
-        SELECT Combo_ID, TA_ID, BRE_ID, IM_ID, MEM_ID, Score
-        FROM SensorCombinations
-        ORDER BY Combo_ID
-        LIMIT ? OFFSET ?
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (limit, offset))
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} комбинаций сенсоров (страница)")
-                return results
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения комбинаций сенсоров с пагинацией: {e}")
-            return []
-
-    def get_analyte_by_id(self, ta_id: str) -> Dict[str, Any]:
-        """Получение аналита по ID."""
-        query = """
-        SELECT TA_ID, TA_Name, PH_Min, PH_Max, T_Max, ST, HL, PC
-        FROM Analytes
-        WHERE TA_ID = ?
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (ta_id,))
-                result = cursor.fetchone()
-                if result:
-                    columns = [description[0] for description in cursor.description]
-                    self.logger.info(f"Получен аналит {ta_id}")
-                    return dict(zip(columns, result))
-                return None
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения аналита {ta_id}: {e}")
-            return None
-
-    def get_bio_recognition_layer_by_id(self, bre_id: str) -> Dict[str, Any]:
-        """Получение биораспознающего слоя по ID."""
-        query = """
-        SELECT BRE_ID, BRE_Name, PH_Min, PH_Max, T_Min, T_Max, SN, DR_Min, DR_Max, RP, TR, ST, LOD, HL, PC
-        FROM BioRecognitionLayers
-        WHERE BRE_ID = ?
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (bre_id,))
-                result = cursor.fetchone()
-                if result:
-                    columns = [description[0] for description in cursor.description]
-                    self.logger.info(f"Получен биослой {bre_id}")
-                    return dict(zip(columns, result))
-                return None
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения биослоя {bre_id}: {e}")
-            return None
-
-    def get_immobilization_layer_by_id(self, im_id: str) -> Dict[str, Any]:
-        """Получение иммобилизационного слоя по ID."""
-        query = """
-        SELECT IM_ID, IM_Name, PH_Min, PH_Max, T_Min, T_Max, MP, Adh, Sol, K_IM, RP, TR, ST, HL, PC
-        FROM ImmobilizationLayers
-        WHERE IM_ID = ?
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (im_id,))
-                result = cursor.fetchone()
-                if result:
-                    columns = [description[0] for description in cursor.description]
-                    self.logger.info(f"Получен иммобилизационный слой {im_id}")
-                    return dict(zip(columns, result))
-                return None
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения иммобилизационного слоя {im_id}: {e}")
-            return None
-
-    def get_memristive_layer_by_id(self, mem_id: str) -> Dict[str, Any]:
-        """Получение мемристивного слоя по ID."""
-        query = """
-        SELECT MEM_ID, MEM_Name, PH_Min, PH_Max, T_Min, T_Max, MP, SN, DR_Min, DR_Max, RP, TR, ST, LOD, HL, PC
-        FROM MemristiveLayers
-        WHERE MEM_ID = ?
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (mem_id,))
-                result = cursor.fetchone()
-                if result:
-                    columns = [description[0] for description in cursor.description]
-                    self.logger.info(f"Получен мемристивный слой {mem_id}")
-                    return dict(zip(columns, result))
-                return None
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения мемристивного слоя {mem_id}: {e}")
-            return None
-
-    def clear_cache(self):
-        """Очистка кэша результатов запросов."""
-        self.list_all_analytes.cache_clear()
-        self.list_all_bio_recognition_layers.cache_clear()
-        self.list_all_immobilization_layers.cache_clear()
-        self.list_all_memristive_layers.cache_clear()
-        self.list_all_sensor_combinations.cache_clear()
-        self.logger.info("Кэш очищен")
+# Слой БД (db/manager.py) не зависит от Streamlit; кэширование чтений
+# делается здесь, на стороне UI.
+@st.cache_resource
+def get_db_manager() -> DatabaseManager:
+    """Общий DatabaseManager процесса: соединения, кэш выражений и кэш
+    страниц SQLite переживают перезапуски скрипта Streamlit."""
+    return DatabaseManager()
+
+
+# Ключ кэшей чтений включает db_manager.cache_version(): после записи в БД
+# (в том числе другим соединением) прежние результаты просто не находятся,
+# проверка актуальности — одна PRAGMA вместо повторного запроса по TTL.
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_list_all(_db_manager: DatabaseManager, method_name: str, version) -> List[Dict[str, Any]]:
+    """Результат db_manager.list_all_*() для версии БД version.
+
+    _db_manager не хэшируется Streamlit (ведущее подчёркивание).
+    """
+    return getattr(_db_manager, method_name)()
+
+
+def cached_list_all(db_manager: DatabaseManager, method_name: str) -> List[Dict[str, Any]]:
+    """Результат db_manager.list_all_*() с кэшем между перезапусками скрипта."""
+    return _cached_list_all(db_manager, method_name, db_manager.cache_version())
+
+
+def _page_frame(rows) -> pd.DataFrame:
+    """DataFrame страницы из строк sqlite3.Row (столбцы — по первой строке)."""
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame.from_records([tuple(row) for row in rows], columns=rows[0].keys())
+
+
+# Только в памяти процесса: cache_version() строится из счётчиков менеджера,
+# которые после перезапуска начинаются заново, поэтому страница, сохранённая
+# на диск до записи, после перезапуска нашлась бы под тем же ключом.
+@st.cache_data(max_entries=512, show_spinner=False)
+def cached_page(_db_manager: DatabaseManager, method_name: str, cursor, page_size: int, version) -> pd.DataFrame:
+    """Страница db_manager.list_all_*_after() с кэшем по (метод, курсор, размер, версия БД).
+
+    Кэшируется готовый DataFrame: при листании назад и вперёд не строится
+    заново.
+    """
+    return _page_frame(getattr(_db_manager, method_name)(cursor, page_size, rows_as_dicts=False))
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_table_counts(_db_manager: DatabaseManager, version) -> Dict[str, int]:
+    """db_manager.count_all_rows() для версии БД version."""
+    return _db_manager.count_all_rows()
+
+
+# Кэши чтений UI: новый st.cache_data-кэш достаточно добавить сюда, чтобы
+# он сбрасывался после записи в БД вместе с остальными
+_READ_CACHES = (_cached_list_all, cached_page, cached_table_counts)
+
+
+def clear_read_caches() -> None:
+    """Сброс всех кэшей чтений UI и предзагруженной следующей страницы."""
+    for cache in _READ_CACHES:
+        cache.clear()
+    st.session_state.pop('prefetch_next', None)
+
+
+# Таблицы вкладки «База данных» и show_*:
+# тип данных -> (таблица, метод keyset-страницы, заголовок, текст для пустой таблицы)
+_DATABASE_TABLES = MappingProxyType({
+    'analytes': (
+        TableConfig.ANALYTES, "list_all_analytes_after", "📋 Аналиты",
+        "Нет записей аналитов для отображения.",
+    ),
+    'bio_layers': (
+        TableConfig.BIO_RECOGNITION, "list_all_bio_recognition_layers_after", "🔴 Биораспознающие слои",
+        "Нет записей биораспознающих слоев для отображения.",
+    ),
+    'immobilization_layers': (
+        TableConfig.IMMOBILIZATION, "list_all_immobilization_layers_after", "🟡 Иммобилизационные слои",
+        "Нет записей иммобилизационных слоев для отображения.",
+    ),
+    'memristive_layers': (
+        TableConfig.MEMRISTIVE, "list_all_memristive_layers_after", "🟣 Мемристивные слои",
+        "Нет записей мемристивных слоёв для отображения.",
+    ),
+})
+
+
+def range_input(label_min: str, label_max: str, key_prefix: str, min_value, max_value, help: str = ""):
+    """Пара полей «минимум/максимум» в две колонки; ключи {key_prefix}_min и {key_prefix}_max."""
+    col_min, col_max = st.columns(2)
+    with col_min:
+        low = st.number_input(
+            label_min, min_value=min_value, max_value=max_value, key=f"{key_prefix}_min", help=help
+        )
+    with col_max:
+        high = st.number_input(
+            label_max, min_value=min_value, max_value=max_value, key=f"{key_prefix}_max", help=help
+        )
+    return low, high
+
+
+# Значения session_state по умолчанию: задаются одним проходом в начале
+# каждого запуска скрипта, дальше разделы читают ключи напрямую.
+_SESSION_DEFAULTS = MappingProxyType({
+    'active_section': 'data_entry',  # 'data_entry', 'database', 'analysis', 'about'
+    'page_size': 50,
+    'current_page': 0,
+    'current_data_type': 'analytes',
+    'analysis_result': "Выберите тип анализа...",
+    'show_best_table': False,  # таблица лучших комбинаций под результатами анализа
+})
+
+
+# Поля разделов паспорта: (столбец БД, ключ session_state, значение по умолчанию).
+# По ним собираются данные для сохранения и заполняется форма при загрузке.
+_PASSPORT_FIELDS = MappingProxyType({
+    'analyte': (
+        ('TA_ID', 'analyte_ta_id', ''),
+        ('TA_Name', 'analyte_ta_name', ''),
+        ('PH_Min', 'analyte_ph_min', None),
+        ('PH_Max', 'analyte_ph_max', None),
+        ('T_Max', 'analyte_t_max', None),
+        ('ST', 'analyte_stability', None),
+        ('HL', 'analyte_half_life', None),
+        ('PC', 'analyte_power_consumption', None),
+    ),
+    'bio': (
+        ('BRE_ID', 'bio_bre_id', ''),
+        ('BRE_Name', 'bio_bre_name', ''),
+        ('PH_Min', 'bio_ph_min', None),
+        ('PH_Max', 'bio_ph_max', None),
+        ('T_Min', 'bio_t_min', None),
+        ('T_Max', 'bio_t_max', None),
+        ('SN', 'bio_sensitivity', None),
+        ('DR_Min', 'bio_dr_min', None),
+        ('DR_Max', 'bio_dr_max', None),
+        ('RP', 'bio_reproducibility', None),
+        ('TR', 'bio_response_time', None),
+        ('ST', 'bio_stability', None),
+        ('LOD', 'bio_lod', None),
+        ('HL', 'bio_durability', None),
+        ('PC', 'bio_power_consumption', None),
+    ),
+    'immob': (
+        ('IM_ID', 'immob_im_id', ''),
+        ('IM_Name', 'immob_im_name', ''),
+        ('PH_Min', 'immob_ph_min', None),
+        ('PH_Max', 'immob_ph_max', None),
+        ('T_Min', 'immob_t_min', None),
+        ('T_Max', 'immob_t_max', None),
+        ('MP', 'immob_young_modulus', None),
+        ('Adh', 'immob_adhesion', ''),
+        ('Sol', 'immob_solubility', ''),
+        ('K_IM', 'immob_loss_coefficient', None),
+        ('RP', 'immob_reproducibility', None),
+        ('TR', 'immob_response_time', None),
+        ('ST', 'immob_stability', None),
+        ('HL', 'immob_durability', None),
+        ('PC', 'immob_power_consumption', None),
+    ),
+    'mem': (
+        ('MEM_ID', 'mem_mem_id', ''),
+        ('MEM_Name', 'mem_mem_name', ''),
+        ('PH_Min', 'mem_ph_min', None),
+        ('PH_Max', 'mem_ph_max', None),
+        ('T_Min', 'mem_t_min', None),
+        ('T_Max', 'mem_t_max', None),
+        ('MP', 'mem_young_modulus', None),
+        ('SN', 'mem_sensitivity', None),
+        ('DR_Min', 'mem_dr_min', None),
+        ('DR_Max', 'mem_dr_max', None),
+        ('RP', 'mem_reproducibility', None),
+        ('TR', 'mem_response_time', None),
+        ('ST', 'mem_stability', None),
+        ('LOD', 'mem_lod', None),
+        ('HL', 'mem_durability', None),
+        ('PC', 'mem_power_consumption', None),
+    ),
+    'combo': (
+        ('Combo_ID', 'combo_id', ''),
+        ('TA_ID', 'combo_ta_id', ''),
+        ('BRE_ID', 'combo_bre_id', ''),
+        ('IM_ID', 'combo_im_id', ''),
+        ('MEM_ID', 'combo_mem_id', ''),
+        ('SN_total', 'combo_sn_total', None),
+        ('TR_total', 'combo_tr_total', None),
+        ('ST_total', 'combo_st_total', None),
+        ('RP_total', 'combo_rp_total', None),
+        ('LOD_total', 'combo_lod_total', None),
+        ('DR_total', 'combo_dr_total', ''),
+        ('HL_total', 'combo_hl_total', None),
+        ('PC_total', 'combo_pc_total', None),
+        ('Score', 'combo_score', None),
+        ('created_at', 'combo_created_at', None),
+    ),
+})
+
+
+# Ключи session_state полей ID (первое поле каждого раздела)
+_PASSPORT_ID_KEYS = tuple(fields[0][1] for fields in _PASSPORT_FIELDS.values())
+
+
+# Перезапись дубликата по разделу паспорта: (метод вставки db_manager, подпись)
+_OVERWRITE_TARGETS = MappingProxyType({
+    'analyte': ("insert_analyte", "Аналит"),
+    'bio': ("insert_bio_recognition_layer", "Биослой"),
+    'immob': ("insert_immobilization_layer", "Иммобилизационный слой"),
+    'mem': ("insert_memristive_layer", "Мемристивный слой"),
+    'combo': ("insert_sensor_combination", "Комбинация"),
+})
+
+
+# Загрузка слоя по типу: тип -> (метод db_manager, раздел _PASSPORT_FIELDS, столбец имени)
+_LOAD_DISPATCH = MappingProxyType({
+    "TA": ("get_analyte_by_id", 'analyte', 'TA_Name'),
+    "BRE": ("get_bio_recognition_layer_by_id", 'bio', 'BRE_Name'),
+    "IM": ("get_immobilization_layer_by_id", 'immob', 'IM_Name'),
+    "MEM": ("get_memristive_layer_by_id", 'mem', 'MEM_Name'),
+})
+
+
+def _content_hash(data: Dict[str, Any]) -> str:
+    """Отпечаток данных раздела паспорта (blake2b от JSON с сортировкой ключей)."""
+    return hashlib.blake2b(
+        json.dumps(data, sort_keys=True, default=str).encode(), digest_size=16
+    ).hexdigest()
+
+
+def _session_section(section: str) -> Dict[str, Any]:
+    """Данные раздела паспорта из st.session_state: {столбец БД: значение}."""
+    state = st.session_state
+    return {column: state.get(key, default) for column, key, default in _PASSPORT_FIELDS[section]}
+
+
+def _fill_session_section(section: str, data: Dict[str, Any]) -> None:
+    """Заполнение полей формы раздела паспорта записью из БД (одним update)."""
+    st.session_state.update(
+        {key: data.get(column, default) for column, key, default in _PASSPORT_FIELDS[section]}
+    )
+
+
+# Экспорт: ключ выбора -> таблица
+_EXPORT_TABLES = MappingProxyType({
+    "analytes": TableConfig.ANALYTES,
+    "bio_recognition": TableConfig.BIO_RECOGNITION,
+    "immobilization": TableConfig.IMMOBILIZATION,
+    "memristive": TableConfig.MEMRISTIVE,
+    "sensor_combinations": TableConfig.SENSOR_COMBINATIONS,
+})
+
+
+def _write_csv(db_manager: DatabaseManager, table_config: TableConfig, stream) -> None:
+    """CSV таблицы (UTF-8 с BOM) в бинарный поток stream порциями строк из БД."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    writer = csv.writer(text)
+    writer.writerow(table_config["select_cols"])
+    for batch in db_manager.iter_row_batches(table_config):
+        writer.writerows(batch)
+    text.detach()  # сбрасывает буфер, stream остаётся открытым
+
+
+def _write_json_rows(db_manager: DatabaseManager, table_config: TableConfig, text) -> None:
+    """JSON-массив записей таблицы в текстовый поток text, строка за строкой."""
+    columns = table_config["select_cols"]
+    separator = "\n"
+    text.write("[")
+    for batch in db_manager.iter_row_batches(table_config):
+        for row in batch:
+            text.write(separator)
+            text.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            separator = ",\n"
+    text.write("\n]")
+
+
+def _export_bytes(db_manager: DatabaseManager, table_config: TableConfig, fmt: str) -> bytes:
+    """Содержимое файла экспорта таблицы в формате fmt ("csv" или "json")."""
+    buf = io.BytesIO()
+    if fmt == "json":
+        text = io.TextIOWrapper(buf, encoding="utf-8")
+        _write_json_rows(db_manager, table_config, text)
+        text.detach()
+    else:
+        _write_csv(db_manager, table_config, buf)
+    return buf.getvalue()
+
+
+# Конфигурация полей формы и ограничения для валидации — константы модуля:
+# не пересобираются при каждом перезапуске скрипта Streamlit.
+_DEFAULT_CONFIG = MappingProxyType({
+    'analyte': [
+        {'label': 'ID аналита:', 'var_name': 'ta_id', 'hint': 'Например: TA001'},
+        {'label': 'Название:', 'var_name': 'ta_name', 'hint': 'Полное название аналита'},
+        {'label': 'pH диапазон:', 'type': 'range', 'min_var': 'ph_min', 'max_var': 'ph_max', 'hint': '2.0 — 10.0'},
+        {'label': 'Макс. температура (°C):', 'var_name': 't_max', 'hint': '0-180'},
+        {'label': 'Стабильность (дни):', 'var_name': 'stability', 'hint': '0-365'},
+        {'label': 'Период полураспада (ч):', 'var_name': 'half_life', 'hint': '0-8760'},
+        {'label': 'Энергопотребление (мВт):', 'var_name': 'power_consumption', 'hint': '0-1000'}
+    ],
+    'bio_recognition': [
+        {'label': 'ID биослоя:', 'var_name': 'bre_id', 'hint': 'Например: BRE001'},
+        {'label': 'Название:', 'var_name': 'bre_name', 'hint': 'Тип биослоя'},
+        {'label': 'pH диапазон:', 'type': 'range', 'min_var': 'ph_min', 'max_var': 'ph_max', 'hint': '2.0 — 10.0'},
+        {'label': 'Температурный диапазон (°C):', 'type': 'range', 'min_var': 't_min', 'max_var': 't_max', 'hint': '2 — 120'},
+        {'label': 'Диапазон измерений (пМ):', 'type': 'range', 'min_var': 'dr_min', 'max_var': 'dr_max', 'hint': '0.1 — 1*10^12'},
+        {'label': 'Чувствительность (мкА/(мкМ*см^2)):', 'var_name': 'sensitivity', 'hint': '0.01 — 1000'},
+        {'label': 'Воспроизводимость (%):', 'var_name': 'reproducibility', 'hint': '0-100'},
+        {'label': 'Время отклика (с):', 'var_name': 'response_time', 'hint': '0-3600'},
+        {'label': 'Стабильность (дни):', 'var_name': 'stability', 'hint': '0-365'},
+        {'label': 'Предел обнаружения (нМ):', 'var_name': 'lod', 'hint': '0-100000'},
+        {'label': 'Долговечность (ч):', 'var_name': 'durability', 'hint': '0-100000'},
+        {'label': 'Энергопотребление (мВт):', 'var_name': 'power_consumption', 'hint': '0-1000'}
+    ],
+    'immobilization': [
+        {'label': 'ID иммобилизации:', 'var_name': 'im_id', 'hint': 'Например: IM001'},
+        {'label': 'Название:', 'var_name': 'im_name', 'hint': 'Тип иммобилизации'},
+        {'label': 'pH диапазон:', 'type': 'range', 'min_var': 'ph_min', 'max_var': 'ph_max', 'hint': '2.0 — 10.0'},
+        {'label': 'Температурный диапазон (°C):', 'type': 'range', 'min_var': 't_min', 'max_var': 't_max', 'hint': '4 — 95'},
+        {'label': 'Модуль Юнга (ГПа):', 'var_name': 'young_modulus', 'hint': '0-1000'},
+        {'label': 'Адгезия (%):', 'var_name': 'adhesion', 'hint': 'Например: высокая'},
+        {'label': 'Растворимость (%):', 'var_name': 'solubility', 'hint': 'Например: средняя'},
+        {'label': 'Коэффициент потерь:', 'var_name': 'loss_coefficient', 'hint': '0-1'},
+        {'label': 'Воспроизводимость (%):', 'var_name': 'reproducibility', 'hint': '0-100'},
+        {'label': 'Время отклика (с):', 'var_name': 'response_time', 'hint': '0-3600'},
+        {'label': 'Стабильность (дни):', 'var_name': 'stability', 'hint': '0-365'},
+        {'label': 'Долговечность (ч):', 'var_name': 'durability', 'hint': '0-8760'},
+        {'label': 'Энергопотребление (мВт):', 'var_name': 'power_consumption', 'hint': '0-1000'}
+    ],
+    'memristive': [
+        {'label': 'ID мемристора:', 'var_name': 'mem_id', 'hint': 'Например: MEM001'},
+        {'label': 'Название:', 'var_name': 'mem_name', 'hint': 'Тип мемристора'},
+        {'label': 'pH диапазон:', 'type': 'range', 'min_var': 'ph_min', 'max_var': 'ph_max', 'hint': '2.0 — 10.0'},
+        {'label': 'Температурный диапазон (°C):', 'type': 'range', 'min_var': 't_min', 'max_var': 't_max', 'hint': '5 — 100'},
+        {'label': 'Диапазон измерений (пМ):', 'type': 'range', 'min_var': 'dr_min', 'max_var': 'dr_max', 'hint': '0.0000001 — 0-1*10^11'},
+        {'label': 'Модуль Юнга (ГПа):', 'var_name': 'young_modulus', 'hint': '0-1000'},
+        {'label': 'Чувствительность (мВ/dec):', 'var_name': 'sensitivity', 'hint': '0-1000'},
+        {'label': 'Воспроизводимость (%):', 'var_name': 'reproducibility', 'hint': '0-100'},
+        {'label': 'Время отклика (с):', 'var_name': 'response_time', 'hint': '0-3600'},
+        {'label': 'Стабильность (дни):', 'var_name': 'stability', 'hint': '0-365'},
+        {'label': 'Предел обнаружения (нМ):', 'var_name': 'lod', 'hint': '0-1*10^5'},
+        {'label': 'Долговечность (ч):', 'var_name': 'durability', 'hint': '0-8760'},
+        {'label': 'Энергопотребление (мВт):', 'var_name': 'power_consumption', 'hint': '0-1000'}
+    ]
+})
+
+_FIELD_CONSTRAINTS = MappingProxyType({
+    'analyte': {
+        'ph_min': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
+        'ph_max': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
+        't_max': {'min': 0, 'max': 180},
+        'stability': {'min': 0, 'max': 365},
+        'half_life': {'min': 0, 'max': 8760},
+        'power_consumption': {'min': 0, 'max': 1000}
+    },
+    'bio_recognition': {
+        'ph_min': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
+        'ph_max': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
+        't_min': {'min': 4, 'max': 120},
+        't_max': {'min': 4, 'max': 120},
+        'dr_min': {'min': 0.1, 'max': 1000000000000},
+        'dr_max': {'min': 0.1, 'max': 1000000000000},
+        'sensitivity': {'min': 0, 'max': 20000},
+        'reproducibility': {'min': 0, 'max': 100},
+        'response_time': {'min': 0, 'max': 3600},
+        'stability': {'min': 0, 'max': 365},
+        'lod': {'min': 0, 'max': 50000},
+        'durability': {'min': 0, 'max': 8760},
+        'power_consumption': {'min': 0, 'max': 1000}
+    },
+    'immobilization': {
+        'ph_min': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
+        'ph_max': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
+        't_min': {'min': 4, 'max': 120},
+        't_max': {'min': 4, 'max': 120},
+        'young_modulus': {'min': 0, 'max': 1000},
+        # 'adhesion': {'min': 0, 'max': 100}, # замена на строчный тип
+        # 'solubility': {'min': 0, 'max': 100}, # замена на строчный тип
+        'loss_coefficient': {'min': 0, 'max': 1},
+        'reproducibility': {'min': 0, 'max': 100},
+        'response_time': {'min': 0, 'max': 3600},
+        'stability': {'min': 0, 'max': 365},
+        'durability': {'min': 0, 'max': 8760},
+        'power_consumption': {'min': 0, 'max': 1000}
+    },
+    'memristive': {
+        'ph_min': {'min': 2.0, 'max': 10.0},
+        'ph_max': {'min': 2.0, 'max': 10.0},
+        't_min': {'min': 5, 'max': 120},
+        't_max': {'min': 5, 'max': 120},
+        'dr_min': {'min': 0.0000001, 'max': 100000000000},
+        'dr_max': {'min': 0.0000001, 'max': 100000000000},
+        'young_modulus': {'min': 0, 'max': 1000},
+        'sensitivity': {'min': 0, 'max': 1000},
+        'reproducibility': {'min': 0, 'max': 100},
+        'response_time': {'min': 0, 'max': 3600},
+        'stability': {'min': 0, 'max': 365},
+        'lod': {'min': 0, 'max': 100000},
+        'durability': {'min': 0, 'max': 100000},
+        'power_consumption': {'min': 0, 'max': 1000}
+    }
+})
 
 
 class BiosensorGUI:
@@ -591,151 +443,31 @@ class BiosensorGUI:
         st.set_page_config(page_title="Паспорта мемристивных биосенсоров v2.0", layout="wide")
         st.title("Паспорта мемристивных биосенсоров v2.0")
 
-        # Инициализация базы данных
-        self.db_manager = DatabaseManager()
+        # Инициализация базы данных (один менеджер на процесс)
+        self.db_manager = get_db_manager()
 
-        # ✅ Инициализируем session_state для управления UI
-        if 'active_section' not in st.session_state:
-            st.session_state.active_section = 'data_entry'  # 'data_entry', 'database', 'analysis', 'about'
-        
-        if 'page_size' not in st.session_state:
-            st.session_state.page_size = 50
-        
-        if 'current_page' not in st.session_state:
-            st.session_state.current_page = 0
+        # ✅ Инициализируем session_state для управления UI (сохраняется между перерисовками)
+        for key, value in _SESSION_DEFAULTS.items():
+            st.session_state.setdefault(key, value)
 
         # Настройки пагинации
-        self.page_size = 50
-        self.current_page = 0
-        self.current_data_type = 'analytes'  # Для отслеживания текущего типа данных в Treeview
-
-        # Запись значений в session_state, чтобы они сохранялись между перерисовками Streamlit
-        st.session_state.setdefault('page_size', self.page_size)
-        st.session_state.setdefault('current_page', self.current_page)
-        st.session_state.setdefault('current_data_type', self.current_data_type)
+        self.page_size = _SESSION_DEFAULTS['page_size']
+        self.current_page = _SESSION_DEFAULTS['current_page']
+        self.current_data_type = _SESSION_DEFAULTS['current_data_type']  # Для отслеживания текущего типа данных в Treeview
 
         # Загрузка конфигурации или создание значений по умолчанию
         self.config = self.get_default_config()
 
         # Ограничения для валидации полей
-        self.field_constraints = {
-            'analyte': {
-                'ph_min': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
-                'ph_max': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
-                't_max': {'min': 0, 'max': 180},
-                'stability': {'min': 0, 'max': 365},
-                'half_life': {'min': 0, 'max': 8760},
-                'power_consumption': {'min': 0, 'max': 1000}
-            },
-            'bio_recognition': {
-                'ph_min': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
-                'ph_max': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
-                't_min': {'min': 4, 'max': 120},
-                't_max': {'min': 4, 'max': 120},
-                'dr_min': {'min': 0.1, 'max': 1000000000000},
-                'dr_max': {'min': 0.1, 'max': 1000000000000},
-                'sensitivity': {'min': 0, 'max': 20000},
-                'reproducibility': {'min': 0, 'max': 100},
-                'response_time': {'min': 0, 'max': 3600},
-                'stability': {'min': 0, 'max': 365},
-                'lod': {'min': 0, 'max': 50000},
-                'durability': {'min': 0, 'max': 8760},
-                'power_consumption': {'min': 0, 'max': 1000}
-            },
-            'immobilization': {
-                'ph_min': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
-                'ph_max': {'min': 2.0, 'max': 10.0},  # Расширили диапазон
-                't_min': {'min': 4, 'max': 120},
-                't_max': {'min': 4, 'max': 120},
-                'young_modulus': {'min': 0, 'max': 1000},
-                # 'adhesion': {'min': 0, 'max': 100}, # замена на строчный тип
-                # 'solubility': {'min': 0, 'max': 100}, # замена на строчный тип
-                'loss_coefficient': {'min': 0, 'max': 1},
-                'reproducibility': {'min': 0, 'max': 100},
-                'response_time': {'min': 0, 'max': 3600},
-                'stability': {'min': 0, 'max': 365},
-                'durability': {'min': 0, 'max': 8760},
-                'power_consumption': {'min': 0, 'max': 1000}
-            },
-            'memristive': {
-                'ph_min': {'min': 2.0, 'max': 10.0},
-                'ph_max': {'min': 2.0, 'max': 10.0},
-                't_min': {'min': 5, 'max': 120},
-                't_max': {'min': 5, 'max': 120},
-                'dr_min': {'min': 0.0000001, 'max': 100000000000},
-                'dr_max': {'min': 0.0000001, 'max': 100000000000},
-                'young_modulus': {'min': 0, 'max': 1000},
-                'sensitivity': {'min': 0, 'max': 1000},
-                'reproducibility': {'min': 0, 'max': 100},
-                'response_time': {'min': 0, 'max': 3600},
-                'stability': {'min': 0, 'max': 365},
-                'lod': {'min': 0, 'max': 100000},
-                'durability': {'min': 0, 'max': 100000},
-                'power_consumption': {'min': 0, 'max': 1000}
-            }
-        }
+        self.field_constraints = _FIELD_CONSTRAINTS
 
         # Создание интерфейса
         self.sections = {}
 
     @staticmethod
     def get_default_config():
-        """Возвращает конфигурацию по умолчанию для полей."""
-        return {
-            'analyte': [
-                {'label': 'ID аналита:', 'var_name': 'ta_id', 'hint': 'Например: TA001'},
-                {'label': 'Название:', 'var_name': 'ta_name', 'hint': 'Полное название аналита'},
-                {'label': 'pH диапазон:', 'type': 'range', 'min_var': 'ph_min', 'max_var': 'ph_max', 'hint': '2.0 — 10.0'},
-                {'label': 'Макс. температура (°C):', 'var_name': 't_max', 'hint': '0-180'},
-                {'label': 'Стабильность (дни):', 'var_name': 'stability', 'hint': '0-365'},
-                {'label': 'Период полураспада (ч):', 'var_name': 'half_life', 'hint': '0-8760'},
-                {'label': 'Энергопотребление (мВт):', 'var_name': 'power_consumption', 'hint': '0-1000'}
-            ],
-            'bio_recognition': [
-                {'label': 'ID биослоя:', 'var_name': 'bre_id', 'hint': 'Например: BRE001'},
-                {'label': 'Название:', 'var_name': 'bre_name', 'hint': 'Тип биослоя'},
-                {'label': 'pH диапазон:', 'type': 'range', 'min_var': 'ph_min', 'max_var': 'ph_max', 'hint': '2.0 — 10.0'},
-                {'label': 'Температурный диапазон (°C):', 'type': 'range', 'min_var': 't_min', 'max_var': 't_max', 'hint': '2 — 120'},
-                {'label': 'Диапазон измерений (пМ):', 'type': 'range', 'min_var': 'dr_min', 'max_var': 'dr_max', 'hint': '0.1 — 1*10^12'},
-                {'label': 'Чувствительность (мкА/(мкМ*см^2)):', 'var_name': 'sensitivity', 'hint': '0.01 — 1000'},
-                {'label': 'Воспроизводимость (%):', 'var_name': 'reproducibility', 'hint': '0-100'},
-                {'label': 'Время отклика (с):', 'var_name': 'response_time', 'hint': '0-3600'},
-                {'label': 'Стабильность (дни):', 'var_name': 'stability', 'hint': '0-365'},
-                {'label': 'Предел обнаружения (нМ):', 'var_name': 'lod', 'hint': '0-100000'},
-                {'label': 'Долговечность (ч):', 'var_name': 'durability', 'hint': '0-100000'},
-                {'label': 'Энергопотребление (мВт):', 'var_name': 'power_consumption', 'hint': '0-1000'}
-            ],
-            'immobilization': [
-                {'label': 'ID иммобилизации:', 'var_name': 'im_id', 'hint': 'Например: IM001'},
-                {'label': 'Название:', 'var_name': 'im_name', 'hint': 'Тип иммобилизации'},
-                {'label': 'pH диапазон:', 'type': 'range', 'min_var': 'ph_min', 'max_var': 'ph_max', 'hint': '2.0 — 10.0'},
-                {'label': 'Температурный диапазон (°C):', 'type': 'range', 'min_var': 't_min', 'max_var': 't_max', 'hint': '4 — 95'},
-                {'label': 'Модуль Юнга (ГПа):', 'var_name': 'young_modulus', 'hint': '0-1000'},
-                {'label': 'Адгезия (%):', 'var_name': 'adhesion', 'hint': 'Например: высокая'},
-                {'label': 'Растворимость (%):', 'var_name': 'solubility', 'hint': 'Например: средняя'},
-                {'label': 'Коэффициент потерь:', 'var_name': 'loss_coefficient', 'hint': '0-1'},
-                {'label': 'Воспроизводимость (%):', 'var_name': 'reproducibility', 'hint': '0-100'},
-                {'label': 'Время отклика (с):', 'var_name': 'response_time', 'hint': '0-3600'},
-                {'label': 'Стабильность (дни):', 'var_name': 'stability', 'hint': '0-365'},
-                {'label': 'Долговечность (ч):', 'var_name': 'durability', 'hint': '0-8760'},
-                {'label': 'Энергопотребление (мВт):', 'var_name': 'power_consumption', 'hint': '0-1000'}
-            ],
-            'memristive': [
-                {'label': 'ID мемристора:', 'var_name': 'mem_id', 'hint': 'Например: MEM001'},
-                {'label': 'Название:', 'var_name': 'mem_name', 'hint': 'Тип мемристора'},
-                {'label': 'pH диапазон:', 'type': 'range', 'min_var': 'ph_min', 'max_var': 'ph_max', 'hint': '2.0 — 10.0'},
-                {'label': 'Температурный диапазон (°C):', 'type': 'range', 'min_var': 't_min', 'max_var': 't_max', 'hint': '5 — 100'},
-                {'label': 'Диапазон измерений (пМ):', 'type': 'range', 'min_var': 'dr_min', 'max_var': 'dr_max', 'hint': '0.0000001 — 0-1*10^11'},
-                {'label': 'Модуль Юнга (ГПа):', 'var_name': 'young_modulus', 'hint': '0-1000'},
-                {'label': 'Чувствительность (мВ/dec):', 'var_name': 'sensitivity', 'hint': '0-1000'},
-                {'label': 'Воспроизводимость (%):', 'var_name': 'reproducibility', 'hint': '0-100'},
-                {'label': 'Время отклика (с):', 'var_name': 'response_time', 'hint': '0-3600'},
-                {'label': 'Стабильность (дни):', 'var_name': 'stability', 'hint': '0-365'},
-                {'label': 'Предел обнаружения (нМ):', 'var_name': 'lod', 'hint': '0-1*10^5'},
-                {'label': 'Долговечность (ч):', 'var_name': 'durability', 'hint': '0-8760'},
-                {'label': 'Энергопотребление (мВт):', 'var_name': 'power_consumption', 'hint': '0-1000'}
-            ]
-        }
+        """Возвращает конфигурацию по умолчанию для полей (общую, только для чтения)."""
+        return _DEFAULT_CONFIG
     
     # streamlit
     def create_menu(self):
@@ -795,13 +527,13 @@ class BiosensorGUI:
             st.rerun()
             
     # streamlit
-    @staticmethod
-    def create_data_entry_tab():
+    def create_data_entry_tab(self):
         """Создание вкладки ввода паспортов для Streamlit."""
         st.header("🔬 Ввод паспорта биосенсора v2.0")
         
-        # Создаём контейнер с прокруткой (Streamlit имеет встроенную прокрутку)
-        with st.container():
+        # Поля паспорта — в форме: изменение поля не перезапускает скрипт,
+        # значения попадают в session_state один раз при отправке формы
+        with st.form("passport_form", clear_on_submit=False):
             # Создаём две колонки для макета
             col1, col2 = st.columns(2)
             
@@ -819,23 +551,9 @@ class BiosensorGUI:
                     key="analyte_ta_name",
                     help="Полное название аналита"
                 )
-                col_ph_a1, col_ph_a2 = st.columns(2)
-                with col_ph_a1:
-                    analyte_vars['ph_min'] = st.number_input(
-                        "pH минимум",
-                        min_value=2.0,
-                        max_value=10.0,
-                        key="analyte_ph_min",
-                        help="2.0 — 10.0"
-                    )
-                with col_ph_a2:
-                    analyte_vars['ph_max'] = st.number_input(
-                        "pH максимум",
-                        min_value=2.0,
-                        max_value=10.0,
-                        key="analyte_ph_max",
-                        help="2.0 — 10.0"
-                    )
+                analyte_vars['ph_min'], analyte_vars['ph_max'] = range_input(
+                    "pH минимум", "pH максимум", "analyte_ph", 2.0, 10.0, help="2.0 — 10.0"
+                )
                 analyte_vars['t_max'] = st.number_input(
                     "Макс. температура (°C)",
                     min_value=0,
@@ -879,57 +597,15 @@ class BiosensorGUI:
                     key="bio_bre_name",
                     help="Тип биослоя"
                 )
-                col_ph_b1, col_ph_b2 = st.columns(2)
-                with col_ph_b1:
-                    bio_vars['ph_min'] = st.number_input(
-                        "pH минимум",
-                        min_value=2.0,
-                        max_value=10.0,
-                        key="bio_ph_min",
-                        help="2.0 — 10.0"
-                    )
-                with col_ph_b2:
-                    bio_vars['ph_max'] = st.number_input(
-                        "pH максимум",
-                        min_value=2.0,
-                        max_value=10.0,
-                        key="bio_ph_max",
-                        help="2.0 — 10.0"
-                    )
-                col_t_b1, col_t_b2 = st.columns(2)
-                with col_t_b1:
-                    bio_vars['t_min'] = st.number_input(
-                        "Температура минимум (°C)",
-                        min_value=4,
-                        max_value=120,
-                        key="bio_t_min",
-                        help="4 — 120"
-                    )
-                with col_t_b2:
-                    bio_vars['t_max'] = st.number_input(
-                        "Температура максимум (°C)",
-                        min_value=4,
-                        max_value=120,
-                        key="bio_t_max",
-                        help="4 — 120"
-                    )
-                col_dr_b1, col_dr_b2 = st.columns(2)
-                with col_dr_b1:
-                    bio_vars['dr_min'] = st.number_input(
-                        "Диапазон минимум (пМ)",
-                        min_value=0.1,
-                        max_value=1e12,
-                        key="bio_dr_min",
-                        help="0.1 — 1*10^12"
-                    )
-                with col_dr_b2:
-                    bio_vars['dr_max'] = st.number_input(
-                        "Диапазон максимум (пМ)",
-                        min_value=0.1,
-                        max_value=1e12,
-                        key="bio_dr_max",
-                        help="0.1 — 1*10^12"
-                    )
+                bio_vars['ph_min'], bio_vars['ph_max'] = range_input(
+                    "pH минимум", "pH максимум", "bio_ph", 2.0, 10.0, help="2.0 — 10.0"
+                )
+                bio_vars['t_min'], bio_vars['t_max'] = range_input(
+                    "Температура минимум (°C)", "Температура максимум (°C)", "bio_t", 4, 120, help="4 — 120"
+                )
+                bio_vars['dr_min'], bio_vars['dr_max'] = range_input(
+                    "Диапазон минимум (пМ)", "Диапазон максимум (пМ)", "bio_dr", 0.1, 1e12, help="0.1 — 1*10^12"
+                )
                 bio_vars['sensitivity'] = st.number_input(
                     "Чувствительность (мкА/(мкМ*см²))",
                     min_value=0.0,
@@ -994,40 +670,12 @@ class BiosensorGUI:
                     key="immob_im_name",
                     help="Тип иммобилизации"
                 )
-                col_ph_i1, col_ph_i2 = st.columns(2)
-                with col_ph_i1:
-                    immob_vars['ph_min'] = st.number_input(
-                        "pH минимум",
-                        min_value=2.0,
-                        max_value=10.0,
-                        key="immob_ph_min",
-                        help="2.0 — 10.0"
-                    )
-                with col_ph_i2:
-                    immob_vars['ph_max'] = st.number_input(
-                        "pH максимум",
-                        min_value=2.0,
-                        max_value=10.0,
-                        key="immob_ph_max",
-                        help="2.0 — 10.0"
-                    )
-                col_t_i1, col_t_i2 = st.columns(2)
-                with col_t_i1:
-                    immob_vars['t_min'] = st.number_input(
-                        "Температура минимум (°C)",
-                        min_value=4,
-                        max_value=120,
-                        key="immob_t_min",
-                        help="4 — 95"
-                    )
-                with col_t_i2:
-                    immob_vars['t_max'] = st.number_input(
-                        "Температура максимум (°C)",
-                        min_value=4,
-                        max_value=120,
-                        key="immob_t_max",
-                        help="4 — 95"
-                    )
+                immob_vars['ph_min'], immob_vars['ph_max'] = range_input(
+                    "pH минимум", "pH максимум", "immob_ph", 2.0, 10.0, help="2.0 — 10.0"
+                )
+                immob_vars['t_min'], immob_vars['t_max'] = range_input(
+                    "Температура минимум (°C)", "Температура максимум (°C)", "immob_t", 4, 120, help="4 — 95"
+                )
                 immob_vars['young_modulus'] = st.number_input(
                     "Модуль Юнга (ГПа)",
                     min_value=0,
@@ -1104,57 +752,15 @@ class BiosensorGUI:
                     key="mem_mem_name",
                     help="Тип мемристора"
                 )
-                col_ph_m1, col_ph_m2 = st.columns(2)
-                with col_ph_m1:
-                    mem_vars['ph_min'] = st.number_input(
-                        "pH минимум",
-                        min_value=2.0,
-                        max_value=10.0,
-                        key="mem_ph_min",
-                        help="2.0 — 10.0"
-                    )
-                with col_ph_m2:
-                    mem_vars['ph_max'] = st.number_input(
-                        "pH максимум",
-                        min_value=2.0,
-                        max_value=10.0,
-                        key="mem_ph_max",
-                        help="2.0 — 10.0"
-                    )
-                col_t_m1, col_t_m2 = st.columns(2)
-                with col_t_m1:
-                    mem_vars['t_min'] = st.number_input(
-                        "Температура минимум (°C)",
-                        min_value=5,
-                        max_value=120,
-                        key="mem_t_min",
-                        help="5 — 100"
-                    )
-                with col_t_m2:
-                    mem_vars['t_max'] = st.number_input(
-                        "Температура максимум (°C)",
-                        min_value=5,
-                        max_value=120,
-                        key="mem_t_max",
-                        help="5 — 100"
-                    )
-                col_dr_m1, col_dr_m2 = st.columns(2)
-                with col_dr_m1:
-                    mem_vars['dr_min'] = st.number_input(
-                        "Диапазон минимум (пМ)",
-                        min_value=1e-7,
-                        max_value=1e11,
-                        key="mem_dr_min",
-                        help="0.0000001 — 1*10^11"
-                    )
-                with col_dr_m2:
-                    mem_vars['dr_max'] = st.number_input(
-                        "Диапазон максимум (пМ)",
-                        min_value=1e-7,
-                        max_value=1e11,
-                        key="mem_dr_max",
-                        help="0.0000001 — 1*10^11"
-                    )
+                mem_vars['ph_min'], mem_vars['ph_max'] = range_input(
+                    "pH минимум", "pH максимум", "mem_ph", 2.0, 10.0, help="2.0 — 10.0"
+                )
+                mem_vars['t_min'], mem_vars['t_max'] = range_input(
+                    "Температура минимум (°C)", "Температура максимум (°C)", "mem_t", 5, 120, help="5 — 100"
+                )
+                mem_vars['dr_min'], mem_vars['dr_max'] = range_input(
+                    "Диапазон минимум (пМ)", "Диапазон максимум (пМ)", "mem_dr", 1e-7, 1e11, help="0.0000001 — 1*10^11"
+                )
                 mem_vars['young_modulus'] = st.number_input(
                     "Модуль Юнга (ГПа)",
                     min_value=0,
@@ -1211,13 +817,15 @@ class BiosensorGUI:
                     key="mem_power_consumption",
                     help="0-1000"
                 )
+
+            st.divider()
+            save_submitted = st.form_submit_button("💾 Сохранить паспорт", width="stretch")
+
+        if save_submitted:
+            self.save_passport_to_db_streamlit()
         
-        # Кнопки управления в нижней части
-        st.divider()
-        btn_col1, btn_col2, btn_col3 = st.columns(3)
-        with btn_col1:
-            if st.button("💾 Сохранить паспорт", key="save_btn", width="stretch"):
-                st.info("✅ Паспорт сохранён в базу данных")
+        # Кнопки управления в нижней части (вне формы)
+        btn_col2, btn_col3 = st.columns(2)
         with btn_col2:
             if st.button("🗑️ Очистить форму", key="clear_btn", width="stretch"):
                 st.info("✅ Форма очищена")
@@ -1226,8 +834,85 @@ class BiosensorGUI:
                 st.info("✅ Паспорт загружен из БД")   
 
     # streamlit
+    # Keyset-пагинация: вместо OFFSET в session_state хранится стек курсоров
+    # начала просмотренных страниц; "Назад" снимает курсор со стека.
+    def _keyset_page(self, data_type, page_size):
+        """Текущая страница keyset-пагинации data_type: (DataFrame, номер страницы, есть ли следующая).
+
+        Страница берётся из предзагрузки (если готова) или через cached_page.
+        Запрашивается page_size + 1 строк: лишняя строка только показывает,
+        есть ли следующая страница.
+        Следующая страница сразу запрашивается в фоне.
+        """
+        table_config, method_name, _, _ = _DATABASE_TABLES[data_type]
+        state_key = f"{data_type}_page_cursors"
+        fetch_size = page_size + 1
+        state = st.session_state.get(state_key)
+        if state is None or state['page_size'] != page_size:
+            # курсоры привязаны к размеру страницы
+            state = {'page_size': page_size, 'cursors': [None]}
+            st.session_state[state_key] = state
+            st.session_state['current_page'] = 0
+
+        cursors = state['cursors']
+        current_page = min(st.session_state['current_page'], len(cursors) - 1)
+        del cursors[current_page + 1:]
+        st.session_state['current_page'] = current_page
+        cursor = cursors[current_page]
+        df = self._take_prefetched((method_name, cursor, fetch_size))
+        if df is None:
+            df = cached_page(self.db_manager, method_name, cursor, fetch_size, self.db_manager.cache_version())
+        has_next = len(df) > page_size
+        if has_next:
+            df = df.iloc[:page_size]
+            next_cursor = DatabaseManager.page_cursor(table_config, [df.iloc[-1]])
+            self._prefetch_page((method_name, next_cursor, fetch_size))
+        return df, current_page, has_next
+
+    def _prefetch_page(self, key):
+        """Фоновая загрузка страницы key = (метод, курсор, размер) в st.session_state['prefetch_next']."""
+        pending = st.session_state.get('prefetch_next')
+        if pending is not None and pending[0] == key:
+            return
+        method_name, cursor, page_size = key
+        future = self.db_manager.prefetch(method_name, cursor, page_size, rows_as_dicts=False)
+        st.session_state['prefetch_next'] = (key, future)
+
+    def _take_prefetched(self, key):
+        """Предзагруженная страница (DataFrame) или None, если её нет или она не готова."""
+        pending = st.session_state.get('prefetch_next')
+        if pending is None or pending[0] != key:
+            return None
+        del st.session_state['prefetch_next']
+        try:
+            rows = pending[1].result(timeout=PREFETCH_WAIT)
+        except concurrent.futures.TimeoutError:
+            return None
+        return _page_frame(rows)
+
+    def _keyset_next(self, state_key, table_config, df):
+        """Переход на следующую страницу: курсор по последней строке текущей."""
+        st.session_state[state_key]['cursors'].append(DatabaseManager.page_cursor(table_config, [df.iloc[-1]]))
+        st.session_state['current_page'] += 1
+
+    def _keyset_prev(self, state_key):
+        """Возврат на предыдущую страницу."""
+        st.session_state[state_key]['cursors'].pop()
+        st.session_state['current_page'] -= 1
+
+    @st.fragment
     def create_database_tab(self):
-        """Создание вкладки базы данных для Streamlit."""
+        """Создание вкладки базы данных для Streamlit.
+
+        Фрагмент: кнопки вкладки (тип данных, страницы, обновление)
+        перезапускают только её, без меню и остальных разделов.
+        """
+        # вкладка только читает: все запросы перерисовки — в одной транзакции
+        with self.db_manager.read_txn():
+            self._render_database_tab()
+
+    def _render_database_tab(self):
+        """Содержимое вкладки базы данных."""
         st.header("📊 База данных биосенсоров")
         
         # Кнопки для выбора типа данных
@@ -1250,64 +935,22 @@ class BiosensorGUI:
                 st.session_state.current_page = 0
         with col5:
             if st.button("🔄 Обновить", width="stretch"):
-                st.rerun()
+                # страницы перечитываются из БД, а не из кэша
+                clear_read_caches()
+                st.rerun(scope="fragment")
         
         st.divider()
         
         # Пагинация
         page_size = st.number_input("Записей на странице:", min_value=5, max_value=100, value=20)
-        current_page = st.session_state.get('current_page', 0)
-        current_data_type = st.session_state.get('current_data_type', 'analytes')
-        
-        # Получение данных в зависимости от типа
-        offset = current_page * page_size
-        
-        if current_data_type == 'analytes':
-            data = self.db_manager.list_all_analytes_paginated(page_size, offset)
-            columns = ["TA_ID", "TA_Name", "PH_Min", "PH_Max", "T_Max", "ST"]
-            title = "📋 Аналиты"
-        elif current_data_type == 'bio_layers':
-            data = self.db_manager.list_all_bio_recognition_layers_paginated(page_size, offset)
-            columns = ["BRE_ID", "BRE_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "SN"]
-            title = "🔴 Биораспознающие слои"
-        elif current_data_type == 'immobilization_layers':
-            data = self.db_manager.list_all_immobilization_layers_paginated(page_size, offset)
-            columns = ["IM_ID", "IM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "MP"]
-            title = "🟡 Иммобилизационные слои"
-        elif current_data_type == 'memristive_layers':
-            data = self.db_manager.list_all_memristive_layers_paginated(page_size, offset)
-            columns = ["MEM_ID", "MEM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "SN"]
-            title = "🟣 Мемристивные слои"
-        else:
-            data = []
-            columns = []
-            title = "Данные не найдены"
-        
-        st.subheader(title)
-        
-        # Отображение таблицы
-        if data:
-            df = __import__('pandas').DataFrame(data)
-            st.dataframe(df, width="stretch")
-        else:
-            st.info("Нет данных для отображения на этой странице.")
-        
-        # Навигация по страницам
-        st.divider()
-        col_prev, col_page, col_next = st.columns(3)
-        
-        with col_prev:
-            if st.button("◀ Предыдущая", width="stretch", disabled=(current_page == 0)):
-                st.session_state.current_page = max(0, current_page - 1)
-                st.rerun()
-        
-        with col_page:
-            st.write(f"**Страница {current_page + 1}**", unsafe_allow_html=True)
-        
-        with col_next:
-            if st.button("Следующая ▶", width="stretch", disabled=(len(data) < page_size)):
-                st.session_state.current_page = current_page + 1
-                st.rerun()
+        current_data_type = st.session_state['current_data_type']
+        if current_data_type not in _DATABASE_TABLES:
+            st.subheader("Данные не найдены")
+            st.info("Тип данных не выбран или неизвестен")
+            return
+        self._show_keyset_table(
+            current_data_type, page_size, empty_message="Нет данных для отображения на этой странице."
+        )
     
     # streamlit
     def create_analysis_tab(self):
@@ -1323,293 +966,201 @@ class BiosensorGUI:
         
         with col2:
             if st.button("📊 Сравнительный анализ", width="stretch"):
+                st.session_state['show_best_table'] = False
                 self.comparative_analysis()
         
         with col3:
             if st.button("📈 Статистика", width="stretch"):
+                st.session_state['show_best_table'] = False
                 self.show_statistics()
         
         st.divider()
         
         # Область для вывода результатов анализа
-        st.session_state.setdefault('analysis_result', "Выберите тип анализа...")
         st.text_area(
             "Результаты анализа:",
-            value=st.session_state.get('analysis_result', ''),
+            value=st.session_state['analysis_result'],
             height=300,
             disabled=True
         )
+        if st.session_state['show_best_table']:
+            self._render_best_combinations()
     
     # streamlit
     def save_passport_to_db_streamlit(self):
         """Сохранение паспорта в БД из Streamlit-форм."""
+        # Пустая форма: без сборки разделов, транзакции и сброса кэшей
+        if not any(st.session_state.get(key) for key in _PASSPORT_ID_KEYS):
+            st.warning("⚠️ Заполните ID хотя бы одного раздела паспорта")
+            return
         try:
-            # Сохранение аналита
-            analyte_data = {
-                'TA_ID': st.session_state.get('analyte_ta_id', '', cache=False),
-                'TA_Name': st.session_state.get('analyte_ta_name', ''),
-                'PH_Min': st.session_state.get('analyte_ph_min'),
-                'PH_Max': st.session_state.get('analyte_ph_max'),
-                'T_Max': st.session_state.get('analyte_t_max'),
-                'ST': st.session_state.get('analyte_stability'),
-                'HL': st.session_state.get('analyte_half_life'),
-                'PC': st.session_state.get('analyte_power_consumption')
-            }
+            # Все вставки паспорта — одной транзакцией записи: один COMMIT
+            # вместо отдельного на каждую сущность
+            with self.db_manager.transaction():
+                # Сохранение аналита
+                analyte_data = _session_section('analyte')
             
-            '''if analyte_data['TA_ID']:
-                if self.db_manager.insert_analyte(analyte_data):
-                    st.success("✅ Аналит сохранён")
-                    self.logger.info(f"Аналит {analyte_data['TA_ID']} сохранён")
-            '''
-            if not analyte_data['TA_ID']:
-                st.error("❌ ID аналита не может быть пустым")
-                return
+                '''if analyte_data['TA_ID']:
+                    if self.db_manager.insert_analyte(analyte_data):
+                        st.success("✅ Аналит сохранён")
+                        self.logger.info(f"Аналит {analyte_data['TA_ID']} сохранён")
+                '''
+                if not analyte_data['TA_ID']:
+                    st.error("❌ ID аналита не может быть пустым")
+                    return
             
-            result = self.db_manager.insert_analyte(analyte_data)
+                result = self._insert_section('analyte', analyte_data)
             
-            # Обработка результата в GUI слое
-            if result == "DUPLICATE":
-                st.warning(f"⚠️ Аналит {analyte_data['TA_ID']} уже существует")
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("✅ Перезаписать", key=f"overwrite_analyte_{analyte_data['TA_ID']}"):
-                        # Удалить существующий и вставить новый
-                        with get_connection() as conn:
-                            cursor = conn.cursor()
-                            cursor.execute("DELETE FROM Analytes WHERE TA_ID = ?", (analyte_data['TA_ID'],))
-                            conn.commit()
-                        self.db_manager.insert_analyte(analyte_data)
-                        st.success("✅ Аналит перезаписан!")
-                with col2:
-                    if st.button("❌ Отмена", key=f"cancel_analyte_{analyte_data['TA_ID']}"):
-                        st.info("Операция отменена")
-            elif result is True:
-                st.success(f"✅ Аналит {analyte_data['TA_ID']} успешно сохранён")
-            else:
-                st.error(f"❌ Ошибка сохранения аналита")
+                # Обработка результата в GUI слое
+                if result == "UNCHANGED":
+                    st.info("ℹ️ Данные раздела не изменились с последнего сохранения")
+                elif result == "DUPLICATE":
+                    self._queue_overwrite('analyte', analyte_data)
+                elif result is True:
+                    st.success(f"✅ Аналит {analyte_data['TA_ID']} успешно сохранён")
+                else:
+                    st.error(f"❌ Ошибка сохранения аналита")
             
-            # Сохранение биораспознающего слоя
-            bio_data = {
-                'BRE_ID': st.session_state.get('bio_bre_id', ''),
-                'BRE_Name': st.session_state.get('bio_bre_name', ''),
-                'PH_Min': st.session_state.get('bio_ph_min'),
-                'PH_Max': st.session_state.get('bio_ph_max'),
-                'T_Min': st.session_state.get('bio_t_min'),
-                'T_Max': st.session_state.get('bio_t_max'),
-                'SN': st.session_state.get('bio_sensitivity'),
-                'DR_Min': st.session_state.get('bio_dr_min'),
-                'DR_Max': st.session_state.get('bio_dr_max'),
-                'RP': st.session_state.get('bio_reproducibility'),
-                'TR': st.session_state.get('bio_response_time'),
-                'ST': st.session_state.get('bio_stability'),
-                'LOD': st.session_state.get('bio_lod'),
-                'HL': st.session_state.get('bio_durability'),
-                'PC': st.session_state.get('bio_power_consumption')
-            }
-
-            if not bio_data["BRE_ID"]:
-                st.error("❌ Введите BRE_ID")
-                return
+                # Сохранение биораспознающего слоя
+                bio_data = _session_section('bio')
 
-            result = self.db_manager.insert_bio_recognition_layer(bio_data)
+                if not bio_data["BRE_ID"]:
+                    st.error("❌ Введите BRE_ID")
+                    return
 
-            # Обработка результата в GUI слое
-            if result == "DUPLICATE":
-                st.warning(f"⚠️ Биослой {bio_data['BRE_ID']} уже существует")
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    if st.button("✅ Перезаписать", key=f"overwrite_bio_ui_{bio_data['BRE_ID']}"):
-                        try:
-                            # Удаляем существующую запись и пробуем вставить снова
-                            with get_connection() as conn:
-                                cur = conn.cursor()
-                                cur.execute("DELETE FROM BioRecognitionLayers WHERE BRE_ID = ?", (bio_data['BRE_ID'],))
-                                conn.commit()
-                            inserted = self.db_manager.insert_bio_recognition_layer(bio_data)
-                            if inserted is True:
-                                st.success("✅ Биослой перезаписан")
-                            else:
-                                st.error("❌ Ошибка при перезаписи биослоя")
-                            st.rerun()
-                        except Exception as e:
-                            self.logger.exception("Ошибка перезаписи биослоя")
-                            st.error(f"❌ Ошибка: {e}")
-                with col2:
-                    if st.button("❌ Отмена", key=f"cancel_bio_ui_{bio_data['BRE_ID']}"):
-                        st.info("Операция отменена")
-                return
+                result = self._insert_section('bio', bio_data)
 
-            if result is True:
-                st.success("✅ Биослой сохранён")
-                st.rerun()
-            else:
-                st.error("❌ Не удалось сохранить биослой")
-                
-            # Сохранение иммобилизационного слоя
-            immob_data = {
-                'IM_ID': st.session_state.get('immob_im_id', ''),
-                'IM_Name': st.session_state.get('immob_im_name', ''),
-                'PH_Min': st.session_state.get('immob_ph_min'),
-                'PH_Max': st.session_state.get('immob_ph_max'),
-                'T_Min': st.session_state.get('immob_t_min'),
-                'T_Max': st.session_state.get('immob_t_max'),
-                'MP': st.session_state.get('immob_young_modulus'),
-                'Adh': st.session_state.get('immob_adhesion', ''),
-                'Sol': st.session_state.get('immob_solubility', ''),
-                'K_IM': st.session_state.get('immob_loss_coefficient'),
-                'RP': st.session_state.get('immob_reproducibility'),
-                'TR': st.session_state.get('immob_response_time'),
-                'ST': st.session_state.get('immob_stability'),
-                'HL': st.session_state.get('immob_durability'),
-                'PC': st.session_state.get('immob_power_consumption')
-            }
-
-            # Обработка результата в GUI слое
-            if immob_data['IM_ID']:
-                result = self.db_manager.insert_immobilization_layer(immob_data)
-
-                if result == "DUPLICATE":
-                    st.warning(f"⚠️ Иммобилизационный слой {immob_data['IM_ID']} уже существует")
-                    col1, col2 = st.columns([1, 1])
-                    with col1:
-                        if st.button("✅ Перезаписать", key=f"overwrite_immob_ui_{immob_data['IM_ID']}"):
-                            try:
-                                with get_connection() as conn:
-                                    cur = conn.cursor()
-                                    cur.execute("DELETE FROM ImmobilizationLayers WHERE IM_ID = ?", (immob_data['IM_ID'],))
-                                    conn.commit()
-                                inserted = self.db_manager.insert_immobilization_layer(immob_data)
-                                if inserted is True:
-                                    st.success("✅ Иммобилизационный слой перезаписан")
-                                else:
-                                    st.error("❌ Ошибка при перезаписи иммобилизационного слоя")
-                                st.rerun()
-                            except Exception as e:
-                                self.logger.exception("Ошибка перезаписи иммобилизационного слоя")
-                                st.error(f"❌ Ошибка: {e}")
-                    with col2:
-                        if st.button("❌ Отмена", key=f"cancel_immob_ui_{immob_data['IM_ID']}"):
-                            st.info("Операция отменена")
+                # Обработка результата в GUI слое
+                if result == "UNCHANGED":
+                    st.info("ℹ️ Данные раздела не изменились с последнего сохранения")
+                elif result == "DUPLICATE":
+                    self._queue_overwrite('bio', bio_data)
+                    return
                 elif result is True:
-                    st.success("✅ Иммобилизационный слой сохранён")
-                    self.logger.info(f"Иммобилизационный слой {immob_data['IM_ID']} сохранён")
+                    st.success("✅ Биослой сохранён")
                 else:
-                    st.error("❌ Не удалось сохранить иммобилизационный слой")
-
-            # Сохранение мемристивного слоя
-            mem_data = {
-                'MEM_ID': st.session_state.get('mem_mem_id', ''),
-                'MEM_Name': st.session_state.get('mem_mem_name', ''),
-                'PH_Min': st.session_state.get('mem_ph_min'),
-                'PH_Max': st.session_state.get('mem_ph_max'),
-                'T_Min': st.session_state.get('mem_t_min'),
-                'T_Max': st.session_state.get('mem_t_max'),
-                'MP': st.session_state.get('mem_young_modulus'),
-                'SN': st.session_state.get('mem_sensitivity'),
-                'DR_Min': st.session_state.get('mem_dr_min'),
-                'DR_Max': st.session_state.get('mem_dr_max'),
-                'RP': st.session_state.get('mem_reproducibility'),
-                'TR': st.session_state.get('mem_response_time'),
-                'ST': st.session_state.get('mem_stability'),
-                'LOD': st.session_state.get('mem_lod'),
-                'HL': st.session_state.get('mem_durability'),
-                'PC': st.session_state.get('mem_power_consumption')
-            }
+                    st.error("❌ Не удалось сохранить биослой")
+                
+                # Сохранение иммобилизационного слоя
+                immob_data = _session_section('immob')
+
+                # Обработка результата в GUI слое
+                if immob_data['IM_ID']:
+                    result = self._insert_section('immob', immob_data)
+
+                    if result == "UNCHANGED":
+                        st.info("ℹ️ Данные раздела не изменились с последнего сохранения")
+                    elif result == "DUPLICATE":
+                        self._queue_overwrite('immob', immob_data)
+                    elif result is True:
+                        st.success("✅ Иммобилизационный слой сохранён")
+                        self.logger.info(f"Иммобилизационный слой {immob_data['IM_ID']} сохранён")
+                    else:
+                        st.error("❌ Не удалось сохранить иммобилизационный слой")
 
-            if not mem_data['MEM_ID']:
-                st.error("❌ ID мемристора не может быть пустым")
-                return
+                # Сохранение мемристивного слоя
+                mem_data = _session_section('mem')
+
+                if not mem_data['MEM_ID']:
+                    st.error("❌ ID мемристора не может быть пустым")
+                    return
             
-            result = self.db_manager.insert_memristive_layer(mem_data)
+                result = self._insert_section('mem', mem_data)
             
-            # Обработка результата в GUI слое
-            if result == "DUPLICATE":
-                st.warning(f"⚠️ Мемристивный слой {mem_data['MEM_ID']} уже существует")
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    if st.button("✅ Перезаписать", key=f"overwrite_mem_ui_{mem_data['MEM_ID']}"):
-                        try:
-                            with get_connection() as conn:
-                                cur = conn.cursor()
-                                cur.execute("DELETE FROM MemristiveLayers WHERE MEM_ID = ?", (mem_data['MEM_ID'],))
-                                conn.commit()
-                            inserted = self.db_manager.insert_memristive_layer(mem_data)
-                            if inserted is True:
-                                st.success("✅ Мемристивный слой перезаписан")
-                            else:
-                                st.error("❌ Ошибка при перезаписи мемристивного слоя")
-                            st.rerun()
-                        except Exception as e:
-                            self.logger.exception("Ошибка перезаписи мемристивного слоя")
-                            st.error(f"❌ Ошибка: {e}")
-                with col2:
-                    if st.button("❌ Отмена", key=f"cancel_mem_ui_{mem_data['MEM_ID']}"):
-                        st.info("Операция отменена")
-            elif result is True:
-                st.success("✅ Мемристивный слой сохранён")
-                self.logger.info(f"Мемристивный слой {mem_data['MEM_ID']} сохранён")
-            else:
-                st.error("❌ Не удалось сохранить мемристивный слой")
-
-            st.success("✅ Все паспорты успешно сохранены!")
-
-            """Сохранение комбинации сенсора с Streamlit UI и обработкой дубликатов."""
-            combo_data = {
-                'Combo_ID': st.session_state.get('combo_id', ''),
-                'TA_ID': st.session_state.get('combo_ta_id', ''),
-                'BRE_ID': st.session_state.get('combo_bre_id', ''),
-                'IM_ID': st.session_state.get('combo_im_id', ''),
-                'MEM_ID': st.session_state.get('combo_mem_id', ''),
-                'SN_total': st.session_state.get('combo_sn_total'),
-                'TR_total': st.session_state.get('combo_tr_total'),
-                'ST_total': st.session_state.get('combo_st_total'),
-                'RP_total': st.session_state.get('combo_rp_total'),
-                'LOD_total': st.session_state.get('combo_lod_total'),
-                'DR_total': st.session_state.get('combo_dr_total', ''),
-                'HL_total': st.session_state.get('combo_hl_total'),
-                'PC_total': st.session_state.get('combo_pc_total'),
-                'Score': st.session_state.get('combo_score'),
-                'created_at': st.session_state.get('combo_created_at')
-            }
+                # Обработка результата в GUI слое
+                if result == "UNCHANGED":
+                    st.info("ℹ️ Данные раздела не изменились с последнего сохранения")
+                elif result == "DUPLICATE":
+                    self._queue_overwrite('mem', mem_data)
+                elif result is True:
+                    st.success("✅ Мемристивный слой сохранён")
+                    self.logger.info(f"Мемристивный слой {mem_data['MEM_ID']} сохранён")
+                else:
+                    st.error("❌ Не удалось сохранить мемристивный слой")
+
+                st.success("✅ Все паспорты успешно сохранены!")
+
+                """Сохранение комбинации сенсора с Streamlit UI и обработкой дубликатов."""
+                combo_data = _session_section('combo')
             
-            if not combo_data['Combo_ID']:
-                st.error("❌ ID комбинации не может быть пустым")
-                return
+                if not combo_data['Combo_ID']:
+                    st.error("❌ ID комбинации не может быть пустым")
+                    return
             
-            result = self.db_manager.insert_sensor_combination(combo_data)
+                result = self._insert_section('combo', combo_data)
             
-            # Обработка результата в GUI слое
-            if result == "DUPLICATE":
-                st.warning(f"⚠️ Комбинация {combo_data['Combo_ID']} уже существует")
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    if st.button("✅ Перезаписать", key=f"overwrite_combo_ui_{combo_data['Combo_ID']}"):
-                        try:
-                            with get_connection() as conn:
-                                cur = conn.cursor()
-                                cur.execute("DELETE FROM SensorCombinations WHERE Combo_ID = ?", (combo_data['Combo_ID'],))
-                                conn.commit()
-                            inserted = self.db_manager.insert_sensor_combination(combo_data)
-                            if inserted is True:
-                                st.success("✅ Комбинация сенсора перезаписана")
-                            else:
-                                st.error("❌ Ошибка при перезаписи комбинации сенсора")
-                            st.rerun()
-                        except Exception as e:
-                            self.logger.exception("Ошибка перезаписи комбинации сенсора")
-                            st.error(f"❌ Ошибка: {e}")
-                with col2:
-                    if st.button("❌ Отмена", key=f"cancel_combo_ui_{combo_data['Combo_ID']}"):
-                        st.info("Операция отменена")
-            elif result is True:
-                st.success("✅ Комбинация сенсора сохранена")
-                self.logger.info(f"Комбинация сенсора {combo_data['Combo_ID']} сохранена")
-            else:
-                st.error("❌ Не удалось сохранить комбинацию сенсора")
+                # Обработка результата в GUI слое
+                if result == "UNCHANGED":
+                    st.info("ℹ️ Данные раздела не изменились с последнего сохранения")
+                elif result == "DUPLICATE":
+                    self._queue_overwrite('combo', combo_data)
+                elif result is True:
+                    st.success("✅ Комбинация сенсора сохранена")
+                    self.logger.info(f"Комбинация сенсора {combo_data['Combo_ID']} сохранена")
+                else:
+                    st.error("❌ Не удалось сохранить комбинацию сенсора")
                     
         except Exception as e:
             st.error(f"❌ Ошибка сохранения: {str(e)}")
+            # транзакция откатилась: отметки о сохранённых разделах недостоверны
+            st.session_state.pop('_saved_hashes', None)
             self.logger.error(f"Ошибка сохранения паспортов: {e}")
+        finally:
+            clear_read_caches()
+
+    def _insert_section(self, section, data):
+        """insert_* раздела паспорта; "UNCHANGED" без обращения к БД, если
+        данные не изменились с последнего успешного сохранения в этой сессии."""
+        saved = st.session_state.setdefault('_saved_hashes', {})
+        digest = _content_hash(data)
+        if saved.get(section) == digest:
+            return "UNCHANGED"
+        result = getattr(self.db_manager, _OVERWRITE_TARGETS[section][0])(data)
+        if result is True:
+            saved[section] = digest
+        return result
+
+    @staticmethod
+    def _queue_overwrite(section, data):
+        """Запись-дубликат ждёт решения «Перезаписать/Отмена» (см. _render_pending_overwrites)."""
+        # номер запроса в ключе виджета: новый дубликат того же раздела
+        # не унаследует выбор, сделанный для предыдущего
+        seq = st.session_state.get('overwrite_seq', 0) + 1
+        st.session_state['overwrite_seq'] = seq
+        st.session_state.setdefault('pending_overwrites', {})[section] = (seq, data)
+
+    def _render_pending_overwrites(self):
+        """Выбор «Перезаписать/Отмена» для дубликатов, найденных при сохранении паспорта.
+
+        Решение хранится в session_state и не теряется при перезапусках
+        скрипта до выбора; после выбора запись снимается с ожидания.
+        """
+        pending = st.session_state.get('pending_overwrites')
+        if not pending:
+            return
+        for section, (seq, data) in list(pending.items()):
+            method_name, label = _OVERWRITE_TARGETS[section]
+            entity_id = next(iter(data.values()))
+            choice = st.radio(
+                f"⚠️ {label} {entity_id} уже существует",
+                ["Перезаписать", "Отмена"],
+                index=None,
+                horizontal=True,
+                key=f"overwrite_choice_{section}_{seq}",
+            )
+            if choice is None:
+                continue
+            del pending[section]
+            if choice == "Отмена":
+                st.info("Операция отменена")
+                continue
+            # UPSERT: запись обновляется на месте одним выражением
+            if getattr(self.db_manager, method_name)(data, overwrite=True) is True:
+                st.session_state.setdefault('_saved_hashes', {})[section] = _content_hash(data)
+                clear_read_caches()
+                st.success(f"✅ {label} {entity_id} перезаписан(а)")
+            else:
+                st.error(f"❌ Ошибка при перезаписи: {label} {entity_id}")
 
     def normolize(self, value, kind=None):
         """Нормализация значения в диапазоне 0-1 в зависимости от типа характеристики."""
@@ -1622,10 +1173,17 @@ class BiosensorGUI:
     # Рассмотрение всех паспортов базы данных и создание комбинаций сенсоров
     def sythesize_sensor_combinations(self):
         """Синтез комбинаций сенсоров на основе всех паспортов в базе данных."""
-        analytes = self.db_manager.list_all_analytes()
-        bio_layers = self.db_manager.list_all_bio_recognition_layers()
-        immob_layers = self.db_manager.list_all_immobilization_layers()
-        mem_layers = self.db_manager.list_all_memristive_layers()
+        analytes = cached_list_all(self.db_manager, "list_all_analytes")
+        bio_layers = cached_list_all(self.db_manager, "list_all_bio_recognition_layers")
+        immob_layers = cached_list_all(self.db_manager, "list_all_immobilization_layers")
+        mem_layers = cached_list_all(self.db_manager, "list_all_memristive_layers")
+
+        # Полные записи слоёв — одним запросом на таблицу вместо четырёх
+        # get_*_by_id на каждую проверяемую комбинацию
+        analytes_by_id = self.db_manager.get_analytes_by_ids([a['TA_ID'] for a in analytes])
+        bio_by_id = self.db_manager.get_bio_recognition_layers_by_ids([b['BRE_ID'] for b in bio_layers])
+        immob_by_id = self.db_manager.get_immobilization_layers_by_ids([i['IM_ID'] for i in immob_layers])
+        mem_by_id = self.db_manager.get_memristive_layers_by_ids([m['MEM_ID'] for m in mem_layers])
 
         total_combinations = 0
         successful_combinations = 0
@@ -1640,7 +1198,13 @@ class BiosensorGUI:
                                 analyte['TA_ID'],
                                 bio_layer['BRE_ID'],
                                 immob_layer['IM_ID'],
-                                mem_layer['MEM_ID']
+                                mem_layer['MEM_ID'],
+                                layers=(
+                                    analytes_by_id.get(analyte['TA_ID']),
+                                    bio_by_id.get(bio_layer['BRE_ID']),
+                                    immob_by_id.get(immob_layer['IM_ID']),
+                                    mem_by_id.get(mem_layer['MEM_ID']),
+                                )
                             )
                             if result == True:
                                 successful_combinations += 1
@@ -1648,9 +1212,15 @@ class BiosensorGUI:
                             self.logger.error(f"Ошибка при создании комбинации: {e}")
 
         self.logger.info(f"Всего комбинаций: {total_combinations}, Успешных: {successful_combinations}")
+        if successful_combinations:
+            clear_read_caches()
         
-    def create_sensor_combination(self, analyte_id, bio_id, immob_id, mem_id):
-        """Создание комбинаций сенсоров на основе пересечения диапазонов pH и температур."""
+    def create_sensor_combination(self, analyte_id, bio_id, immob_id, mem_id, layers=None):
+        """Создание комбинаций сенсоров на основе пересечения диапазонов pH и температур.
+
+        layers — уже загруженные записи (аналит, биослой, иммобилизация, мемристор);
+        если не переданы, загружаются по ID.
+        """
 
         # Установка диапазонов для условий совместимости
         MP_ADD = 0.5  # ГПа
@@ -1663,10 +1233,14 @@ class BiosensorGUI:
 
         try:
             # Загрузка одного паспорта каждого типа
-            analyte = self.db_manager.get_analyte_by_id(analyte_id)  # Укажите ID аналита
-            bio_layer = self.db_manager.get_bio_recognition_layer_by_id(bio_id)  # Укажите ID биослоя
-            immob_layer = self.db_manager.get_immobilization_layer_by_id(immob_id)  # Укажите ID иммобилизации
-            mem_layer = self.db_manager.get_memristive_layer_by_id(mem_id)  # Укажите ID мемристора
+            if layers is None:
+                layers = (
+                    self.db_manager.get_analyte_by_id(analyte_id),  # Укажите ID аналита
+                    self.db_manager.get_bio_recognition_layer_by_id(bio_id),  # Укажите ID биослоя
+                    self.db_manager.get_immobilization_layer_by_id(immob_id),  # Укажите ID иммобилизации
+                    self.db_manager.get_memristive_layer_by_id(mem_id),  # Укажите ID мемристора
+                )
+            analyte, bio_layer, immob_layer, mem_layer = layers
 
             # Проверка наличия всех данных
             if not (analyte and bio_layer and immob_layer and mem_layer):
@@ -1883,10 +1457,35 @@ class BiosensorGUI:
     
     def load_passport_from_db_streamlit(self):
         st.subheader("📁 Загрузить паспорт из БД")
+
+        # Паспорт целиком: слои комбинации читаются одним снимком БД
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            combo_id = st.text_input("ID комбинации", key="load_combo_id")
+        with col2:
+            load_full = st.button("Загрузить паспорт целиком", key="load_full_btn", width="stretch")
+        if load_full:
+            combo = self.db_manager.get_sensor_combination_by_id(combo_id) if combo_id else None
+            if combo is None:
+                st.error(f"❌ Комбинация с ID '{combo_id}' не найдена")
+            else:
+                passport = self.db_manager.get_full_passport(
+                    combo['TA_ID'], combo['BRE_ID'], combo['IM_ID'], combo['MEM_ID']
+                )
+                _fill_session_section('combo', combo)
+                for section, data in passport.items():
+                    if data:
+                        _fill_session_section(section, data)
+                missing = [section for section, data in passport.items() if not data]
+                if missing:
+                    st.warning(f"⚠️ Не найдены слои: {', '.join(missing)}")
+                st.success(f"✅ Паспорт комбинации '{combo_id}' загружен!")
+
+        st.divider()
         
         col1, col2 = st.columns(2)
         with col1:
-            datatype = st.selectbox("Выберите тип слоя", ["TA", "BRE", "IM", "MEM"], key="load_datatype")
+            datatype = st.selectbox("Выберите тип слоя", list(_LOAD_DISPATCH), key="load_datatype")
         with col2:
             layer_id = st.text_input("ID слоя", key="load_layer_id")
         
@@ -1896,92 +1495,13 @@ class BiosensorGUI:
                 return
             
             try:
-                if datatype == "TA":
-                    data = self.db_manager.get_analyte_by_id(layer_id)
-                    if data:
-                        # ✅ ПРАВИЛЬНЫЕ КЛЮЧИ (соответствуют key= в create_data_entry_tab)
-                        st.session_state['analyte_ta_id'] = data.get('TA_ID', '')
-                        st.session_state['analyte_ta_name'] = data.get('TA_Name', '')
-                        st.session_state['analyte_ph_min'] = data.get('PH_Min', 0)
-                        st.session_state['analyte_ph_max'] = data.get('PH_Max', 0)
-                        st.session_state['analyte_t_max'] = data.get('T_Max', 0)
-                        st.session_state['analyte_stability'] = data.get('ST', 0)
-                        st.session_state['analyte_half_life'] = data.get('HL', 0)
-                        st.session_state['analyte_power_consumption'] = data.get('PC', 0)
-                        
-                        st.success(f"✅ Паспорт TA '{data.get('TA_Name', 'Без названия')}' загружен!")
-                    else:
-                        st.error(f"❌ Паспорт с ID '{layer_id}' не найден")
-                        
-                elif datatype == "BRE":
-                    data = self.db_manager.get_bio_recognition_layer_by_id(layer_id)
-                    if data:
-                        st.session_state['bio_bre_id'] = data.get('BRE_ID', '')
-                        st.session_state['bio_bre_name'] = data.get('BRE_Name', '')
-                        st.session_state['bio_ph_min'] = data.get('PH_Min', 0)
-                        st.session_state['bio_ph_max'] = data.get('PH_Max', 0)
-                        st.session_state['bio_t_min'] = data.get('T_Min', 0)
-                        st.session_state['bio_t_max'] = data.get('T_Max', 0)
-                        st.session_state['bio_sensitivity'] = data.get('SN', 0)
-                        st.session_state['bio_dr_min'] = data.get('DR_Min', 0)
-                        st.session_state['bio_dr_max'] = data.get('DR_Max', 0)
-                        st.session_state['bio_reproducibility'] = data.get('RP', 0)
-                        st.session_state['bio_response_time'] = data.get('TR', 0)
-                        st.session_state['bio_stability'] = data.get('ST', 0)
-                        st.session_state['bio_lod'] = data.get('LOD', 0)
-                        st.session_state['bio_durability'] = data.get('HL', 0)
-                        st.session_state['bio_power_consumption'] = data.get('PC', 0)
-                        
-                        st.success(f"✅ Паспорт BRE '{data.get('BRE_Name', 'Без названия')}' загружен!")
-                    else:
-                        st.error(f"❌ Паспорт с ID '{layer_id}' не найден")
-                        
-                elif datatype == "IM":
-                    data = self.db_manager.get_immobilization_layer_by_id(layer_id)
-                    if data:
-                        st.session_state['immob_im_id'] = data.get('IM_ID', '')
-                        st.session_state['immob_im_name'] = data.get('IM_Name', '')
-                        st.session_state['immob_ph_min'] = data.get('PH_Min', 0)
-                        st.session_state['immob_ph_max'] = data.get('PH_Max', 0)
-                        st.session_state['immob_t_min'] = data.get('T_Min', 0)
-                        st.session_state['immob_t_max'] = data.get('T_Max', 0)
-                        st.session_state['immob_young_modulus'] = data.get('MP', 0)
-                        st.session_state['immob_adhesion'] = data.get('Adh', 'средняя')
-                        st.session_state['immob_solubility'] = data.get('Sol', 'средняя')
-                        st.session_state['immob_loss_coefficient'] = data.get('K_IM', 0)
-                        st.session_state['immob_reproducibility'] = data.get('RP', 0)
-                        st.session_state['immob_response_time'] = data.get('TR', 0)
-                        st.session_state['immob_stability'] = data.get('ST', 0)
-                        st.session_state['immob_durability'] = data.get('HL', 0)
-                        st.session_state['immob_power_consumption'] = data.get('PC', 0)
-                        
-                        st.success(f"✅ Паспорт IM '{data.get('IM_Name', 'Без названия')}' загружен!")
-                    else:
-                        st.error(f"❌ Паспорт с ID '{layer_id}' не найден")
-                        
-                elif datatype == "MEM":
-                    data = self.db_manager.get_memristive_layer_by_id(layer_id)
-                    if data:
-                        st.session_state['mem_mem_id'] = data.get('MEM_ID', '')
-                        st.session_state['mem_mem_name'] = data.get('MEM_Name', '')
-                        st.session_state['mem_ph_min'] = data.get('PH_Min', 0)
-                        st.session_state['mem_ph_max'] = data.get('PH_Max', 0)
-                        st.session_state['mem_t_min'] = data.get('T_Min', 0)
-                        st.session_state['mem_t_max'] = data.get('T_Max', 0)
-                        st.session_state['mem_young_modulus'] = data.get('MP', 0)
-                        st.session_state['mem_sensitivity'] = data.get('SN', 0)
-                        st.session_state['mem_dr_min'] = data.get('DR_Min', 0)
-                        st.session_state['mem_dr_max'] = data.get('DR_Max', 0)
-                        st.session_state['mem_reproducibility'] = data.get('RP', 0)
-                        st.session_state['mem_response_time'] = data.get('TR', 0)
-                        st.session_state['mem_stability'] = data.get('ST', 0)
-                        st.session_state['mem_lod'] = data.get('LOD', 0)
-                        st.session_state['mem_durability'] = data.get('HL', 0)
-                        st.session_state['mem_power_consumption'] = data.get('PC', 0)
-                        
-                        st.success(f"✅ Паспорт MEM '{data.get('MEM_Name', 'Без названия')}' загружен!")
-                    else:
-                        st.error(f"❌ Паспорт с ID '{layer_id}' не найден")
+                method_name, section, name_col = _LOAD_DISPATCH[datatype]
+                data = getattr(self.db_manager, method_name)(layer_id)
+                if data:
+                    _fill_session_section(section, data)
+                    st.success(f"✅ Паспорт {datatype} '{data.get(name_col, 'Без названия')}' загружен!")
+                else:
+                    st.error(f"❌ Паспорт с ID '{layer_id}' не найден")
                         
             except Exception as e:
                 self.logger.error(f"Ошибка загрузки: {e}")
@@ -1989,277 +1509,165 @@ class BiosensorGUI:
         
         st.info("💡 После загрузки данные появятся в форме ввода. Нажмите на раздел '🔬 Ввод' в меню, чтобы увидеть загруженные значения.")
 
-    # streamlit
-    def show_analytes(self):
-        """Streamlit-версия: отображение аналитов с пагинацией."""
-        st.session_state['current_data_type'] = 'analytes'
-        # сброс на первую страницу при явном вызове
-        st.session_state.setdefault('current_page', 0)
-        page_size = st.session_state.get('page_size', self.page_size)
-        current_page = st.session_state.get('current_page', 0)
-        offset = current_page * page_size
-
-        analytes = self.db_manager.list_all_analytes_paginated(page_size, offset)
-
-        st.subheader("📋 Аналиты")
-        if analytes:
-            df = __import__('pandas').DataFrame(analytes)
-            # выводим только основные столбцы в удобном виде
-            cols = [c for c in ["TA_ID", "TA_Name", "PH_Min", "PH_Max", "T_Max", "ST"] if c in df.columns]
-            st.dataframe(df[cols], width="stretch")
+    def _show_keyset_table(self, data_type, page_size=None, empty_message=None):
+        """Страница таблицы data_type (см. _DATABASE_TABLES) с keyset-пагинацией.
+
+        Общая отрисовка show_* и вкладки «База данных»: заголовок, DataFrame
+        страницы и кнопки перехода. page_size по умолчанию — из
+        st.session_state['page_size'].
+        """
+        st.session_state['current_data_type'] = data_type
+        table_config, _, title, default_message = _DATABASE_TABLES[data_type]
+        state_key = f"{data_type}_page_cursors"
+        if page_size is None:
+            page_size = st.session_state['page_size']
+        df, current_page, has_next = self._keyset_page(data_type, page_size)
+
+        st.subheader(title)
+        if not df.empty:
+            # столбцы кадра — select_cols таблицы (*_LIST_COLUMNS в db.manager),
+            # отбирать основные столбцы при каждой перерисовке не нужно
+            st.dataframe(df, width="stretch")
         else:
-            st.info("Нет записей аналитов для отображения.")
+            st.info(empty_message or default_message)
 
-        # Пагинация
+        # Пагинация. Переход по страницам — в on_click: курсор меняется до
+        # перезапуска, повторный st.rerun() не нужен
         st.divider()
         col_prev, col_page, col_next = st.columns([1, 1, 1])
         with col_prev:
-            if st.button("◀ Предыдущая", key="analytes_prev", disabled=(current_page == 0)):
-                st.session_state['current_page'] = max(0, current_page - 1)
-                st.rerun()
+            st.button(
+                "◀ Предыдущая", key=f"{data_type}_prev", width="stretch", disabled=(current_page == 0),
+                on_click=self._keyset_prev, args=(state_key,),
+            )
         with col_page:
-            st.markdown(f"**Страница {current_page + 1}**")
+            page_count = max(1, -(-self.db_manager.count_rows(table_config) // page_size))
+            st.markdown(f"**Страница {current_page + 1} из {page_count}**")
         with col_next:
-            if st.button("Следующая ▶", key="analytes_next", disabled=(len(analytes) < page_size)):
-                st.session_state['current_page'] = current_page + 1
-                st.rerun()
+            st.button(
+                "Следующая ▶", key=f"{data_type}_next", width="stretch", disabled=not has_next,
+                on_click=self._keyset_next, args=(state_key, table_config, df),
+            )
 
     # streamlit
-    def show_bio_layers(self):
-        """Streamlit-версия: отображение биораспознающих слоев с пагинацией."""
-        st.session_state['current_data_type'] = 'bio_layers'
-        st.session_state.setdefault('current_page', 0)
-        page_size = st.session_state.get('page_size', self.page_size)
-        current_page = st.session_state.get('current_page', 0)
-        offset = current_page * page_size
-
-        bio_layers = self.db_manager.list_all_bio_recognition_layers_paginated(page_size, offset)
-
-        st.subheader("🔴 Биораспознающие слои")
-        if bio_layers:
-            import pandas as pd
-            df = pd.DataFrame(bio_layers)
-            cols = [c for c in ["BRE_ID", "BRE_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "SN"] if c in df.columns]
-            st.dataframe(df[cols], width="stretch")
-        else:
-            st.info("Нет записей биораспознающих слоев для отображения.")
+    def show_analytes(self):
+        """Streamlit-версия: отображение аналитов с keyset-пагинацией."""
+        self._show_keyset_table('analytes')
 
-        st.divider()
-        col_prev, col_page, col_next = st.columns([1, 1, 1])
-        with col_prev:
-            if st.button("◀ Предыдущая", key="bio_prev", disabled=(current_page == 0)):
-                st.session_state['current_page'] = max(0, current_page - 1)
-                st.rerun()
-        with col_page:
-            st.markdown(f"**Страница {current_page + 1}**")
-        with col_next:
-            if st.button("Следующая ▶", key="bio_next", disabled=(len(bio_layers) < page_size)):
-                st.session_state['current_page'] = current_page + 1
-                st.rerun()
+    # streamlit
+    def show_bio_layers(self):
+        """Streamlit-версия: отображение биораспознающих слоев с keyset-пагинацией."""
+        self._show_keyset_table('bio_layers')
 
     # streamlit
     def show_immobilization_layers(self):
-        """Streamlit-версия: отображение иммобилизационных слоев с пагинацией."""
-        st.session_state['current_data_type'] = 'immobilization_layers'
-        st.session_state.setdefault('current_page', 0)
-        page_size = st.session_state.get('page_size', self.page_size)
-        current_page = st.session_state.get('current_page', 0)
-        offset = current_page * page_size
-
-        im_layers = self.db_manager.list_all_immobilization_layers_paginated(page_size, offset)
-
-        st.subheader("🟡 Иммобилизационные слои")
-        if im_layers:
-            import pandas as pd
-            df = pd.DataFrame(im_layers)
-            cols = [c for c in ["IM_ID", "IM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "MP"] if c in df.columns]
-            st.dataframe(df[cols], width="stretch")
-        else:
-            st.info("Нет записей иммобилизационных слоев для отображения.")
-
-        st.divider()
-        col_prev, col_page, col_next = st.columns([1, 1, 1])
-        with col_prev:
-            if st.button("◀ Предыдущая", key="immob_prev", disabled=(current_page == 0)):
-                st.session_state['current_page'] = max(0, current_page - 1)
-                st.rerun()
-        with col_page:
-            st.markdown(f"**Страница {current_page + 1}**")
-        with col_next:
-            if st.button("Следующая ▶", key="immob_next", disabled=(len(im_layers) < page_size)):
-                st.session_state['current_page'] = current_page + 1
-                st.rerun()
+        """Streamlit-версия: отображение иммобилизационных слоев с keyset-пагинацией."""
+        self._show_keyset_table('immobilization_layers')
 
     # streamlit
     def show_memristive_layers(self):
-        """Streamlit-версия: отображение мемристивных слоев с пагинацией."""
-        st.session_state['current_data_type'] = 'memristive_layers'
-        st.session_state.setdefault('current_page', 0)
-        page_size = st.session_state.get('page_size', self.page_size)
-        current_page = st.session_state.get('current_page', 0)
-        offset = current_page * page_size
-
-        mem_layers = self.db_manager.list_all_memristive_layers_paginated(page_size, offset)
-
-        st.subheader("🟣 Мемристивные слои")
-        if mem_layers:
-            import pandas as pd
-            df = pd.DataFrame(mem_layers)
-            cols = [c for c in ["MEM_ID", "MEM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "SN"] if c in df.columns]
-            st.dataframe(df[cols], width="stretch")
-        else:
-            st.info("Нет записей мемристивных слоёв для отображения.")
-
-        st.divider()
-        col_prev, col_page, col_next = st.columns([1, 1, 1])
-        with col_prev:
-            if st.button("◀ Предыдущая", key="mem_prev", disabled=(current_page == 0)):
-                st.session_state['current_page'] = max(0, current_page - 1)
-                st.rerun()
-        with col_page:
-            st.markdown(f"**Страница {current_page + 1}**")
-        with col_next:
-            if st.button("Следующая ▶", key="mem_next", disabled=(len(mem_layers) < page_size)):
-                st.session_state['current_page'] = current_page + 1
-                st.rerun()
+        """Streamlit-версия: отображение мемристивных слоев с keyset-пагинацией."""
+        self._show_keyset_table('memristive_layers')
 
     # streamlit version
     def refresh_data(self):
         """Обновление данных в зависимости от текущего типа (Streamlit)."""
-        current = st.session_state.get('current_data_type', getattr(self, 'current_data_type', 'analytes'))
-        # гарантируем наличие номера страницы
-        st.session_state.setdefault('current_page', 0)
-
-        if current == 'analytes':
-            self.show_analytes()
-        elif current == 'bio_layers':
-            self.show_bio_layers()
-        elif current == 'immobilization_layers':
-            self.show_immobilization_layers()
-        elif current == 'memristive_layers':
-            self.show_memristive_layers()
-        else:
-            st.info("Тип данных не выбран или неизвестен")
+        current = st.session_state['current_data_type']
 
-    # streamlit version
-    def update_pagination_buttons(self):
-        """Streamlit: отрисовать кнопки пагинации и номер страницы."""
-        page = st.session_state.get('current_page', 0)
-        page_size = st.session_state.get('page_size', self.page_size)
-        data_type = st.session_state.get('current_data_type', 'analytes')
-
-        # Определяем функцию получения данных для текущего типа
-        table_map = {
-            'analytes': self.db_manager.list_all_analytes_paginated,
-            'bio_layers': self.db_manager.list_all_bio_recognition_layers_paginated,
-            'immobilization_layers': self.db_manager.list_all_immobilization_layers_paginated,
-            'memristive_layers': self.db_manager.list_all_memristive_layers_paginated,
-            'sensor_combinations': self.db_manager.list_all_sensor_combinations_paginated
-        }
-        fetch_fn = table_map.get(data_type)
-        # Проверяем наличие следующей страницы (запрашиваем текущую страницу данных)
-        if fetch_fn:
-            rows = fetch_fn(page_size, page * page_size)
+        if current in _DATABASE_TABLES:
+            self._show_keyset_table(current)
         else:
-            rows = []
-
-        disabled_prev = (page == 0)
-        disabled_next = (len(rows) < page_size)
-
-        col_prev, col_label, col_next = st.columns([1, 1, 1])
-        with col_prev:
-            if st.button("◀ Предыдущая", key=f"prev_{data_type}", disabled=disabled_prev, width="stretch"):
-                st.session_state['current_page'] = max(0, page - 1)
-                st.rerun()
-        with col_label:
-            st.markdown(f"**Страница {page + 1}**")
-        with col_next:
-            if st.button("Следующая ▶", key=f"next_{data_type}", disabled=disabled_next, width="stretch"):
-                st.session_state['current_page'] = page + 1
-                st.rerun()
-    
-    # streamlit version
-    def prev_page(self):
-        """Streamlit: переход на предыдущую страницу."""
-        page = st.session_state.get('current_page', 0)
-        if page > 0:
-            st.session_state['current_page'] = page - 1
-            st.rerun()
+            st.info("Тип данных не выбран или неизвестен")
 
-    # streamlit version
-    def next_page(self):
-        """Streamlit: переход на следующую страницу."""
-        page = st.session_state.get('current_page', 0)
-        st.session_state['current_page'] = page + 1
-        st.rerun()
-        
     def computing_combinations(self):
         """рассчет и сохранение комбинаций сенсоров"""
-        analytes = self.db_manager.list_all_analytes()
-        bio_layers = self.db_manager.list_all_bio_recognition_layers()
-        im_layers = self.db_manager.list_all_immobilization_layers()
-        mem_layers = self.db_manager.list_all_memristive_layers()
+        analytes = cached_list_all(self.db_manager, "list_all_analytes")
+        bio_layers = cached_list_all(self.db_manager, "list_all_bio_recognition_layers")
+        im_layers = cached_list_all(self.db_manager, "list_all_immobilization_layers")
+        mem_layers = cached_list_all(self.db_manager, "list_all_memristive_layers")
 
     # streamlit version
     def show_best_combinations(self):
         """Отображение лучших комбинаций сенсоров."""
-        st.session_state.analysis_result = "=== ЛУЧШИЕ КОМБИНАЦИИ БИОСЕНСОРОВ ===\n\n"
+        # В текст — только сводка; сами комбинации выводятся таблицей
+        # (_render_best_combinations) порциями по Score, а не все сразу
+        combo_count = self.db_manager.count_rows(TableConfig.SENSOR_COMBINATIONS)
         
-        # Получение всех комбинаций
-        sensor_combinations = self.db_manager.list_all_sensor_combinations()
-        
-        if sensor_combinations:
-            for combo in sensor_combinations:
-                combo_info = f"""
-Комбинация: {combo.get('Combo_ID', 'N/A')}
-├─ Аналит: {combo.get('TA_ID', 'N/A')}
-├─ Биослой: {combo.get('BRE_ID', 'N/A')}
-├─ Иммобилизация: {combo.get('IM_ID', 'N/A')}
-├─ Мемристивный слой: {combo.get('MEM_ID', 'N/A')}
-└─ Оценка: {combo.get('Score', 'N/A')}"""
-                st.session_state.analysis_result += combo_info + "\n"
+        if combo_count:
+            st.session_state.analysis_result = (
+                "=== ЛУЧШИЕ КОМБИНАЦИИ БИОСЕНСОРОВ ===\n\n"
+                f"Всего комбинаций: {combo_count}"
+            )
+            st.session_state['best_combinations'] = {'rows': [], 'has_more': True}
+            self._load_more_best_combinations()
+            st.session_state['show_best_table'] = True
             st.success("✅ Анализ завершен!")
         else:
-            st.session_state.analysis_result += "Нет комбинаций в базе данных."
+            st.session_state.analysis_result = "=== ЛУЧШИЕ КОМБИНАЦИИ БИОСЕНСОРОВ ===\n\nНет комбинаций в базе данных."
+            st.session_state['show_best_table'] = False
             st.info("ℹ️ Сначала создайте комбинации сенсоров.")
 
+    def _load_more_best_combinations(self):
+        """Догрузка следующей порции лучших комбинаций (keyset по (Score, Combo_ID)).
+
+        Запрашивается на строку больше порции: лишняя строка только
+        показывает, есть ли что догружать.
+        """
+        state = st.session_state['best_combinations']
+        rows = state['rows']
+        after = (rows[-1]['Score'], rows[-1]['Combo_ID']) if rows else None
+        batch = self.db_manager.list_top_sensor_combinations(BEST_COMBINATIONS_PAGE + 1, after)
+        state['has_more'] = len(batch) > BEST_COMBINATIONS_PAGE
+        rows.extend(batch[:BEST_COMBINATIONS_PAGE])
+
+    def _render_best_combinations(self):
+        """Таблица лучших комбинаций (st.dataframe) под результатами анализа."""
+        state = st.session_state['best_combinations']
+        st.subheader("🏆 Лучшие комбинации сенсоров")
+        st.dataframe(
+            pd.DataFrame(state['rows'], columns=TableConfig.SENSOR_COMBINATIONS["select_cols"]),
+            width="stretch",
+        )
+        st.button(
+            "Показать ещё", key="best_combinations_more", disabled=not state['has_more'],
+            on_click=self._load_more_best_combinations,
+        )
+
     # streamlit version
     def comparative_analysis(self):
         """Выполнение сравнительного анализа."""
         st.session_state.analysis_result = "=== СРАВНИТЕЛЬНЫЙ АНАЛИЗ ===\n\n"
         
         try:
-            # Подсчет записей в каждой таблице
-            analytes = self.db_manager.list_all_analytes()
-            bio_layers = self.db_manager.list_all_bio_recognition_layers()
-            im_layers = self.db_manager.list_all_immobilization_layers()
-            mem_layers = self.db_manager.list_all_memristive_layers()
+            # Число записей и первые 3 строки каждой таблицы — COUNT(*) и
+            # LIMIT 3 вместо выборки таблиц целиком
+            analytes_count, analytes = self.db_manager.count_and_head(TableConfig.ANALYTES)
+            bio_count, bio_layers = self.db_manager.count_and_head(TableConfig.BIO_RECOGNITION)
+            im_count, im_layers = self.db_manager.count_and_head(TableConfig.IMMOBILIZATION)
+            mem_count, mem_layers = self.db_manager.count_and_head(TableConfig.MEMRISTIVE)
             
-            analysis_text = f"""
+            parts = [f"""
                 Сравнение составных частей биосенсоров:
 
-                📋 АНАЛИТЫ: {len(analytes)} записей
+                📋 АНАЛИТЫ: {analytes_count} записей
                 {'-' * 40}
-                """
-            for analyte in analytes[:3]:  # Показываем первые 3
-                analysis_text += f"  • {analyte.get('TA_Name', 'N/A')} (pH: {analyte.get('PH_Min')}-{analyte.get('PH_Max')})\n"
+                """]
+            for analyte in analytes:  # Показываем первые 3
+                parts.append(f"  • {analyte.get('TA_Name', 'N/A')} (pH: {analyte.get('PH_Min')}-{analyte.get('PH_Max')})\n")
             
-            analysis_text += f"\n🔴 БИОРАСПОЗНАЮЩИЕ СЛОИ: {len(bio_layers)} записей\n"
-            analysis_text += f"{'-' * 40}\n"
-            for bio in bio_layers[:3]:  # Показываем первые 3
-                analysis_text += f"  • {bio.get('BRE_Name', 'N/A')} (Чувствительность: {bio.get('SN')})\n"
+            parts.append(f"\n🔴 БИОРАСПОЗНАЮЩИЕ СЛОИ: {bio_count} записей\n{'-' * 40}\n")
+            for bio in bio_layers:  # Показываем первые 3
+                parts.append(f"  • {bio.get('BRE_Name', 'N/A')} (Чувствительность: {bio.get('SN')})\n")
             
-            analysis_text += f"\n🟡 ИММОБИЛИЗАЦИОННЫЕ СЛОИ: {len(im_layers)} записей\n"
-            analysis_text += f"{'-' * 40}\n"
-            for im in im_layers[:3]:  # Показываем первые 3
-                analysis_text += f"  • {im.get('IM_Name', 'N/A')} (Модуль: {im.get('MP')})\n"
+            parts.append(f"\n🟡 ИММОБИЛИЗАЦИОННЫЕ СЛОИ: {im_count} записей\n{'-' * 40}\n")
+            for im in im_layers:  # Показываем первые 3
+                parts.append(f"  • {im.get('IM_Name', 'N/A')} (Модуль: {im.get('MP')})\n")
             
-            analysis_text += f"\n🟣 МЕМРИСТИВНЫЕ СЛОИ: {len(mem_layers)} записей\n"
-            analysis_text += f"{'-' * 40}\n"
-            for mem in mem_layers[:3]:  # Показываем первые 3
-                analysis_text += f"  • {mem.get('MEM_Name', 'N/A')} (Чувствительность: {mem.get('SN')})\n"
+            parts.append(f"\n🟣 МЕМРИСТИВНЫЕ СЛОИ: {mem_count} записей\n{'-' * 40}\n")
+            for mem in mem_layers:  # Показываем первые 3
+                parts.append(f"  • {mem.get('MEM_Name', 'N/A')} (Чувствительность: {mem.get('SN')})\n")
             
-            st.session_state.analysis_result = analysis_text
+            st.session_state.analysis_result = "".join(parts)
             st.success("✅ Сравнительный анализ завершен!")
         
         except Exception as e:
@@ -2267,27 +1675,16 @@ class BiosensorGUI:
             st.error("❌ Ошибка при выполнении анализа")
 
     # streamlit version
-    @staticmethod
-    def show_statistics():
+    def show_statistics(self):
         """Отображение статистики базы данных."""
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("SELECT COUNT(*) FROM Analytes")
-                analytes_count = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(*) FROM BioRecognitionLayers")
-                bio_count = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(*) FROM ImmobilizationLayers")
-                immob_count = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(*) FROM MemristiveLayers")
-                mem_count = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(*) FROM SensorCombinations")
-                combo_count = cursor.fetchone()[0]
+            # все COUNT(*) — одним запросом, повторно — из кэша до записи в БД
+            counts = cached_table_counts(self.db_manager, self.db_manager.cache_version())
+            analytes_count = counts["Analytes"]
+            bio_count = counts["BioRecognitionLayers"]
+            immob_count = counts["ImmobilizationLayers"]
+            mem_count = counts["MemristiveLayers"]
+            combo_count = counts["SensorCombinations"]
             
             stats = f"""=== СТАТИСТИКА БАЗЫ ДАННЫХ ===
 
@@ -2325,57 +1722,39 @@ class BiosensorGUI:
 
         if st.button("Экспортировать"):
             try:
-                import pandas as pd
-                import io
                 import zipfile
                 from datetime import datetime
 
-                def fetch_table(key):
-                    if key == "analytes":
-                        return self.db_manager.list_all_analytes()
-                    if key == "bio_recognition":
-                        return self.db_manager.list_all_bio_recognition_layers()
-                    if key == "immobilization":
-                        return self.db_manager.list_all_immobilization_layers()
-                    if key == "memristive":
-                        return self.db_manager.list_all_memristive_layers()
-                    if key == "sensor_combinations":
-                        return self.db_manager.list_all_sensor_combinations()
-                    return {}
-
+                # Строки пишутся в файл порциями прямо из курсора БД: без
+                # списков словарей и DataFrame всей таблицы
                 ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
 
                 if choice == "all":
-                    tables = {
-                        "analytes": fetch_table("analytes"),
-                        "bio_recognition": fetch_table("bio_recognition"),
-                        "immobilization": fetch_table("immobilization"),
-                        "memristive": fetch_table("memristive"),
-                        "sensor_combinations": fetch_table("sensor_combinations"),
+                    # таблицы выгружаются параллельно в пуле чтения db_manager
+                    # (у каждого потока своё соединение), затем собираются в файл
+                    futures = {
+                        name: self.db_manager.submit_read(_export_bytes, self.db_manager, table_config, fmt)
+                        for name, table_config in _EXPORT_TABLES.items()
                     }
+                    parts = {name: future.result() for name, future in futures.items()}
                     if fmt == "json":
-                        payload = json.dumps(tables, ensure_ascii=False, indent=2).encode("utf-8")
-                        filename = f"all_data_{ts}.json"
-                        st.download_button("Скачать JSON", data=payload, file_name=filename, mime="application/json")
+                        payload = b"{" + b",".join(
+                            f"\n{json.dumps(name)}: ".encode("utf-8") + part for name, part in parts.items()
+                        ) + b"\n}"
+                        st.download_button("Скачать JSON", data=payload, file_name=f"all_data_{ts}.json", mime="application/json")
                     else:
                         buf = io.BytesIO()
                         with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-                            for name, rows in tables.items():
-                                df = pd.DataFrame(rows)
-                                zf.writestr(f"{name}.csv", df.to_csv(index=False).encode("utf-8-sig"))
+                            for name, part in parts.items():
+                                zf.writestr(f"{name}.csv", part)
                         buf.seek(0)
                         st.download_button("Скачать ZIP с CSV", data=buf, file_name=f"all_data_{ts}.zip", mime="application/zip")
                 else:
-                    rows = fetch_table(choice)
+                    payload = _export_bytes(self.db_manager, _EXPORT_TABLES[choice], fmt)
                     if fmt == "json":
-                        payload = json.dumps(rows, ensure_ascii=False, indent=2).encode("utf-8")
-                        filename = f"{choice}_{ts}.json"
-                        st.download_button("Скачать JSON", data=payload, file_name=filename, mime="application/json")
+                        st.download_button("Скачать JSON", data=payload, file_name=f"{choice}_{ts}.json", mime="application/json")
                     else:
-                        df = pd.DataFrame(rows)
-                        csv_bytes = df.to_csv(index=False).encode("utf-8-sig")
-                        filename = f"{choice}_{ts}.csv"
-                        st.download_button("Скачать CSV", data=csv_bytes, file_name=filename, mime="text/csv")
+                        st.download_button("Скачать CSV", data=payload, file_name=f"{choice}_{ts}.csv", mime="text/csv")
 
                 st.success("✅ Экспорт выполнен")
             except Exception as e:
@@ -2401,11 +1780,6 @@ class BiosensorGUI:
             ta_id = st.session_state['analyte_ta_id']
             print("Значение переменной:", ta_id)
 
-        # ✅ Инициализируем session_state с помощью setdefault()
-        # st.session_state.setdefault('active_section', 'data_entry')
-        if 'active_section' not in st.session_state:
-            st.session_state['active_section'] = 'data_entry'
-
         # ✅ Создаём меню в боковой панели
         self.create_menu()
         
@@ -2435,6 +1809,10 @@ class BiosensorGUI:
             st.header("🔬 Ввод паспортов")
             self.create_data_entry_tab()
 
+        # Дубликаты, ожидающие решения о перезаписи: после раздела, чтобы
+        # найденные при сохранении в этом же запуске сразу были видны
+        self._render_pending_overwrites()
+
         if 'analyte_ta_id' in st.session_state:
             ta_id = st.session_state['analyte_ta_id']
             print("Значение переменной:", ta_id)
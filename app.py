@@ -24,11 +24,17 @@ from utils.logging_config import setup_logging
 import logging
 
 
+@st.cache_resource
+def get_db_manager() -> DatabaseManager:
+    """Один DatabaseManager на процесс: соединения и кэши общие для всех сессий."""
+    return DatabaseManager()
+
+
 def init_session():
     """Инициализация session_state один раз"""
     if "db" not in st.session_state:
         try:
-            st.session_state.db = DatabaseManager()
+            st.session_state.db = get_db_manager()
         except DatabaseConnectionError as e:
             st.error(f"❌ Не удалось подключиться к БД: {e}")
             st.stop()
@@ -66,15 +72,13 @@ def show_data_entry_page(service: PassportService):
             # Есть дубликаты
             action = show_duplicate_dialog(result[1])
             if action == "OVERWRITE":
-                for entity_name, entity_id in result[1]:
-                    service.overwrite_entity(entity_name.lower(), entity_id)
-                
-                # Повторная попытка сохранения
+                # Повторное сохранение с обновлением записей на месте
                 ok, msg = service.save_passport(
                     analyte=analyte,
                     bio_layer=bio_layer,
                     immobilization_layer=immob_layer,
                     memristive_layer=mem_layer,
+                    overwrite=True,
                 )
                 if ok:
                     st.success(msg)
@@ -1,9 +1,17 @@
 # db/manager.py
+import atexit
+import re
 import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from enum import Enum
-from typing import Dict, Any, List
-import logging
 from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterator, List, Tuple
+import logging
 
 from db.exceptions import DatabaseConnectionError, DatabaseIntegrityError
 from db.migrations import MigrationManager, ALL_MIGRATIONS
@@ -14,19 +22,206 @@ DB_NAME = "memristive_biosensor.db"
 
 logger = logging.getLogger(__name__)
 
-def get_connection():
-    conn = sqlite3.connect(DB_NAME)
-    conn.execute("PRAGMA foreign_keys = ON")
+# PRAGMA уровня соединения (journal_mode=WAL хранится в файле БД и
+# включается один раз в DatabaseManager.__init__)
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",     # в WAL достаточно fsync на checkpoint
+    "PRAGMA temp_store = MEMORY",      # сортировки/временные таблицы без файлов
+    "PRAGMA cache_size = -65536",      # 64 MiB
+    # Верхняя граница отображения; реально отображается не больше размера
+    # файла БД, так что запас не стоит памяти
+    "PRAGMA mmap_size = 1073741824",   # 1 GiB
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Размер кэша подготовленных выражений sqlite3 на соединение (по умолчанию
+# 128): с запасом вмещает все INSERT/UPSERT, SELECT списков, страниц и
+# проверок существования, так что горячие запросы не вытесняются
+STATEMENT_CACHE_SIZE = 256
+
+# Максимум параметров в одном запросе IN (...) (исторический лимит
+# SQLITE_MAX_VARIABLE_NUMBER); более длинные списки ID делятся на части
+MAX_SQL_PARAMS = 999
+
+# Размер порции fetchmany() при потоковом чтении (iter_row_batches)
+FETCH_BATCH_SIZE = 500
+
+# Время жизни закэшированных результатов list_all_* (секунды)
+QUERY_CACHE_TTL = 60
+
+# Максимум записей в кэше запросов: при переполнении вытесняются самые
+# старые (get_*_by_id кэширует по записи на каждый запрошенный ID)
+QUERY_CACHE_MAX_ENTRIES = 1024
+
+# Потоки фоновой предзагрузки страниц (prefetch)
+PREFETCH_WORKERS = 2
+
+# С этого числа строк пакетная вставка удаляет вторичные индексы таблицы и
+# строит их заново после загрузки (одна сортировка вместо обновления
+# B-дерева индекса на каждую строку)
+BULK_INDEX_REBUILD_THRESHOLD = 10_000
+
+# Период фонового PRAGMA optimize (секунды)
+OPTIMIZE_INTERVAL = 15 * 60
+
+_INSERT_TARGET_RE = re.compile(r"INSERT\s+INTO\s+(\w+)", re.IGNORECASE)
+
+def get_connection(db_name: str = DB_NAME, **connect_kwargs):
+    conn = sqlite3.connect(db_name, cached_statements=STATEMENT_CACHE_SIZE, **connect_kwargs)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
+def _rows_to_dicts(columns: Tuple[str, ...], rows: List[tuple]) -> List[Dict[str, Any]]:
+    """Строки-кортежи в словари по заранее известным именам столбцов."""
+    return [dict(zip(columns, row)) for row in rows]
+
+def _tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """Курсор без row_factory соединения: строки — простые кортежи."""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor
+
+# --- SQL и столбцы таблиц ---
+# Константы уровня модуля: текст запроса — ключ кэша подготовленных
+# выражений sqlite3, по нему же определяется таблица для инвалидации кэша.
+ANALYTE_COLUMNS = ("TA_ID", "TA_Name", "PH_Min", "PH_Max", "T_Max", "ST", "HL", "PC")
+BIO_RECOGNITION_COLUMNS = (
+    "BRE_ID", "BRE_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "SN",
+    "DR_Min", "DR_Max", "RP", "TR", "ST", "LOD", "HL", "PC",
+)
+IMMOBILIZATION_COLUMNS = (
+    "IM_ID", "IM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "MP",
+    "Adh", "Sol", "K_IM", "RP", "TR", "ST", "HL", "PC",
+)
+MEMRISTIVE_COLUMNS = (
+    "MEM_ID", "MEM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "MP", "SN",
+    "DR_Min", "DR_Max", "RP", "TR", "ST", "LOD", "HL", "PC",
+)
+SENSOR_COMBINATION_COLUMNS = (
+    "Combo_ID", "TA_ID", "BRE_ID", "IM_ID", "MEM_ID", "SN_total", "TR_total", "ST_total",
+    "RP_total", "LOD_total", "DR_total", "HL_total", "PC_total", "Score", "created_at",
+)
+
+# Столбцы списков (list_all_*, страницы): строки собираются в словари через
+# dict(zip(<столбцы>, row)) без обращения к cursor.description
+ANALYTE_LIST_COLUMNS = ("TA_ID", "TA_Name", "PH_Min", "PH_Max", "T_Max", "ST")
+BIO_RECOGNITION_LIST_COLUMNS = ("BRE_ID", "BRE_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "SN")
+IMMOBILIZATION_LIST_COLUMNS = ("IM_ID", "IM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "MP")
+MEMRISTIVE_LIST_COLUMNS = ("MEM_ID", "MEM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "SN")
+SENSOR_COMBINATION_LIST_COLUMNS = ("Combo_ID", "TA_ID", "BRE_ID", "IM_ID", "MEM_ID", "Score")
+
+def _insert_sql(table: str, columns: Tuple[str, ...], overwrite: bool = False) -> str:
+    """INSERT ... ON CONFLICT(<ID>) ... RETURNING <ID>; ID — первый столбец."""
+    id_col = columns[0]
+    if overwrite:
+        updates = ", ".join(f"{col} = excluded.{col}" for col in columns[1:])
+        on_conflict = f"DO UPDATE SET {updates}"
+    else:
+        on_conflict = "DO NOTHING"
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT({id_col}) {on_conflict} "
+        f"RETURNING {id_col}"
+    )
+
+def _make_binder(columns: Tuple[str, ...]) -> Callable[[Dict[str, Any]], tuple]:
+    """Функция «словарь -> параметры запроса в порядке столбцов».
+
+    Тело генерируется один раз как литерал кортежа
+    (d.get('TA_ID'), d.get('TA_Name'), ...): без генераторного выражения
+    и вызова tuple() на каждую строку пакетной вставки.
+    """
+    # exec безопасен: columns — только жёстко заданные кортежи *_COLUMNS
+    # этого модуля (вызовы ниже), пользовательский ввод сюда не попадает;
+    # к тому же имена вставляются через repr() как строковые литералы.
+    getters = "".join(f"get({col!r}), " for col in columns)
+    namespace: Dict[str, Any] = {}
+    exec(f"def bind(d):\n    get = d.get\n    return ({getters})", namespace)
+    return namespace["bind"]
+
+ANALYTE_PARAMS = _make_binder(ANALYTE_COLUMNS)
+BIO_RECOGNITION_PARAMS = _make_binder(BIO_RECOGNITION_COLUMNS)
+IMMOBILIZATION_PARAMS = _make_binder(IMMOBILIZATION_COLUMNS)
+MEMRISTIVE_PARAMS = _make_binder(MEMRISTIVE_COLUMNS)
+SENSOR_COMBINATION_PARAMS = _make_binder(SENSOR_COMBINATION_COLUMNS)
+
+INSERT_ANALYTE_SQL = _insert_sql("Analytes", ANALYTE_COLUMNS)
+INSERT_BIO_RECOGNITION_SQL = _insert_sql("BioRecognitionLayers", BIO_RECOGNITION_COLUMNS)
+INSERT_IMMOBILIZATION_SQL = _insert_sql("ImmobilizationLayers", IMMOBILIZATION_COLUMNS)
+INSERT_MEMRISTIVE_SQL = _insert_sql("MemristiveLayers", MEMRISTIVE_COLUMNS)
+INSERT_SENSOR_COMBINATION_SQL = _insert_sql("SensorCombinations", SENSOR_COMBINATION_COLUMNS)
+
+UPSERT_ANALYTE_SQL = _insert_sql("Analytes", ANALYTE_COLUMNS, overwrite=True)
+UPSERT_BIO_RECOGNITION_SQL = _insert_sql("BioRecognitionLayers", BIO_RECOGNITION_COLUMNS, overwrite=True)
+UPSERT_IMMOBILIZATION_SQL = _insert_sql("ImmobilizationLayers", IMMOBILIZATION_COLUMNS, overwrite=True)
+UPSERT_MEMRISTIVE_SQL = _insert_sql("MemristiveLayers", MEMRISTIVE_COLUMNS, overwrite=True)
+UPSERT_SENSOR_COMBINATION_SQL = _insert_sql("SensorCombinations", SENSOR_COMBINATION_COLUMNS, overwrite=True)
+
+SELECT_ANALYTES_SQL = f"""
+SELECT {", ".join(ANALYTE_LIST_COLUMNS)}
+FROM Analytes
+ORDER BY TA_Name
+"""
+
+SELECT_BIO_RECOGNITION_LAYERS_SQL = f"""
+SELECT {", ".join(BIO_RECOGNITION_LIST_COLUMNS)}
+FROM BioRecognitionLayers
+ORDER BY BRE_Name
+"""
+
+SELECT_IMMOBILIZATION_LAYERS_SQL = f"""
+SELECT {", ".join(IMMOBILIZATION_LIST_COLUMNS)}
+FROM ImmobilizationLayers
+ORDER BY IM_Name
+"""
+
+SELECT_MEMRISTIVE_LAYERS_SQL = f"""
+SELECT {", ".join(MEMRISTIVE_LIST_COLUMNS)}
+FROM MemristiveLayers
+ORDER BY MEM_Name
+"""
+
+SELECT_SENSOR_COMBINATIONS_SQL = f"""
+SELECT {", ".join(SENSOR_COMBINATION_LIST_COLUMNS)}
+FROM SensorCombinations
+ORDER BY Combo_ID
+"""
+
+# Лучшие комбинации: keyset по (Score, Combo_ID) в порядке убывания.
+# Score может быть NULL: сравнение строк с NULL даёт NULL, и такие
+# комбинации выпадали бы из выборки после первой порции. Поэтому ключ —
+# COALESCE(Score, -inf) (-1e999 в SQLite — минус бесконечность): комбинации
+# без оценки идут последними. То же выражение — в индексе
+# idx_sensor_combinations_rank, иначе он не используется; отдельное условие
+# по оценке (<= ?) даёт поиск по индексу, а не просмотр от начала.
+_RANK_SCORE = "COALESCE(Score, -1e999)"
+
+TOP_SENSOR_COMBINATIONS_SQL = f"""
+SELECT {", ".join(SENSOR_COMBINATION_LIST_COLUMNS)}
+FROM SensorCombinations
+ORDER BY {_RANK_SCORE} DESC, Combo_ID DESC
+LIMIT ?
+"""
+
+TOP_SENSOR_COMBINATIONS_AFTER_SQL = f"""
+SELECT {", ".join(SENSOR_COMBINATION_LIST_COLUMNS)}
+FROM SensorCombinations
+WHERE {_RANK_SCORE} <= ? AND ({_RANK_SCORE}, Combo_ID) < (?, ?)
+ORDER BY {_RANK_SCORE} DESC, Combo_ID DESC
+LIMIT ?
+"""
+
 class TableConfig(Enum):
     """Конфигурация таблиц и их полей"""
     ANALYTES = {
         "table": "Analytes",
         "id_col": "TA_ID",
         "display_col": "TA_Name",
-        "select_cols": ["TA_ID", "TA_Name", "PH_Min", "PH_Max", "T_Max", "ST"],
-        "all_cols": ["TA_ID", "TA_Name", "PH_Min", "PH_Max", "T_Max", "ST", "HL", "PC"],
+        "select_cols": ANALYTE_LIST_COLUMNS,
+        "all_cols": ANALYTE_COLUMNS,
         "entity_name": "аналит",
         "entity_name_plural": "аналиты",
     }
@@ -34,8 +229,8 @@ class TableConfig(Enum):
         "table": "BioRecognitionLayers",
         "id_col": "BRE_ID",
         "display_col": "BRE_Name",
-        "select_cols": ["BRE_ID", "BRE_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "SN"],
-        "all_cols": ["BRE_ID", "BRE_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "SN", "DR_Min", "DR_Max", "RP", "TR", "ST", "LOD", "HL", "PC"],
+        "select_cols": BIO_RECOGNITION_LIST_COLUMNS,
+        "all_cols": BIO_RECOGNITION_COLUMNS,
         "entity_name": "биослой",
         "entity_name_plural": "биослои",
     }
@@ -43,8 +238,8 @@ class TableConfig(Enum):
         "table": "ImmobilizationLayers",
         "id_col": "IM_ID",
         "display_col": "IM_Name",
-        "select_cols": ["IM_ID", "IM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "MP"],
-        "all_cols": ["IM_ID", "IM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "MP", "Adh", "Sol", "K_IM", "RP", "TR", "ST", "HL", "PC"],
+        "select_cols": IMMOBILIZATION_LIST_COLUMNS,
+        "all_cols": IMMOBILIZATION_COLUMNS,
         "entity_name": "иммобилизационный слой",
         "entity_name_plural": "иммобилизационные слои",
     }
@@ -52,8 +247,8 @@ class TableConfig(Enum):
         "table": "MemristiveLayers",
         "id_col": "MEM_ID",
         "display_col": "MEM_Name",
-        "select_cols": ["MEM_ID", "MEM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "SN"],
-        "all_cols": ["MEM_ID", "MEM_Name", "PH_Min", "PH_Max", "T_Min", "T_Max", "MP", "SN", "DR_Min", "DR_Max", "RP", "TR", "ST", "LOD", "HL", "PC"],
+        "select_cols": MEMRISTIVE_LIST_COLUMNS,
+        "all_cols": MEMRISTIVE_COLUMNS,
         "entity_name": "мемристивный слой",
         "entity_name_plural": "мемристивные слои",
     }
@@ -61,8 +256,8 @@ class TableConfig(Enum):
         "table": "SensorCombinations",
         "id_col": "Combo_ID",
         "display_col": "Combo_ID",
-        "select_cols": ["Combo_ID", "TA_ID", "BRE_ID", "IM_ID", "MEM_ID", "Score"],
-        "all_cols": ["Combo_ID", "TA_ID", "BRE_ID", "IM_ID", "MEM_ID", "SN_total", "TR_total", "ST_total", "RP_total", "LOD_total", "DR_total", "HL_total", "PC_total", "Score"],
+        "select_cols": SENSOR_COMBINATION_LIST_COLUMNS,
+        "all_cols": SENSOR_COMBINATION_COLUMNS[:-1],  # без created_at
         "entity_name": "комбинация сенсора",
         "entity_name_plural": "комбинации сенсоров",
     }
@@ -73,23 +268,303 @@ class TableConfig(Enum):
     def __getitem__(self, key: str) -> Any:
         return self.config[key]
 
+# Запросы пагинации и выборки по ID собираются один раз на таблицу:
+# один и тот же объект строки при каждом вызове попадает в кэш
+# подготовленных выражений соединения без повторной сборки текста.
+@lru_cache(maxsize=None)
+def _paginated_sql(table_config: TableConfig) -> str:
+    return f"""
+        SELECT {", ".join(table_config["select_cols"])}
+        FROM {table_config["table"]}
+        ORDER BY {table_config["display_col"]}
+        LIMIT ? OFFSET ?
+        """
+
+@lru_cache(maxsize=None)
+def _select_all_sql(table_config: TableConfig) -> str:
+    return f"""
+        SELECT {", ".join(table_config["select_cols"])}
+        FROM {table_config["table"]}
+        ORDER BY {table_config["display_col"]}
+        """
+
+@lru_cache(maxsize=None)
+def _count_sql(table_config: TableConfig) -> str:
+    return f"SELECT COUNT(*) FROM {table_config['table']}"
+
+# Число записей всех таблиц — скалярные подзапросы в одном SELECT
+COUNT_ALL_SQL = "SELECT " + ", ".join(
+    f"(SELECT COUNT(*) FROM {table_config['table']})" for table_config in TableConfig
+)
+
+def _keyset_cols(table_config: TableConfig) -> Tuple[str, ...]:
+    """Ключ keyset-пагинации: (display_col, id_col) или (id_col,), если они совпадают."""
+    if table_config["display_col"] == table_config["id_col"]:
+        return (table_config["id_col"],)
+    return table_config["display_col"], table_config["id_col"]
+
+@lru_cache(maxsize=None)
+def _after_sql(table_config: TableConfig, with_cursor: bool) -> str:
+    key_cols = _keyset_cols(table_config)
+    order_by = ", ".join(key_cols)
+    placeholders = ", ".join("?" * len(key_cols))
+    where = f"WHERE ({order_by}) > ({placeholders})" if with_cursor else ""
+    return f"""
+        SELECT {", ".join(table_config["select_cols"])}
+        FROM {table_config["table"]}
+        {where}
+        ORDER BY {order_by}
+        LIMIT ?
+        """
+
+@lru_cache(maxsize=None)
+def _by_id_sql(table_config: TableConfig) -> str:
+    return f"""
+        SELECT {", ".join(table_config["all_cols"])}
+        FROM {table_config["table"]}
+        WHERE {table_config["id_col"]} = ?
+        """
+
+@lru_cache(maxsize=None)
+def _delete_sql(table_config: TableConfig) -> str:
+    return f"DELETE FROM {table_config['table']} WHERE {table_config['id_col']} = ?"
+
+class _Reader:
+    """Соединение чтения одного потока (хранится в threading.local менеджера).
+
+    Когда поток завершается, threading.local отпускает объект, и
+    weakref.finalize закрывает соединение: потоки перезапусков Streamlit
+    не оставляют открытых соединений.
+    """
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        weakref.finalize(self, conn.close)
+
+
 class DatabaseManager(DatabaseAdapter):
     """Слой работы с БД (без Streamlit)."""
 
     def __init__(self, db_name: str = DB_NAME):
         self.db_name = db_name
         self.logger = logger
+        # (таблица, SQL, параметры, rows_as_dicts) ->
+        #     (момент истечения, версия таблицы, data_version БД, строки)
+        self._query_cache: Dict[Tuple[str, str, tuple, bool], Tuple[float, int, int, list]] = {}
+        # Версии таблиц: увеличиваются при записи через этот менеджер
+        self._table_versions: Dict[str, int] = {}
+        # Вытеснение из кэша и добавление записи — под одной блокировкой
+        self._cache_lock = threading.Lock()
         
          # Применить миграции ПЕРЕД созданием таблиц
         migrator = MigrationManager(db_name)
         migrator.migrate(ALL_MIGRATIONS)
         
+        # Соединения для чтения — по одному на живой поток (WAL допускает
+        # параллельных читателей при активном писателе); закрываются при
+        # завершении потока, а оставшиеся — в close()
+        self._local = threading.local()
+        self._readers: "weakref.WeakSet[_Reader]" = weakref.WeakSet()
+        # SQLite допускает одного писателя: запись сериализуется блокировкой
+        self._write_lock = threading.Lock()
+        self._optimize_timer: threading.Timer | None = None
+        self._closed = False
+        # Соединение для PRAGMA data_version: фиксирует коммиты других
+        # соединений (в том числе сторонних процессов и DB_6.py)
+        self._probe_conn: sqlite3.Connection | None = None
+        self._probe_lock = threading.Lock()
+        # Фоновая предзагрузка (следующая страница и т.п.); потоки пула
+        # читают через собственные соединения _read_conn()
+        self._prefetch_pool = ThreadPoolExecutor(
+            max_workers=PREFETCH_WORKERS, thread_name_prefix="db-prefetch"
+        )
+
         try:
+            # Постоянное соединение для записи: кэш подготовленных выражений
+            # живёт вместе с соединением. Streamlit выполняет перезапуски
+            # скрипта в разных потоках, поэтому проверка потока отключена;
+            # транзакции открываются явно в _write_txn().
+            # WAL включается до открытия постоянного соединения, чтобы оно
+            # с самого начала работало (и отчитывалось) в режиме WAL.
+            self._enable_wal()
+            self.conn = get_connection(db_name, check_same_thread=False, isolation_level=None)
+            self.conn.row_factory = sqlite3.Row
             self.create_tables()
+            if db_name != ":memory:":
+                self._probe_conn = get_connection(db_name, check_same_thread=False)
         except sqlite3.Error as e:
-            self.logger.critical(f"Не удалось инициализировать БД: {e}")
+            self.logger.critical("Не удалось инициализировать БД: %s", e)
             raise DatabaseConnectionError(f"Ошибка подключения к {db_name}") from e
 
+        atexit.register(self.close)
+        self._schedule_optimize()
+
+    def _enable_wal(self) -> None:
+        """Перевод БД в режим WAL (режим сохраняется в самом файле БД)."""
+        if self.db_name == ":memory:":
+            return
+        with get_connection(self.db_name) as conn:
+            mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            self.logger.info("Режим журнала БД: %s", mode)
+
+    def _schedule_optimize(self) -> None:
+        """Планирование очередного PRAGMA optimize в фоновом потоке."""
+        timer = threading.Timer(OPTIMIZE_INTERVAL, self._periodic_optimize)
+        timer.daemon = True
+        timer.start()
+        self._optimize_timer = timer
+
+    def _periodic_optimize(self) -> None:
+        """Обновление статистики планировщика (sqlite_stat1) на долгоживущем процессе."""
+        if self._closed:
+            return
+        try:
+            with self._write_lock:
+                self.conn.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            self.logger.warning("Ошибка PRAGMA optimize: %s", e)
+        self._schedule_optimize()
+
+    def close(self) -> None:
+        """Закрытие соединений: PRAGMA optimize, checkpoint WAL (вызывается и через atexit)."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._optimize_timer is not None:
+            self._optimize_timer.cancel()
+        # до закрытия соединений: фоновые чтения не должны их использовать
+        self._prefetch_pool.shutdown(wait=True, cancel_futures=True)
+        try:
+            with self._write_lock:
+                self.conn.execute("PRAGMA optimize")
+                if self.db_name != ":memory:":
+                    self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            self.logger.warning("Ошибка обслуживания БД при завершении: %s", e)
+        finally:
+            for reader in list(self._readers):
+                reader.conn.close()
+            if self._probe_conn is not None:
+                self._probe_conn.close()
+            self.conn.close()
+
+    @contextmanager
+    def _write_txn(self) -> Iterator[sqlite3.Connection]:
+        """Транзакция записи: BEGIN IMMEDIATE ... COMMIT под блокировкой писателя.
+
+        Вложенный вызов в том же потоке (внутри transaction()) выполняется
+        в уже открытой транзакции. Сброс кэша по изменённым таблицам
+        откладывается до её завершения.
+        """
+        if getattr(self._local, "pending_invalidations", None) is not None:
+            yield self.conn
+            return
+        with self._write_lock:
+            self._local.pending_invalidations = pending = set()
+            try:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield self.conn
+                except BaseException:
+                    self.conn.execute("ROLLBACK")
+                    raise
+                self.conn.execute("COMMIT")
+            finally:
+                # версии увеличиваются до освобождения блокировки писателя:
+                # параллельные записи не теряют друг у друга инкремент
+                self._local.pending_invalidations = None
+                for table_tag in pending:
+                    self._table_versions[table_tag] = self._table_versions.get(table_tag, 0) + 1
+        # запись внутри read_txn(): снимок читателя этого потока обновляется,
+        # чтобы последующие чтения видели только что записанные данные
+        reader = getattr(self._local, "reader", None)
+        if reader is not None and reader.conn.in_transaction:
+            reader.conn.commit()
+            self._begin_snapshot(reader.conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Несколько операций записи одной транзакцией (один COMMIT).
+
+        insert_*/delete_by_id внутри блока пишут в общую транзакцию;
+        исключение, вышедшее из блока, откатывает все изменения.
+        """
+        with self._write_txn():
+            yield
+
+    @contextmanager
+    def read_txn(self) -> Iterator[None]:
+        """Серия чтений текущего потока в одной транзакции (BEGIN ... COMMIT).
+
+        Блокировка SHARED берётся один раз на всю серию, а все чтения видят
+        один снимок БД. Вложенные вызовы используют внешнюю транзакцию.
+        Для :memory: — без транзакции (чтение идёт через соединение записи).
+        """
+        if self.db_name == ":memory:":
+            yield
+            return
+        conn = self._read_conn()
+        if conn.in_transaction:
+            yield
+            return
+        self._begin_snapshot(conn)
+        try:
+            yield
+        finally:
+            self._local.snapshot_versions = None
+            conn.commit()
+
+    def _begin_snapshot(self, conn: sqlite3.Connection) -> None:
+        """BEGIN на соединении чтения и немедленная фиксация снимка.
+
+        Версии кэша (версии таблиц и data_version) запоминаются до снимка:
+        внутри read_txn() _cached и cache_version() работают с ними, и
+        результат старого снимка не попадает в кэш под более новой версией.
+        """
+        self._local.snapshot_versions = (dict(self._table_versions), self._data_version())
+        conn.execute("BEGIN")
+        # отложенная транзакция берёт снимок при первом чтении
+        conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+
+    def _read_conn(self) -> sqlite3.Connection:
+        """Соединение только для чтения, привязанное к текущему потоку."""
+        if self.db_name == ":memory:":
+            # у каждого соединения своя in-memory БД
+            return self.conn
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            # mode=ro: читатель не может взять блокировку записи и не
+            # конкурирует с писателем; check_same_thread=False — чтобы
+            # соединение можно было закрыть из другого потока (close(),
+            # финализатор _Reader)
+            conn = get_connection(
+                f"{Path(self.db_name).resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+            )
+            conn.row_factory = sqlite3.Row
+            reader = self._local.reader = _Reader(conn)
+            self._readers.add(reader)
+        return reader.conn
+
+    def prefetch(self, method_name: str, *args, **kwargs) -> Future:
+        """Запуск метода чтения (например, list_all_*_after) в фоновом потоке.
+
+        Возвращает Future; вызывающий забирает результат через
+        future.result(timeout) или выполняет запрос заново, если он не готов.
+        """
+        return self.submit_read(getattr(self, method_name), *args, **kwargs)
+
+    def submit_read(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Запуск функции чтения fn(*args, **kwargs) в пуле фоновых потоков.
+
+        Потоки пула долгоживущие: их соединения чтения открываются один раз
+        и переиспользуются. Каждый поток читает свой снимок БД.
+        """
+        return self._prefetch_pool.submit(fn, *args, **kwargs)
+
     def create_tables(self) -> None:
         """Создание таблиц базы данных, если они не существуют."""
         tables = [
@@ -189,377 +664,664 @@ class DatabaseManager(DatabaseAdapter):
                 FOREIGN KEY (IM_ID) REFERENCES ImmobilizationLayers (IM_ID),
                 FOREIGN KEY (MEM_ID) REFERENCES MemristiveLayers (MEM_ID)
             );
-            """
+            """,
+            # Покрывающие индексы под list_all_* / пагинацию: ведущие столбцы —
+            # ключ сортировки (имя, ID), остальные — выбираемые столбцы,
+            # так что запросы отвечаются из индекса без обращения к таблице
+            "CREATE INDEX IF NOT EXISTS idx_analytes_list "
+            "ON Analytes (TA_Name, TA_ID, PH_Min, PH_Max, T_Max, ST)",
+            "CREATE INDEX IF NOT EXISTS idx_bio_recognition_list "
+            "ON BioRecognitionLayers (BRE_Name, BRE_ID, PH_Min, PH_Max, T_Min, T_Max, SN)",
+            "CREATE INDEX IF NOT EXISTS idx_immobilization_list "
+            "ON ImmobilizationLayers (IM_Name, IM_ID, PH_Min, PH_Max, T_Min, T_Max, MP)",
+            "CREATE INDEX IF NOT EXISTS idx_memristive_list "
+            "ON MemristiveLayers (MEM_Name, MEM_ID, PH_Min, PH_Max, T_Min, T_Max, SN)",
+            "CREATE INDEX IF NOT EXISTS idx_sensor_combinations_list "
+            "ON SensorCombinations (Combo_ID, TA_ID, BRE_ID, IM_ID, MEM_ID, Score)",
+            # Ключ keyset-выборки лучших комбинаций (list_top_sensor_combinations)
+            f"CREATE INDEX IF NOT EXISTS idx_sensor_combinations_rank "
+            f"ON SensorCombinations ({_RANK_SCORE} DESC, Combo_ID DESC)",
+            "DROP INDEX IF EXISTS idx_sensor_combinations_top",
+            "DROP INDEX IF EXISTS idx_sensor_combinations_score",
+            # Индексы по одному имени поглощены покрывающими
+            "DROP INDEX IF EXISTS idx_analytes_name",
+            "DROP INDEX IF EXISTS idx_bio_recognition_name",
+            "DROP INDEX IF EXISTS idx_immobilization_name",
+            "DROP INDEX IF EXISTS idx_memristive_name",
         ]
         try:
             # Создаем новое соединение для текущего потока
-            with get_connection() as conn:
+            with get_connection(self.db_name) as conn:
                 cursor = conn.cursor()
                 for table in tables:
                     cursor.execute(table)
                 conn.commit()
                 self.logger.info("Таблицы успешно созданы")
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка создания таблиц: {e}")
+            self.logger.error("Ошибка создания таблиц: %s", e)
 
     # --- INSERT / UPSERT методы ---
-    def insert_analyte(self, data: Dict[str, Any]) -> bool | str:
-        """Вставка или замена аналита (создаёт новое соединение для каждого вызова)."""
+    # ON CONFLICT DO NOTHING RETURNING заменяет отдельную SELECT-проверку:
+    # пустой результат означает дубликат.
+    def _execute_insert(self, query: str, params: tuple) -> bool:
+        """Выполнение INSERT ... RETURNING в отдельной транзакции.
+
+        Возвращает False, если запись с таким ключом уже существует
+        (для UPSERT-запросов RETURNING срабатывает всегда).
+        """
+        with self._write_txn() as conn:
+            inserted = conn.execute(query, params).fetchone()
+            if inserted is not None:
+                self._invalidate(self._insert_target(query))
+        return inserted is not None
+
+    def insert_analyte(self, data: Dict[str, Any], overwrite: bool = False) -> bool | str:
+        """Вставка аналита; при существующем TA_ID возвращает "DUPLICATE" (overwrite=True — обновляет запись)."""
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT TA_ID FROM Analytes WHERE TA_ID = ?", (data['TA_ID'],))
-                if cursor.fetchone():
-                    return "DUPLICATE"  # Сигнал о дубликате
-
-                query = """
-                INSERT OR REPLACE INTO Analytes (TA_ID, TA_Name, PH_Min, PH_Max, T_Max, ST, HL, PC)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                cursor.execute(query, (
-                    data['TA_ID'], data['TA_Name'], data.get('PH_Min'),
-                    data.get('PH_Max'), data.get('T_Max'), data.get('ST'),
-                    data.get('HL'), data.get('PC')
-                ))
-                conn.commit()
-                self.clear_cache()
-                self.logger.info(f"Аналит {data['TA_ID']} успешно вставлен")
-                return True
+            query = UPSERT_ANALYTE_SQL if overwrite else INSERT_ANALYTE_SQL
+            if not self._execute_insert(query, ANALYTE_PARAMS(data)):
+                return "DUPLICATE"  # Сигнал о дубликате
+            self.logger.info("Аналит %s успешно вставлен", data['TA_ID'])
+            return True
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка вставки аналита: {e}")
+            self.logger.error("Ошибка вставки аналита: %s", e)
             return False
         except sqlite3.IntegrityError as e:
-            self.logger.error(f"Ошибка целостности: {e}")
+            self.logger.error("Ошибка целостности: %s", e)
             raise DatabaseIntegrityError(f"Нарушение целостности данных") from e
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка БД: {e}")
+            self.logger.error("Ошибка БД: %s", e)
             return False
 
-    def insert_bio_recognition_layer(self, data: Dict[str, Any]) -> bool | str:
-        """Вставка или замена биораспознающего слоя (создаёт новое соединение для каждого вызова)."""
+    def insert_bio_recognition_layer(self, data: Dict[str, Any], overwrite: bool = False) -> bool | str:
+        """Вставка биораспознающего слоя; при существующем BRE_ID возвращает "DUPLICATE" (overwrite=True — обновляет запись)."""
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT BRE_ID FROM BioRecognitionLayers WHERE BRE_ID = ?", (data['BRE_ID'],))
-                if cursor.fetchone():
-                    return "DUPLICATE"
-
-                query = """
-                INSERT OR REPLACE INTO BioRecognitionLayers 
-                (BRE_ID, BRE_Name, PH_Min, PH_Max, T_Min, T_Max, SN, DR_Min, DR_Max, RP, TR, ST, LOD, HL, PC)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                cursor.execute(query, (
-                    data['BRE_ID'], data['BRE_Name'], data.get('PH_Min'), data.get('PH_Max'),
-                    data.get('T_Min'), data.get('T_Max'), data.get('SN'), data.get('DR_Min'),
-                    data.get('DR_Max'), data.get('RP'), data.get('TR'), data.get('ST'),
-                    data.get('LOD'), data.get('HL'), data.get('PC')
-                ))
-                conn.commit()
-                self.clear_cache()
-                self.logger.info(f"Биослой {data['BRE_ID']} успешно вставлен")
-                return True
+            query = UPSERT_BIO_RECOGNITION_SQL if overwrite else INSERT_BIO_RECOGNITION_SQL
+            if not self._execute_insert(query, BIO_RECOGNITION_PARAMS(data)):
+                return "DUPLICATE"
+            self.logger.info("Биослой %s успешно вставлен", data['BRE_ID'])
+            return True
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка вставки биослоя: {e}")
+            self.logger.error("Ошибка вставки биослоя: %s", e)
             return False
         except sqlite3.IntegrityError as e:
-            self.logger.error(f"Ошибка целостности: {e}")
+            self.logger.error("Ошибка целостности: %s", e)
             raise DatabaseIntegrityError(f"Нарушение целостности данных") from e
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка БД: {e}")
+            self.logger.error("Ошибка БД: %s", e)
             return False
 
-    def insert_immobilization_layer(self, data: Dict[str, Any]) -> bool | str:
-        """Вставка или замена иммобилизационного слоя (создаёт новое соединение для каждого вызова)."""
+    def insert_immobilization_layer(self, data: Dict[str, Any], overwrite: bool = False) -> bool | str:
+        """Вставка иммобилизационного слоя; при существующем IM_ID возвращает "DUPLICATE" (overwrite=True — обновляет запись)."""
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT IM_ID FROM ImmobilizationLayers WHERE IM_ID = ?", (data['IM_ID'],))
-                if cursor.fetchone():
-                    return "DUPLICATE"
-
-                query = """
-                INSERT OR REPLACE INTO ImmobilizationLayers 
-                (IM_ID, IM_Name, PH_Min, PH_Max, T_Min, T_Max, MP, Adh, Sol, K_IM, RP, TR, ST, HL, PC)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                cursor.execute(query, (
-                    data['IM_ID'], data['IM_Name'], data.get('PH_Min'), data.get('PH_Max'),
-                    data.get('T_Min'), data.get('T_Max'), data.get('MP'), data.get('Adh'),
-                    data.get('Sol'), data.get('K_IM'), data.get('RP'), data.get('TR'),
-                    data.get('ST'), data.get('HL'), data.get('PC')
-                ))
-                conn.commit()
-                self.clear_cache()
-                self.logger.info(f"Иммобилизационный слой {data['IM_ID']} успешно вставлен")
-                return True
+            query = UPSERT_IMMOBILIZATION_SQL if overwrite else INSERT_IMMOBILIZATION_SQL
+            if not self._execute_insert(query, IMMOBILIZATION_PARAMS(data)):
+                return "DUPLICATE"
+            self.logger.info("Иммобилизационный слой %s успешно вставлен", data['IM_ID'])
+            return True
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка вставки иммобилизационного слоя: {e}")
+            self.logger.error("Ошибка вставки иммобилизационного слоя: %s", e)
             return False
         except sqlite3.IntegrityError as e:
-            self.logger.error(f"Ошибка целостности: {e}")
+            self.logger.error("Ошибка целостности: %s", e)
             raise DatabaseIntegrityError(f"Нарушение целостности данных") from e
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка БД: {e}")
+            self.logger.error("Ошибка БД: %s", e)
             return False
 
-    def insert_memristive_layer(self, data: Dict[str, Any]) -> bool | str:
-        """Вставка или замена мемристивного слоя (создаёт новое соединение для каждого вызова)."""
+    def insert_memristive_layer(self, data: Dict[str, Any], overwrite: bool = False) -> bool | str:
+        """Вставка мемристивного слоя; при существующем MEM_ID возвращает "DUPLICATE" (overwrite=True — обновляет запись)."""
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT MEM_ID FROM MemristiveLayers WHERE MEM_ID = ?", (data['MEM_ID'],))
-                if cursor.fetchone():
-                    return "DUPLICATE"
-
-                query = """
-                INSERT OR REPLACE INTO MemristiveLayers 
-                (MEM_ID, MEM_Name, PH_Min, PH_Max, T_Min, T_Max, MP, SN, DR_Min, DR_Max, RP, TR, ST, LOD, HL, PC)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                cursor.execute(query, (
-                    data['MEM_ID'], data['MEM_Name'], data.get('PH_Min'), data.get('PH_Max'),
-                    data.get('T_Min'), data.get('T_Max'), data.get('MP'), data.get('SN'),
-                    data.get('DR_Min'), data.get('DR_Max'), data.get('RP'), data.get('TR'),
-                    data.get('ST'), data.get('LOD'), data.get('HL'), data.get('PC')
-                ))
-                conn.commit()
-                self.clear_cache()
-                self.logger.info(f"Мемристивный слой {data['MEM_ID']} успешно вставлен")
-                return True
+            query = UPSERT_MEMRISTIVE_SQL if overwrite else INSERT_MEMRISTIVE_SQL
+            if not self._execute_insert(query, MEMRISTIVE_PARAMS(data)):
+                return "DUPLICATE"
+            self.logger.info("Мемристивный слой %s успешно вставлен", data['MEM_ID'])
+            return True
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка вставки мемристивного слоя: {e}")
+            self.logger.error("Ошибка вставки мемристивного слоя: %s", e)
             return False
         except sqlite3.IntegrityError as e:
-            self.logger.error(f"Ошибка целостности: {e}")
+            self.logger.error("Ошибка целостности: %s", e)
             raise DatabaseIntegrityError(f"Нарушение целостности данных") from e
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка БД: {e}")
+            self.logger.error("Ошибка БД: %s", e)
             return False
 
 
-    def insert_sensor_combination(self, data: Dict[str, Any]) -> bool | str:
-        """Вставка или замена комбинации сенсора (создаёт новое соединение для каждого вызова)."""
+    def insert_sensor_combination(self, data: Dict[str, Any], overwrite: bool = False) -> bool | str:
+        """Вставка комбинации сенсора; при существующем Combo_ID возвращает "DUPLICATE" (overwrite=True — обновляет запись)."""
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT Combo_ID FROM SensorCombinations WHERE Combo_ID = ?", (data['Combo_ID'],))
-                if cursor.fetchone():
-                    return "DUPLICATE"
-
-                query = """
-                INSERT OR REPLACE INTO SensorCombinations 
-                (Combo_ID, TA_ID, BRE_ID, IM_ID, MEM_ID, SN_total, TR_total, ST_total, RP_total, LOD_total, DR_total, HL_total, PC_total, Score, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                cursor.execute(query, (
-                    data['Combo_ID'], data.get('TA_ID'), data.get('BRE_ID'), data.get('IM_ID'),
-                    data.get('MEM_ID'), data.get('SN_total'), data.get('TR_total'), data.get('ST_total'),
-                    data.get('RP_total'), data.get('LOD_total'), data.get('DR_total'), data.get('HL_total'),
-                    data.get('PC_total'), data.get('Score'), data.get('created_at')
-                ))
-                conn.commit()
-                self.clear_cache()
-                self.logger.info(f"Комбинация сенсора {data['Combo_ID']} успешно вставлена")
-                return True
+            query = UPSERT_SENSOR_COMBINATION_SQL if overwrite else INSERT_SENSOR_COMBINATION_SQL
+            if not self._execute_insert(query, SENSOR_COMBINATION_PARAMS(data)):
+                return "DUPLICATE"
+            self.logger.info("Комбинация сенсора %s успешно вставлена", data['Combo_ID'])
+            return True
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка вставки комбинации сенсора: {e}")
+            self.logger.error("Ошибка вставки комбинации сенсора: %s", e)
             return False
         except sqlite3.IntegrityError as e:
-            self.logger.error(f"Ошибка целостности: {e}")
+            self.logger.error("Ошибка целостности: %s", e)
             raise DatabaseIntegrityError(f"Нарушение целостности данных") from e
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка БД: {e}")
+            self.logger.error("Ошибка БД: %s", e)
             return False
 
+    # --- Пакетная вставка ---
+    def _bulk_insert(self, query: str, params: List[tuple], entity_plural: str) -> int:
+        """Вставка набора строк одной транзакцией через executemany.
+
+        Существующие ключи пропускаются (ON CONFLICT DO NOTHING).
+        Возвращает количество фактически вставленных строк.
+        """
+        if not params:
+            return 0
+        table = self._insert_target(query)
+        try:
+            with self._write_txn() as conn:
+                # DDL транзакционен: при ошибке ROLLBACK вернёт и индексы
+                indexes = []
+                if len(params) >= BULK_INDEX_REBUILD_THRESHOLD:
+                    indexes = self._secondary_indexes(conn, table)
+                    for name, _ in indexes:
+                        conn.execute(f'DROP INDEX "{name}"')
+                changes_before = conn.total_changes
+                conn.executemany(query, params)
+                inserted = conn.total_changes - changes_before
+                for _, ddl in indexes:
+                    conn.execute(ddl)
+                if inserted:
+                    self._invalidate(table)
+        except sqlite3.Error as e:
+            self.logger.error("Ошибка пакетной вставки (%s): %s", entity_plural, e)
+            return 0
+        self.logger.info("Пакетно вставлено %s из %s (%s)", inserted, len(params), entity_plural)
+        return inserted
+
+    @staticmethod
+    def _secondary_indexes(conn: sqlite3.Connection, table: str) -> List[Tuple[str, str]]:
+        """Создаваемые явно индексы таблицы: [(имя, DDL)] (без автоиндексов PK/UNIQUE)."""
+        return [
+            (name, ddl) for name, ddl in conn.execute(
+                "SELECT name, sql FROM sqlite_master "
+                "WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (table,),
+            )
+        ]
+
+    def bulk_insert_analytes(self, rows: List[Dict[str, Any]]) -> int:
+        """Пакетная вставка аналитов."""
+        return self._bulk_insert(
+            INSERT_ANALYTE_SQL, list(map(ANALYTE_PARAMS, rows)), "аналиты"
+        )
+
+    def bulk_insert_bio_recognition_layers(self, rows: List[Dict[str, Any]]) -> int:
+        """Пакетная вставка биораспознающих слоев."""
+        return self._bulk_insert(
+            INSERT_BIO_RECOGNITION_SQL, list(map(BIO_RECOGNITION_PARAMS, rows)), "биослои"
+        )
+
+    def bulk_insert_immobilization_layers(self, rows: List[Dict[str, Any]]) -> int:
+        """Пакетная вставка иммобилизационных слоев."""
+        return self._bulk_insert(
+            INSERT_IMMOBILIZATION_SQL, list(map(IMMOBILIZATION_PARAMS, rows)),
+            "иммобилизационные слои"
+        )
+
+    def bulk_insert_memristive_layers(self, rows: List[Dict[str, Any]]) -> int:
+        """Пакетная вставка мемристивных слоев."""
+        return self._bulk_insert(
+            INSERT_MEMRISTIVE_SQL, list(map(MEMRISTIVE_PARAMS, rows)), "мемристивные слои"
+        )
+
+    def bulk_insert_sensor_combinations(self, rows: List[Dict[str, Any]]) -> int:
+        """Пакетная вставка комбинаций сенсоров."""
+        return self._bulk_insert(
+            INSERT_SENSOR_COMBINATION_SQL, list(map(SENSOR_COMBINATION_PARAMS, rows)),
+            "комбинации сенсоров"
+        )
+
+    # --- Кэш запросов (TTL + инвалидация по таблице) ---
+    @staticmethod
+    def _insert_target(query: str) -> str:
+        """Имя таблицы, в которую пишет INSERT-запрос."""
+        return _INSERT_TARGET_RE.search(query).group(1)
+
+    def _data_version(self) -> int:
+        """PRAGMA data_version: меняется после коммита любого другого соединения."""
+        if self._probe_conn is None:
+            # :memory: — других соединений с этой БД нет
+            return 0
+        with self._probe_lock:
+            return self._probe_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _cached(
+        self,
+        table_tag: str,
+        sql: str,
+        params: tuple = (),
+        ttl: float = QUERY_CACHE_TTL,
+        rows_as_dicts: bool = True,
+        columns: Tuple[str, ...] | None = None,
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
+        """Результат SELECT из кэша; при промахе — запрос к БД.
+
+        В пределах TTL результат отдаётся без обращения к БД. После
+        истечения TTL он продлевается, если не изменились ни версия
+        таблицы, ни data_version (одна PRAGMA вместо повторного запроса).
+        rows_as_dicts=False возвращает sqlite3.Row без построения словарей;
+        columns — имена столбцов SELECT для сборки словарей из кортежей.
+        """
+        key = (table_tag, sql, params, rows_as_dicts)
+        now = time.monotonic()
+        # внутри read_txn() — версии на момент снимка транзакции
+        snapshot = getattr(self._local, "snapshot_versions", None)
+        table_versions = self._table_versions if snapshot is None else snapshot[0]
+        version = table_versions.get(table_tag, 0)
+        entry = self._query_cache.get(key)
+        if entry is not None and entry[1] == version:
+            if entry[0] > now:
+                return entry[3]
+            data_version = self._data_version() if snapshot is None else snapshot[1]
+            if entry[2] == data_version:
+                self._query_cache[key] = (now + ttl, version, data_version, entry[3])
+                return entry[3]
+
+        # версии читаются до запроса (в read_txn() — до снимка): запись во
+        # время запроса даст промах при следующем обращении, а не устаревший
+        # результат
+        data_version = self._data_version() if snapshot is None else snapshot[1]
+        conn = self._read_conn()
+        if rows_as_dicts and columns is not None:
+            results = _rows_to_dicts(columns, _tuple_cursor(conn).execute(sql, params).fetchall())
+        else:
+            results = conn.execute(sql, params).fetchall()
+            if rows_as_dicts:
+                results = [dict(row) for row in results]
+        with self._cache_lock:
+            if key not in self._query_cache and len(self._query_cache) >= QUERY_CACHE_MAX_ENTRIES:
+                self._query_cache.pop(next(iter(self._query_cache)))
+            self._query_cache[key] = (now + ttl, version, data_version, results)
+        return results
+
+    def cache_version(self) -> Tuple[int, int]:
+        """Версия содержимого БД для ключей внешних кэшей (st.cache_data в UI).
+
+        Меняется после любой записи через менеджер и после коммита другого
+        соединения: результат, закэшированный под прежней версией, больше
+        не запрашивается. Стоимость — одна PRAGMA data_version.
+        Версия действительна только в пределах процесса (счётчики в памяти
+        и data_version начинаются заново при перезапуске), поэтому ею нельзя
+        ключевать кэши, сохраняемые на диск.
+        Внутри read_txn() возвращается версия на момент снимка транзакции.
+        """
+        snapshot = getattr(self._local, "snapshot_versions", None)
+        if snapshot is not None:
+            return sum(snapshot[0].values()), snapshot[1]
+        return sum(self._table_versions.values()), self._data_version()
+
+    def _invalidate(self, table_tag: str) -> None:
+        """Сброс результатов, зависящих от таблицы: новая версия таблицы.
+
+        Внутри _write_txn() версия увеличивается при её завершении, ещё под
+        блокировкой писателя; вне транзакции — под той же блокировкой.
+        """
+        pending = getattr(self._local, "pending_invalidations", None)
+        if pending is not None:
+            pending.add(table_tag)
+            return
+        with self._write_lock:
+            self._table_versions[table_tag] = self._table_versions.get(table_tag, 0) + 1
+
     # --- LIST методы с кэшем ---
-    @lru_cache(maxsize=32)
-    def list_all_analytes(self) -> List[Dict[str, Any]]:
+    def list_all_analytes(self, rows_as_dicts: bool = True) -> List[Dict[str, Any]] | List[sqlite3.Row]:
         """Получение всех аналитов с выбором конкретных столбцов."""
-        query = """
-        SELECT TA_ID, TA_Name, PH_Min, PH_Max, T_Max, ST
-        FROM Analytes
-        ORDER BY TA_Name
-        """
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} аналитов")
-                return results
+            results = self._cached(
+                "Analytes", SELECT_ANALYTES_SQL,
+                rows_as_dicts=rows_as_dicts, columns=ANALYTE_LIST_COLUMNS,
+            )
+            self.logger.debug("Получено %s аналитов", len(results))
+            return results
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения аналитов: {e}")
+            self.logger.error("Ошибка получения аналитов: %s", e)
             return []
 
-    @lru_cache(maxsize=32)
-    def list_all_bio_recognition_layers(self) -> List[Dict[str, Any]]:
+    def list_all_bio_recognition_layers(self, rows_as_dicts: bool = True) -> List[Dict[str, Any]] | List[sqlite3.Row]:
         """Получение всех биораспознающих слоев."""
-        query = """
-        SELECT BRE_ID, BRE_Name, PH_Min, PH_Max, T_Min, T_Max, SN
-        FROM BioRecognitionLayers
-        ORDER BY BRE_Name
-        """
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} биослоев")
-                return results
+            results = self._cached(
+                "BioRecognitionLayers", SELECT_BIO_RECOGNITION_LAYERS_SQL,
+                rows_as_dicts=rows_as_dicts, columns=BIO_RECOGNITION_LIST_COLUMNS,
+            )
+            self.logger.debug("Получено %s биослоев", len(results))
+            return results
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения биослоев: {e}")
+            self.logger.error("Ошибка получения биослоев: %s", e)
             return []
 
-    @lru_cache(maxsize=32)
-    def list_all_immobilization_layers(self) -> List[Dict[str, Any]]:
+    def list_all_immobilization_layers(self, rows_as_dicts: bool = True) -> List[Dict[str, Any]] | List[sqlite3.Row]:
         """Получение всех иммобилизационных слоев."""
-        query = """
-        SELECT IM_ID, IM_Name, PH_Min, PH_Max, T_Min, T_Max, MP
-        FROM ImmobilizationLayers
-        ORDER BY IM_Name
-        """
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} иммобилизационных слоев")
-                return results
+            results = self._cached(
+                "ImmobilizationLayers", SELECT_IMMOBILIZATION_LAYERS_SQL,
+                rows_as_dicts=rows_as_dicts, columns=IMMOBILIZATION_LIST_COLUMNS,
+            )
+            self.logger.debug("Получено %s иммобилизационных слоев", len(results))
+            return results
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения иммобилизационных слоев: {e}")
+            self.logger.error("Ошибка получения иммобилизационных слоев: %s", e)
             return []
 
-    @lru_cache(maxsize=32)
-    def list_all_memristive_layers(self) -> List[Dict[str, Any]]:
+    def list_all_memristive_layers(self, rows_as_dicts: bool = True) -> List[Dict[str, Any]] | List[sqlite3.Row]:
         """Получение всех мемристивных слоев."""
-        query = """
-        SELECT MEM_ID, MEM_Name, PH_Min, PH_Max, T_Min, T_Max, SN
-        FROM MemristiveLayers
-        ORDER BY MEM_Name
-        """
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} мемристивных слоев")
-                return results
+            results = self._cached(
+                "MemristiveLayers", SELECT_MEMRISTIVE_LAYERS_SQL,
+                rows_as_dicts=rows_as_dicts, columns=MEMRISTIVE_LIST_COLUMNS,
+            )
+            self.logger.debug("Получено %s мемристивных слоев", len(results))
+            return results
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения мемристивных слоев: {e}")
+            self.logger.error("Ошибка получения мемристивных слоев: %s", e)
             return []
 
-    @lru_cache(maxsize=32)
-    def list_all_sensor_combinations(self) -> List[Dict[str, Any]]:
+    def list_all_sensor_combinations(self, rows_as_dicts: bool = True) -> List[Dict[str, Any]] | List[sqlite3.Row]:
         """Получение всех комбинаций сенсоров."""
-        query = """
-        SELECT Combo_ID, TA_ID, BRE_ID, IM_ID, MEM_ID, Score
-        FROM SensorCombinations
-        ORDER BY Combo_ID
-        """
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(f"Получено {len(results)} комбинаций сенсоров")
-                return results
+            results = self._cached(
+                "SensorCombinations", SELECT_SENSOR_COMBINATIONS_SQL,
+                rows_as_dicts=rows_as_dicts, columns=SENSOR_COMBINATION_LIST_COLUMNS,
+            )
+            self.logger.debug("Получено %s комбинаций сенсоров", len(results))
+            return results
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка получения комбинаций сенсоров: {e}")
+            self.logger.error("Ошибка получения комбинаций сенсоров: %s", e)
             return []
-   
+
+    # --- Потоковое чтение без кэша (экспорт, большие таблицы) ---
+    def _iter_batches(self, sql: str, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[List[tuple]]:
+        """Порции строк SELECT (кортежи) по fetchmany(batch_size).
+
+        В памяти одновременно не больше одной порции; снимок чтения (WAL)
+        держится, пока итератор не исчерпан или не закрыт.
+        """
+        conn = self._read_conn()
+        cursor = _tuple_cursor(conn)
+        cursor.arraysize = batch_size
+        cursor.execute(sql)
+        try:
+            while batch := cursor.fetchmany():
+                yield batch
+        finally:
+            cursor.close()
+
+    def iter_row_batches(
+        self, table_config: TableConfig, batch_size: int = FETCH_BATCH_SIZE
+    ) -> Iterator[List[tuple]]:
+        """Потоковое чтение таблицы порциями кортежей (столбцы — select_cols).
+
+        Для экспорта: строки сразу пишутся в CSV/JSON без словарей и
+        DataFrame, в памяти — одна порция.
+        """
+        return self._iter_batches(_select_all_sql(table_config), batch_size)
+
     def _fetch_paginated(
         self, 
         table_config: TableConfig, 
         limit: int, 
-        offset: int
-    ) -> List[Dict[str, Any]]:
-        """Универсальный метод пагинации для любой таблицы."""
-        cols = table_config["select_cols"]
-        cols_str = ", ".join(cols)
-        order_by = table_config["display_col"]
-        
-        query = f"""
-        SELECT {cols_str}
-        FROM {table_config["table"]}
-        ORDER BY {order_by}
-        LIMIT ? OFFSET ?
+        offset: int,
+        rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
+        """Универсальный метод пагинации для любой таблицы.
+
+        rows_as_dicts=False возвращает sqlite3.Row (столбцы — select_cols)
+        для построения DataFrame без промежуточных словарей.
         """
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (limit, offset))
-                columns = [description[0] for description in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                self.logger.info(
-                    f"Получено {len(results)} {table_config['entity_name_plural']} (страница)"
-                )
-                return results
+            conn = self._read_conn()
+            if rows_as_dicts:
+                cursor = _tuple_cursor(conn)
+                cursor.execute(_paginated_sql(table_config), (limit, offset))
+                results = _rows_to_dicts(table_config["select_cols"], cursor.fetchall())
+            else:
+                results = conn.execute(_paginated_sql(table_config), (limit, offset)).fetchall()
+            self.logger.debug(
+                "Получено %s %s (страница)",
+                len(results),
+                table_config['entity_name_plural']
+            )
+            return results
+        except sqlite3.Error as e:
+            self.logger.error(
+                "Ошибка получения %s с пагинацией: %s",
+                table_config['entity_name_plural'],
+                e
+            )
+            return []
+
+    def count_rows(self, table_config: TableConfig) -> int:
+        """Число записей таблицы (SELECT COUNT(*)); кэшируется до записи в таблицу."""
+        try:
+            rows = self._cached(table_config["table"], _count_sql(table_config), rows_as_dicts=False)
+            return rows[0][0]
+        except sqlite3.Error as e:
+            self.logger.error("Ошибка подсчёта %s: %s", table_config['entity_name_plural'], e)
+            return 0
+
+    def count_and_head(
+        self, table_config: TableConfig, k: int = 3
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Число записей таблицы и первые k строк (в порядке keyset-пагинации).
+
+        Для сводок «всего N, первые k»: вся таблица не выбирается.
+        """
+        with self.read_txn():
+            return self.count_rows(table_config), self._fetch_after(table_config, None, k)
+
+    def count_all_rows(self) -> Dict[str, int]:
+        """Число записей во всех таблицах одним запросом: {имя таблицы: COUNT(*)}."""
+        tables = [table_config["table"] for table_config in TableConfig]
+        try:
+            counts = self._read_conn().execute(COUNT_ALL_SQL).fetchone()
+        except sqlite3.Error as e:
+            self.logger.error("Ошибка подсчёта записей: %s", e)
+            return dict.fromkeys(tables, 0)
+        return dict(zip(tables, counts))
+
+    def _fetch_after(
+        self,
+        table_config: TableConfig,
+        cursor: Tuple[Any, ...] | None,
+        limit: int,
+        rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
+        """Keyset-пагинация: страница строк после курсора (display_col, id_col).
+
+        ID в курсоре разрешает совпадающие имена, поэтому строки не
+        теряются и не повторяются на границе страниц. Для таблиц, где
+        отображаемый столбец и есть ID (комбинации), курсор — (id,).
+        rows_as_dicts=False возвращает sqlite3.Row без построения словарей.
+        """
+        query = _after_sql(table_config, cursor is not None)
+        params = (*cursor, limit) if cursor is not None else (limit,)
+        try:
+            conn = self._read_conn()
+            if rows_as_dicts:
+                cur = _tuple_cursor(conn).execute(query, params)
+                results = _rows_to_dicts(table_config["select_cols"], cur.fetchall())
+            else:
+                results = conn.execute(query, params).fetchall()
+            self.logger.debug(
+                "Получено %s %s (страница)",
+                len(results),
+                table_config['entity_name_plural']
+            )
+            return results
         except sqlite3.Error as e:
             self.logger.error(
-                f"Ошибка получения {table_config['entity_name_plural']} с пагинацией: {e}"
+                "Ошибка получения %s с пагинацией: %s",
+                table_config['entity_name_plural'],
+                e
             )
             return []
 
+    @staticmethod
+    def page_cursor(table_config: TableConfig, page: List[Dict[str, Any]] | List[sqlite3.Row]) -> Tuple[Any, ...] | None:
+        """Курсор для запроса следующей страницы (по последней строке текущей)."""
+        if not page:
+            return None
+        last = page[-1]
+        return tuple(last[col] for col in _keyset_cols(table_config))
+
     def _fetch_by_id(
         self,
         table_config: TableConfig,
         id_value: str
     ) -> Dict[str, Any] | None:
-        """Универсальный метод получения записи по ID."""
-        cols = table_config["all_cols"]
-        cols_str = ", ".join(cols)
-        id_col = table_config["id_col"]
-        
-        query = f"""
-        SELECT {cols_str}
-        FROM {table_config["table"]}
-        WHERE {id_col} = ?
+        """Универсальный метод получения записи по ID.
+
+        Результат (в том числе «не найдено») кэшируется в _cached и
+        сбрасывается при записи в таблицу; вызывающий получает копию.
         """
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (id_value,))
-                result = cursor.fetchone()
-                if result:
-                    columns = [description[0] for description in cursor.description]
-                    self.logger.info(
-                        f"Получен {table_config['entity_name']} {id_value}"
-                    )
-                    return dict(zip(columns, result))
-                return None
+            rows = self._cached(
+                table_config["table"], _by_id_sql(table_config), (id_value,),
+                columns=table_config["all_cols"],
+            )
+            if rows:
+                self.logger.debug(
+                    "Получен %s %s",
+                    table_config['entity_name'],
+                    id_value
+                )
+                return dict(rows[0])
+            return None
         except sqlite3.Error as e:
             self.logger.error(
-                f"Ошибка получения {table_config['entity_name']} {id_value}: {e}"
+                "Ошибка получения %s %s: %s",
+                table_config['entity_name'],
+                id_value,
+                e
             )
             return None
 
+    def _fetch_by_ids(
+        self,
+        table_config: TableConfig,
+        ids: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Записи по списку ID одним запросом WHERE id IN (...) на каждые
+        MAX_SQL_PARAMS ID. Возвращает {ID: запись}; отсутствующих ID нет в результате.
+        """
+        id_col = table_config["id_col"]
+        cols = table_config["all_cols"]
+        unique_ids = list(dict.fromkeys(ids))
+        found: Dict[str, Dict[str, Any]] = {}
+        try:
+            conn = self._read_conn()
+            for start in range(0, len(unique_ids), MAX_SQL_PARAMS):
+                chunk = unique_ids[start:start + MAX_SQL_PARAMS]
+                query = (
+                    f"SELECT {', '.join(cols)} "
+                    f"FROM {table_config['table']} "
+                    f"WHERE {id_col} IN ({', '.join('?' * len(chunk))})"
+                )
+                # ID — первый столбец
+                for row in _tuple_cursor(conn).execute(query, chunk):
+                    found[row[0]] = dict(zip(cols, row))
+        except sqlite3.Error as e:
+            self.logger.error(
+                "Ошибка получения %s по списку ID: %s",
+                table_config['entity_name_plural'],
+                e
+            )
+            return {}
+        self.logger.debug("Получено %s %s по списку ID", len(found), table_config['entity_name_plural'])
+        return found
+
     # === ПУБЛИЧНЫЕ МЕТОДЫ (обёртки над параметризованными) ===
     
-    def list_all_analytes_paginated(self, limit: int, offset: int) -> List[Dict[str, Any]]:
+    def list_all_analytes_paginated(
+        self, limit: int, offset: int, rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
         """Получение аналитов с пагинацией."""
-        return self._fetch_paginated(TableConfig.ANALYTES, limit, offset)
+        return self._fetch_paginated(TableConfig.ANALYTES, limit, offset, rows_as_dicts)
 
-    def list_all_bio_recognition_layers_paginated(self, limit: int, offset: int) -> List[Dict[str, Any]]:
+    def list_all_bio_recognition_layers_paginated(
+        self, limit: int, offset: int, rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
         """Получение биослоев с пагинацией."""
-        return self._fetch_paginated(TableConfig.BIO_RECOGNITION, limit, offset)
+        return self._fetch_paginated(TableConfig.BIO_RECOGNITION, limit, offset, rows_as_dicts)
 
-    def list_all_immobilization_layers_paginated(self, limit: int, offset: int) -> List[Dict[str, Any]]:
+    def list_all_immobilization_layers_paginated(
+        self, limit: int, offset: int, rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
         """Получение иммобилизационных слоев с пагинацией."""
-        return self._fetch_paginated(TableConfig.IMMOBILIZATION, limit, offset)
+        return self._fetch_paginated(TableConfig.IMMOBILIZATION, limit, offset, rows_as_dicts)
 
-    def list_all_memristive_layers_paginated(self, limit: int, offset: int) -> List[Dict[str, Any]]:
+    def list_all_memristive_layers_paginated(
+        self, limit: int, offset: int, rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
         """Получение мемристивных слоев с пагинацией."""
-        return self._fetch_paginated(TableConfig.MEMRISTIVE, limit, offset)
+        return self._fetch_paginated(TableConfig.MEMRISTIVE, limit, offset, rows_as_dicts)
 
-    def list_all_sensor_combinations_paginated(self, limit: int, offset: int) -> List[Dict[str, Any]]:
+    def list_all_sensor_combinations_paginated(
+        self, limit: int, offset: int, rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
         """Получение комбинаций сенсоров с пагинацией."""
-        return self._fetch_paginated(TableConfig.SENSOR_COMBINATIONS, limit, offset)
+        return self._fetch_paginated(TableConfig.SENSOR_COMBINATIONS, limit, offset, rows_as_dicts)
+
+    def list_all_analytes_after(
+        self, cursor: Tuple[str, str] | None, limit: int, rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
+        """Страница аналитов после курсора (TA_Name, TA_ID); None — первая страница."""
+        return self._fetch_after(TableConfig.ANALYTES, cursor, limit, rows_as_dicts)
+
+    def list_all_bio_recognition_layers_after(
+        self, cursor: Tuple[str, str] | None, limit: int, rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
+        """Страница биослоев после курсора (BRE_Name, BRE_ID)."""
+        return self._fetch_after(TableConfig.BIO_RECOGNITION, cursor, limit, rows_as_dicts)
+
+    def list_all_immobilization_layers_after(
+        self, cursor: Tuple[str, str] | None, limit: int, rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
+        """Страница иммобилизационных слоев после курсора (IM_Name, IM_ID)."""
+        return self._fetch_after(TableConfig.IMMOBILIZATION, cursor, limit, rows_as_dicts)
+
+    def list_all_memristive_layers_after(
+        self, cursor: Tuple[str, str] | None, limit: int, rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
+        """Страница мемристивных слоев после курсора (MEM_Name, MEM_ID)."""
+        return self._fetch_after(TableConfig.MEMRISTIVE, cursor, limit, rows_as_dicts)
+
+    def list_all_sensor_combinations_after(
+        self, cursor: Tuple[str] | None, limit: int, rows_as_dicts: bool = True
+    ) -> List[Dict[str, Any]] | List[sqlite3.Row]:
+        """Страница комбинаций сенсоров после курсора (Combo_ID,)."""
+        return self._fetch_after(TableConfig.SENSOR_COMBINATIONS, cursor, limit, rows_as_dicts)
+
+    def list_top_sensor_combinations(
+        self, k: int, after: Tuple[float, str] | None = None
+    ) -> List[Dict[str, Any]]:
+        """k комбинаций с наибольшим Score после курсора after = (Score, Combo_ID).
+
+        Порядок — Score DESC, Combo_ID DESC, комбинации без Score (NULL) —
+        в конце; курсор — последняя строка предыдущей порции (Score может
+        быть None). Читается k строк индекса, а не вся таблица.
+        """
+        if after is None:
+            query, params = TOP_SENSOR_COMBINATIONS_SQL, (k,)
+        else:
+            score, combo_id = after
+            score = float("-inf") if score is None else score
+            query, params = TOP_SENSOR_COMBINATIONS_AFTER_SQL, (score, score, combo_id, k)
+        try:
+            cur = _tuple_cursor(self._read_conn()).execute(query, params)
+            return _rows_to_dicts(SENSOR_COMBINATION_LIST_COLUMNS, cur.fetchall())
+        except sqlite3.Error as e:
+            self.logger.error("Ошибка получения лучших комбинаций сенсоров: %s", e)
+            return []
 
     def get_analyte_by_id(self, ta_id: str) -> Dict[str, Any] | None:
         """Получение аналита по ID."""
@@ -577,77 +1339,91 @@ class DatabaseManager(DatabaseAdapter):
         """Получение мемристивного слоя по ID."""
         return self._fetch_by_id(TableConfig.MEMRISTIVE, mem_id)
 
-    def clear_cache(self):
-        """Очистка кэша результатов запросов."""
-        self.list_all_analytes.cache_clear()
-        self.list_all_bio_recognition_layers.cache_clear()
-        self.list_all_immobilization_layers.cache_clear()
-        self.list_all_memristive_layers.cache_clear()
-        self.list_all_sensor_combinations.cache_clear()
-        self.logger.info("Кэш очищен")
-        
-    def analyte_exists(self, field: str, value: Any) -> bool:
-        query = f"""
-        SELECT EXISTS(
-            SELECT 1 FROM {TableConfig.ANALYTES["table"]}
-            WHERE {field} = ?
-        )
+    def get_sensor_combination_by_id(self, combo_id: str) -> Dict[str, Any] | None:
+        """Получение комбинации сенсора по ID."""
+        return self._fetch_by_id(TableConfig.SENSOR_COMBINATIONS, combo_id)
+
+    def get_full_passport(
+        self, ta_id: str, bre_id: str, im_id: str, mem_id: str
+    ) -> Dict[str, Dict[str, Any] | None]:
+        """Четыре слоя паспорта одним снимком БД (одна транзакция чтения).
+
+        Возвращает {'analyte', 'bio', 'immob', 'mem': запись или None}.
         """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (value,))
-                return cursor.fetchone()[0] == 1
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка проверки существования аналита: {e}")
-            return False
+        with self.read_txn():
+            return {
+                'analyte': self._fetch_by_id(TableConfig.ANALYTES, ta_id),
+                'bio': self._fetch_by_id(TableConfig.BIO_RECOGNITION, bre_id),
+                'immob': self._fetch_by_id(TableConfig.IMMOBILIZATION, im_id),
+                'mem': self._fetch_by_id(TableConfig.MEMRISTIVE, mem_id),
+            }
 
-    def bio_recognition_exists(self, field: str, value: Any) -> bool:
-        query = f"""
-        SELECT EXISTS(
-            SELECT 1 FROM {TableConfig.BIO_RECOGNITION["table"]}
-            WHERE {field} = ?
-        )
+    def get_analytes_by_ids(self, ta_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Получение аналитов по списку ID: {TA_ID: запись}."""
+        return self._fetch_by_ids(TableConfig.ANALYTES, ta_ids)
+
+    def get_bio_recognition_layers_by_ids(self, bre_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Получение биораспознающих слоев по списку ID: {BRE_ID: запись}."""
+        return self._fetch_by_ids(TableConfig.BIO_RECOGNITION, bre_ids)
+
+    def get_immobilization_layers_by_ids(self, im_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Получение иммобилизационных слоев по списку ID: {IM_ID: запись}."""
+        return self._fetch_by_ids(TableConfig.IMMOBILIZATION, im_ids)
+
+    def get_memristive_layers_by_ids(self, mem_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Получение мемристивных слоев по списку ID: {MEM_ID: запись}."""
+        return self._fetch_by_ids(TableConfig.MEMRISTIVE, mem_ids)
+
+    def delete_by_id(self, table_config: TableConfig, entity_id: str) -> bool:
+        """Удаление записи по ID через постоянное соединение записи.
+
+        Возвращает False только при ошибке БД (отсутствие записи — не ошибка).
         """
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (value,))
-                return cursor.fetchone()[0] == 1
+            with self._write_txn() as conn:
+                if conn.execute(_delete_sql(table_config), (entity_id,)).rowcount:
+                    self._invalidate(table_config["table"])
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка проверки существования биослоя: {e}")
+            self.logger.error("Ошибка удаления %s %s: %s", table_config['entity_name'], entity_id, e)
             return False
-    def immobilization_exists(self, field: str, value: Any) -> bool:
-        query = f"""
-        SELECT EXISTS(
-            SELECT 1 FROM {TableConfig.IMMOBILIZATION["table"]}
-            WHERE {field} = ?
-        )
+        return True
+
+    def clear_cache(self) -> None:
+        """Полная очистка кэша результатов запросов.
+
+        Записи через менеджер сбрасывают зависящие результаты сами
+        (_invalidate внутри транзакции записи); очистка нужна, только если
+        БД изменили в обход менеджера и ждать TTL нельзя.
         """
+        with self._cache_lock:
+            self._query_cache.clear()
+        self.logger.info("Кэш очищен")
+        
+    def _exists(self, table_config: TableConfig, field: str, value: Any) -> bool:
+        """Проверка наличия записи: SELECT 1 ... LIMIT 1 без чтения значений столбцов."""
+        # имена столбцов в SQLite регистронезависимы (валидатор передаёт 'ta_id')
+        if field.lower() not in {col.lower() for col in table_config["all_cols"]}:
+            self.logger.error("Неизвестное поле %s для %s", field, table_config['entity_name_plural'])
+            return False
+        query = f"SELECT 1 FROM {table_config['table']} WHERE {field} = ? LIMIT 1"
         try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (value,))
-                return cursor.fetchone()[0] == 1
+            conn = self._read_conn()
+            return conn.execute(query, (value,)).fetchone() is not None
         except sqlite3.Error as e:
-            self.logger.error(f"Ошибка проверки существования иммобилизационного слоя: {e}")
+            self.logger.error("Ошибка проверки существования (%s): %s", table_config['entity_name'], e)
             return False
 
+    def analyte_exists(self, field: str, value: Any) -> bool:
+        return self._exists(TableConfig.ANALYTES, field, value)
+
+    def bio_recognition_exists(self, field: str, value: Any) -> bool:
+        return self._exists(TableConfig.BIO_RECOGNITION, field, value)
+
+    def immobilization_exists(self, field: str, value: Any) -> bool:
+        return self._exists(TableConfig.IMMOBILIZATION, field, value)
+
     def memristive_exists(self, field: str, value: Any) -> bool:
-        query = f"""
-        SELECT EXISTS(
-            SELECT 1 FROM {TableConfig.MEMRISTIVE["table"]}
-            WHERE {field} = ?
-        )
-        """
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (value,))
-                return cursor.fetchone()[0] == 1
-        except sqlite3.Error as e:
-            self.logger.error(f"Ошибка проверки существования мемристивного слоя: {e}")
-            return False
+        return self._exists(TableConfig.MEMRISTIVE, field, value)
 
     # DatabaseAdapter methods implementation
     def insert(self, entity_type: str, data: Dict[str, Any]) -> Any:
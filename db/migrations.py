@@ -59,6 +59,12 @@ class MigrationManager:
                 logger.error(f"❌ Ошибка миграции v{i}: {e}")
                 raise
 
+def table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    cursor = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    )
+    return cursor.fetchone() is not None
+
 def column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
     cursor = conn.execute(f"PRAGMA table_info('{table}')")
     return any(row[1] == column for row in cursor.fetchall())
@@ -68,6 +74,9 @@ def migration_v1_add_created_at(db_name: str) -> None:
     conn = sqlite3.connect(db_name)
     cursor = conn.cursor()
     try:
+        # новая БД: таблицу с created_at создаст create_tables
+        if not table_exists(conn, "Analytes"):
+            return
         # если колонка уже есть – ничего не делаем
         if column_exists(conn, "Analytes", "created_at"):
             return
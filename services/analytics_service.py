@@ -1,6 +1,6 @@
 # services/analytics_service.py
 
-from db.manager import DatabaseManager
+from db.manager import DatabaseManager, TableConfig
 from typing import Dict, Any
 from domain.table_config import TABLE_CONFIGS
 
@@ -18,7 +18,8 @@ class AnalyticsService:
             fetch_method = getattr(self.db, config.fetch_method.replace('_paginated', ''), None)
             if fetch_method:
                 try:
-                    data = fetch_method()
+                    # для подсчёта словари не нужны
+                    data = fetch_method(rows_as_dicts=False)
                     stats[key] = {
                         'label': config.label,
                         'count': len(data) if data else 0,
@@ -30,24 +31,15 @@ class AnalyticsService:
     
     def get_best_combinations(self, limit: int = 10) -> list[Dict[str, Any]]:
         """Получить лучшие комбинации по Score."""
-        all_combos = self.db.list_all_sensor_combinations()
-        if not all_combos:
-            return []
-        
-        # Сортировка по Score (по убыванию)
-        sorted_combos = sorted(
-            all_combos,
-            key=lambda x: x.get('Score', 0),
-            reverse=True
-        )
-        
-        return sorted_combos[:limit]
+        # ORDER BY Score DESC LIMIT по индексу вместо сортировки всей таблицы
+        return self.db.list_top_sensor_combinations(limit)
     
     def get_comparative_analysis(self) -> Dict[str, Any]:
         """Получить сравнительный анализ всех компонентов."""
+        # первые 3 записи каждой таблицы — LIMIT 3, без выборки таблиц целиком
         return {
-            'analytes': self.db.list_all_analytes()[:3],
-            'bio_layers': self.db.list_all_bio_recognition_layers()[:3],
-            'immob_layers': self.db.list_all_immobilization_layers()[:3],
-            'mem_layers': self.db.list_all_memristive_layers()[:3],
+            'analytes': self.db.count_and_head(TableConfig.ANALYTES)[1],
+            'bio_layers': self.db.count_and_head(TableConfig.BIO_RECOGNITION)[1],
+            'immob_layers': self.db.count_and_head(TableConfig.IMMOBILIZATION)[1],
+            'mem_layers': self.db.count_and_head(TableConfig.MEMRISTIVE)[1],
         }
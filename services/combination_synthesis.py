@@ -39,7 +39,7 @@ class CombinationSynthesisService:
             )
         
         total_checked = 0
-        successfully_created = 0
+        pending: List[Dict[str, Any]] = []
         
         for analyte in analytes:
             for bio_layer in bio_layers:
@@ -47,34 +47,37 @@ class CombinationSynthesisService:
                     for mem_layer in mem_layers:
                         if total_checked >= max_combinations:
                             logger.info(f"Достигнут лимит {max_combinations} комбинаций")
-                            return total_checked, successfully_created
+                            return total_checked, self.db.bulk_insert_sensor_combinations(pending)
                         
                         total_checked += 1
                         
                         try:
-                            result = self.create_combination(
+                            combination_data = self.build_combination(
                                 analyte, bio_layer, immob_layer, mem_layer
                             )
-                            if result:
-                                successfully_created += 1
+                            if combination_data:
+                                pending.append(combination_data)
                         except Exception as e:
                             logger.error(f"Ошибка при создании комбинации: {e}")
         
+        # Все комбинации записываются одной транзакцией
+        successfully_created = self.db.bulk_insert_sensor_combinations(pending)
+        
         logger.info(f"Синтез завершён: {total_checked} проверено, {successfully_created} создано")
         return total_checked, successfully_created
     
-    def create_combination(
+    def build_combination(
         self,
         analyte: Dict[str, Any],
         bio_layer: Dict[str, Any],
         immob_layer: Dict[str, Any],
         mem_layer: Dict[str, Any],
-    ) -> bool:
+    ) -> Dict[str, Any] | None:
         """
-        Создание комбинации с валидацией и расчётом метрик.
+        Валидация совместимости и расчёт метрик комбинации (без записи в БД).
         
         Returns:
-            True если комбинация создана, False иначе
+            Данные комбинации для БД или None, если слои несовместимы
         """
         # Валидация совместимости
         is_valid, error_msg = CombinationValidator.validate_combination(
@@ -82,7 +85,7 @@ class CombinationSynthesisService:
         )
         if not is_valid:
             logger.debug(f"Комбинация {analyte['TA_ID']}-{bio_layer['BRE_ID']}-{immob_layer['IM_ID']}-{mem_layer['MEM_ID']}: {error_msg}")
-            return False
+            return None
         
         # Расчёт интегральных метрик
         metrics = self._calculate_metrics(analyte, bio_layer, immob_layer, mem_layer)
@@ -112,17 +115,7 @@ class CombinationSynthesisService:
             'created_at': None,
         }
         
-        result = self.db.insert_sensor_combination(combination_data)
-        
-        if result is True:
-            logger.info(f"✅ Комбинация {combo_id} создана (Score: {score:.3f})")
-            return True
-        elif result == "DUPLICATE":
-            logger.debug(f"⚠️ Комбинация {combo_id} уже существует")
-            return False
-        else:
-            logger.error(f"❌ Ошибка при добавлении комбинации {combo_id}")
-            return False
+        return combination_data
     
     @staticmethod
     def _calculate_metrics(
@@ -1,6 +1,6 @@
 # services/passport_service.py
 
-from db.manager import DatabaseManager
+from db.manager import DatabaseManager, TableConfig
 from domain.models import (
     Analyte, BioRecognitionLayer, ImmobilizationLayer, 
     MemristiveLayer, SensorCombination, Passport
@@ -20,8 +20,13 @@ class PassportService:
         immobilization_layer: ImmobilizationLayer,
         memristive_layer: MemristiveLayer,
         combination: Optional[SensorCombination] = None,
+        overwrite: bool = False,
     ) -> Tuple[bool, str]:
-        """Сохранение полного паспорта с валидацией."""
+        """Сохранение полного паспорта с валидацией.
+
+        overwrite=True обновляет существующие записи на месте (UPSERT)
+        вместо возврата DUPLICATE.
+        """
         
         try:
             # Валидация ID
@@ -34,34 +39,35 @@ class PassportService:
             if not memristive_layer.mem_id:
                 return False, "❌ ID мемристора не может быть пустым"
             
-            # Сохранение каждого слоя
+            # Сохранение каждого слоя — одной транзакцией записи (один COMMIT)
             results = []
+            with self.db.transaction():
             
-            # Аналит
-            analyte_dict = self._dataclass_to_db_dict(analyte, 'TA')
-            res = self.db.insert_analyte(analyte_dict)
-            results.append(('Аналит', res, analyte.ta_id))
+                # Аналит
+                analyte_dict = self._dataclass_to_db_dict(analyte, 'TA')
+                res = self.db.insert_analyte(analyte_dict, overwrite=overwrite)
+                results.append(('Аналит', res, analyte.ta_id))
             
-            # Биослой
-            bio_dict = self._dataclass_to_db_dict(bio_layer, 'BRE')
-            res = self.db.insert_bio_recognition_layer(bio_dict)
-            results.append(('Биослой', res, bio_layer.bre_id))
+                # Биослой
+                bio_dict = self._dataclass_to_db_dict(bio_layer, 'BRE')
+                res = self.db.insert_bio_recognition_layer(bio_dict, overwrite=overwrite)
+                results.append(('Биослой', res, bio_layer.bre_id))
             
-            # Иммобилизация
-            immob_dict = self._dataclass_to_db_dict(immobilization_layer, 'IM')
-            res = self.db.insert_immobilization_layer(immob_dict)
-            results.append(('Иммобилизация', res, immobilization_layer.im_id))
+                # Иммобилизация
+                immob_dict = self._dataclass_to_db_dict(immobilization_layer, 'IM')
+                res = self.db.insert_immobilization_layer(immob_dict, overwrite=overwrite)
+                results.append(('Иммобилизация', res, immobilization_layer.im_id))
             
-            # Мемристор
-            mem_dict = self._dataclass_to_db_dict(memristive_layer, 'MEM')
-            res = self.db.insert_memristive_layer(mem_dict)
-            results.append(('Мемристор', res, memristive_layer.mem_id))
+                # Мемристор
+                mem_dict = self._dataclass_to_db_dict(memristive_layer, 'MEM')
+                res = self.db.insert_memristive_layer(mem_dict, overwrite=overwrite)
+                results.append(('Мемристор', res, memristive_layer.mem_id))
             
-            # Комбинация (если передана)
-            if combination:
-                combo_dict = self._dataclass_to_db_dict(combination, 'Combo')
-                res = self.db.insert_sensor_combination(combo_dict)
-                results.append(('Комбинация', res, combination.combo_id))
+                # Комбинация (если передана)
+                if combination:
+                    combo_dict = self._dataclass_to_db_dict(combination, 'Combo')
+                    res = self.db.insert_sensor_combination(combo_dict, overwrite=overwrite)
+                    results.append(('Комбинация', res, combination.combo_id))
             
             # Проверка результатов
             duplicates = []
@@ -86,36 +92,16 @@ class PassportService:
     
     def overwrite_entity(self, entity_type: str, entity_id: str) -> bool:
         """Перезаписать существующую сущность."""
-        from db.manager import get_connection
-        import sqlite3
-        
         table_map = {
-            'analyte': 'Analytes',
-            'bio': 'BioRecognitionLayers',
-            'immob': 'ImmobilizationLayers',
-            'mem': 'MemristiveLayers',
-            'combo': 'SensorCombinations',
-        }
-        
-        id_map = {
-            'analyte': 'TA_ID',
-            'bio': 'BRE_ID',
-            'immob': 'IM_ID',
-            'mem': 'MEM_ID',
-            'combo': 'Combo_ID',
+            'analyte': TableConfig.ANALYTES,
+            'bio': TableConfig.BIO_RECOGNITION,
+            'immob': TableConfig.IMMOBILIZATION,
+            'mem': TableConfig.MEMRISTIVE,
+            'combo': TableConfig.SENSOR_COMBINATIONS,
         }
-        
-        try:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    f"DELETE FROM {table_map[entity_type]} WHERE {id_map[entity_type]} = ?",
-                    (entity_id,)
-                )
-                conn.commit()
-            return True
-        except sqlite3.Error:
-            return False
+        # DELETE выполняется на постоянном соединении менеджера: подготовленное
+        # выражение берётся из его кэша, а кэш запросов сбрасывается там же
+        return self.db.delete_by_id(table_map[entity_type], entity_id)
     
     @staticmethod
     def _dataclass_to_db_dict(obj, prefix: str) -> dict:
@@ -0,0 +1,350 @@
+# tests/test_db_manager.py
+
+import sqlite3
+
+import pytest
+from db.manager import DatabaseManager, TableConfig
+
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseManager(str(tmp_path / "test.db"))
+
+
+def test_insert_duplicate_returns_sentinel(db):
+    data = {"TA_ID": "TA001", "TA_Name": "Glucose", "PH_Min": 5.0, "PH_Max": 8.0}
+    assert db.insert_analyte(data) is True
+    assert db.insert_analyte(data) == "DUPLICATE"
+
+
+def test_bulk_insert_skips_existing_ids(db):
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+    rows = [
+        {"TA_ID": "TA001", "TA_Name": "Glucose"},
+        {"TA_ID": "TA002", "TA_Name": "Lactate"},
+        {"TA_ID": "TA003", "TA_Name": "Urea"},
+    ]
+    assert db.bulk_insert_analytes(rows) == 2
+    assert [a["TA_ID"] for a in db.list_all_analytes()] == ["TA001", "TA002", "TA003"]
+
+
+def test_insert_invalidates_cached_list(db):
+    assert db.list_all_analytes() == []
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+    assert [a["TA_ID"] for a in db.list_all_analytes()] == ["TA001"]
+
+
+def test_keyset_pagination_walks_all_rows(db):
+    db.bulk_insert_analytes([
+        {"TA_ID": f"TA{i:03d}", "TA_Name": "Same" if i % 2 else f"Name{i}"}
+        for i in range(7)
+    ])
+    seen, cursor = [], None
+    while True:
+        page = db.list_all_analytes_after(cursor, 3)
+        if not page:
+            break
+        seen.extend(row["TA_ID"] for row in page)
+        cursor = db.page_cursor(TableConfig.ANALYTES, page)
+    assert sorted(seen) == [f"TA{i:03d}" for i in range(7)]
+    assert len(seen) == len(set(seen))
+
+
+def test_list_all_can_return_rows(db):
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose", "PH_Min": 5.0})
+    (row,) = db.list_all_analytes(rows_as_dicts=False)
+    assert row["TA_Name"] == "Glucose"
+    assert dict(row)["PH_Min"] == 5.0
+
+
+def test_overwrite_updates_existing_row(db):
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose", "PH_Min": 5.0})
+    assert db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Lactate"}, overwrite=True) is True
+    analyte = db.get_analyte_by_id("TA001")
+    assert analyte["TA_Name"] == "Lactate"
+    assert analyte["PH_Min"] is None
+
+
+def test_expired_cache_revalidates_against_external_writes(db, monkeypatch):
+    import db.manager as manager
+
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+    assert len(db.list_all_analytes()) == 1
+
+    clock = [manager.time.monotonic()]
+    monkeypatch.setattr(manager.time, "monotonic", lambda: clock[0])
+    statements = []
+    db._read_conn().set_trace_callback(statements.append)
+
+    # TTL истёк, данные не менялись: запрос к таблице не повторяется
+    clock[0] += manager.QUERY_CACHE_TTL + 1
+    assert len(db.list_all_analytes()) == 1
+    assert statements == []
+
+    # запись в обход менеджера видна после истечения TTL
+    with sqlite3.connect(db.db_name) as other:
+        other.execute("INSERT INTO Analytes (TA_ID, TA_Name) VALUES ('TA002', 'Lactate')")
+    clock[0] += manager.QUERY_CACHE_TTL + 1
+    assert len(db.list_all_analytes()) == 2
+
+
+def test_clear_cache(db):
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+    assert len(db.list_all_analytes()) == 1
+    with sqlite3.connect(db.db_name) as other:
+        other.execute("DELETE FROM Analytes")
+    assert len(db.list_all_analytes()) == 1  # в пределах TTL — из кэша
+
+    db.clear_cache()
+    assert db.list_all_analytes() == []
+
+
+def test_get_by_ids_returns_found_records(db, monkeypatch):
+    import db.manager as manager
+
+    monkeypatch.setattr(manager, "MAX_SQL_PARAMS", 2)  # несколько порций IN (...)
+    db.bulk_insert_analytes([
+        {"TA_ID": f"TA{i:03d}", "TA_Name": f"Name{i}", "HL": i} for i in range(5)
+    ])
+    found = db.get_analytes_by_ids(["TA004", "TA000", "TA000", "TA999", "TA002"])
+    assert sorted(found) == ["TA000", "TA002", "TA004"]
+    assert found["TA004"]["HL"] == 4
+
+
+def test_connections_use_pragma_preset(db):
+    for conn in (db.conn, db._read_conn()):
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+
+def test_reader_connection_is_closed_when_thread_exits(db):
+    import gc
+    import threading
+
+    readers = []
+
+    def read():
+        readers.append(db._read_conn())
+        db.list_all_analytes_after(None, 10)
+
+    for _ in range(20):
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+    gc.collect()
+    assert len(db._readers) == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        readers[0].execute("SELECT 1")
+
+
+def test_concurrent_writes_bump_table_version_once_each(db):
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: db.insert_analyte({"TA_ID": f"TA{i:03d}", "TA_Name": "X"}), range(50)))
+    assert db._table_versions["Analytes"] == 50
+
+
+def test_get_by_id_is_cached_until_write(db):
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+    first = db.get_analyte_by_id("TA001")
+    first["TA_Name"] = "changed by caller"
+    assert db.get_analyte_by_id("TA001")["TA_Name"] == "Glucose"
+
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Lactate"}, overwrite=True)
+    assert db.get_analyte_by_id("TA001")["TA_Name"] == "Lactate"
+
+
+def test_keyset_page_as_rows(db):
+    db.bulk_insert_analytes([{"TA_ID": f"TA{i}", "TA_Name": f"N{i}"} for i in range(3)])
+    page = db.list_all_analytes_after(None, 2, rows_as_dicts=False)
+    assert [row["TA_ID"] for row in page] == ["TA0", "TA1"]
+    cursor = db.page_cursor(TableConfig.ANALYTES, page)
+    assert cursor == ("N1", "TA1")
+    assert [row["TA_ID"] for row in db.list_all_analytes_after(cursor, 2)] == ["TA2"]
+
+
+def test_prefetch_reads_in_background(db):
+    db.bulk_insert_analytes([{"TA_ID": f"TA{i}", "TA_Name": f"N{i}"} for i in range(3)])
+    future = db.prefetch("list_all_analytes_after", ("N0", "TA0"), 2)
+    assert [row["TA_ID"] for row in future.result(timeout=5)] == ["TA1", "TA2"]
+
+
+def test_delete_by_id_invalidates_cache(db):
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+    assert db.get_analyte_by_id("TA001") is not None
+    assert db.delete_by_id(TableConfig.ANALYTES, "TA001")
+    assert db.get_analyte_by_id("TA001") is None
+
+
+def test_large_bulk_insert_rebuilds_indexes(db, monkeypatch):
+    import db.manager as manager
+
+    monkeypatch.setattr(manager, "BULK_INDEX_REBUILD_THRESHOLD", 2)
+    indexes_before = db._secondary_indexes(db.conn, "Analytes")
+    assert indexes_before
+    assert db.bulk_insert_analytes([{"TA_ID": f"TA{i}", "TA_Name": f"N{i}"} for i in range(3)]) == 3
+    assert db._secondary_indexes(db.conn, "Analytes") == indexes_before
+    assert db.conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+
+
+def test_transaction_commits_or_rolls_back_all_writes(db):
+    with db.transaction():
+        db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+        db.insert_analyte({"TA_ID": "TA002", "TA_Name": "Lactate"})
+    assert [a["TA_ID"] for a in db.list_all_analytes()] == ["TA001", "TA002"]
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.insert_analyte({"TA_ID": "TA003", "TA_Name": "Urea"})
+            raise RuntimeError
+    assert [a["TA_ID"] for a in db.list_all_analytes()] == ["TA001", "TA002"]
+
+
+def test_cache_version_changes_after_write(db):
+    before = db.cache_version()
+    assert db.cache_version() == before
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+    assert db.cache_version() != before
+
+
+def test_get_full_passport(db):
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+    db.insert_memristive_layer({"MEM_ID": "MEM001", "MEM_Name": "TiO2"})
+    passport = db.get_full_passport("TA001", "BRE404", "IM404", "MEM001")
+    assert passport["analyte"]["TA_Name"] == "Glucose"
+    assert passport["bio"] is None and passport["immob"] is None
+    assert passport["mem"]["MEM_Name"] == "TiO2"
+
+
+def test_read_txn_sees_own_writes(db):
+    with db.read_txn():
+        assert db.list_all_analytes_after(None, 10) == []
+        assert db._read_conn().in_transaction
+        db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+        assert [r["TA_ID"] for r in db.list_all_analytes_after(None, 10)] == ["TA001"]
+    assert not db._read_conn().in_transaction
+
+
+def test_read_txn_does_not_cache_old_snapshot_under_new_version(db):
+    import threading
+
+    db.bulk_insert_analytes([{"TA_ID": "TA1", "TA_Name": "A"}, {"TA_ID": "TA2", "TA_Name": "B"}])
+    snapshot_taken = threading.Event()
+    written = threading.Event()
+    seen = {}
+
+    def render():
+        with db.read_txn():
+            db.count_rows(TableConfig.ANALYTES)
+            snapshot_taken.set()
+            written.wait(5)
+            seen["version"] = db.cache_version()
+            seen["ids"] = [r["TA_ID"] for r in db.list_all_analytes()]
+
+    reader = threading.Thread(target=render)
+    reader.start()
+    snapshot_taken.wait(5)
+    db.insert_analyte({"TA_ID": "TA3", "TA_Name": "C"})
+    written.set()
+    reader.join()
+
+    assert seen["ids"] == ["TA1", "TA2"]  # снимок транзакции чтения
+    assert seen["version"] != db.cache_version()
+    assert [r["TA_ID"] for r in db.list_all_analytes()] == ["TA1", "TA2", "TA3"]
+
+
+def test_combination_pages_seek_covering_index(db):
+    import db.manager as manager
+
+    query = manager._after_sql(TableConfig.SENSOR_COMBINATIONS, True)
+    plan = " ".join(
+        row[3] for row in db.conn.execute(f"EXPLAIN QUERY PLAN {query}", ("C1", 10))
+    )
+    assert "USING COVERING INDEX idx_sensor_combinations_list (Combo_ID>?)" in plan
+
+
+def test_get_sensor_combination_by_id(db):
+    db.insert_analyte({"TA_ID": "TA1", "TA_Name": "Glucose"})
+    db.insert_bio_recognition_layer({"BRE_ID": "BRE1", "BRE_Name": "GOx"})
+    db.insert_immobilization_layer({"IM_ID": "IM1", "IM_Name": "Chitosan"})
+    db.insert_memristive_layer({"MEM_ID": "MEM1", "MEM_Name": "TiO2"})
+    assert db.insert_sensor_combination({
+        "Combo_ID": "C1", "TA_ID": "TA1", "BRE_ID": "BRE1",
+        "IM_ID": "IM1", "MEM_ID": "MEM1", "Score": 0.5,
+    }) is True
+    assert db.get_sensor_combination_by_id("C1")["Score"] == 0.5
+    assert db.get_sensor_combination_by_id("C2") is None
+
+
+def test_list_top_sensor_combinations_keyset(db):
+    db.insert_analyte({"TA_ID": "TA1", "TA_Name": "Glucose"})
+    db.insert_bio_recognition_layer({"BRE_ID": "BRE1", "BRE_Name": "GOx"})
+    db.insert_immobilization_layer({"IM_ID": "IM1", "IM_Name": "Chitosan"})
+    db.insert_memristive_layer({"MEM_ID": "MEM1", "MEM_Name": "TiO2"})
+    for combo_id, score in [("C1", 0.5), ("C2", 0.9), ("C3", 0.5), ("C4", 0.1)]:
+        db.insert_sensor_combination({
+            "Combo_ID": combo_id, "TA_ID": "TA1", "BRE_ID": "BRE1",
+            "IM_ID": "IM1", "MEM_ID": "MEM1", "Score": score,
+        })
+    first = db.list_top_sensor_combinations(2)
+    assert [row["Combo_ID"] for row in first] == ["C2", "C3"]
+    rest = db.list_top_sensor_combinations(2, after=(first[-1]["Score"], first[-1]["Combo_ID"]))
+    assert [row["Combo_ID"] for row in rest] == ["C1", "C4"]
+
+
+def test_list_top_sensor_combinations_reaches_null_scores(db):
+    db.insert_analyte({"TA_ID": "TA1", "TA_Name": "Glucose"})
+    db.insert_bio_recognition_layer({"BRE_ID": "BRE1", "BRE_Name": "GOx"})
+    db.insert_immobilization_layer({"IM_ID": "IM1", "IM_Name": "Chitosan"})
+    db.insert_memristive_layer({"MEM_ID": "MEM1", "MEM_Name": "TiO2"})
+    for combo_id, score in [("C1", None), ("C2", 0.9), ("C3", None), ("C4", 0.1)]:
+        db.insert_sensor_combination({
+            "Combo_ID": combo_id, "TA_ID": "TA1", "BRE_ID": "BRE1",
+            "IM_ID": "IM1", "MEM_ID": "MEM1", "Score": score,
+        })
+    seen, after = [], None
+    while batch := db.list_top_sensor_combinations(1, after):
+        seen.append(batch[0]["Combo_ID"])
+        after = (batch[0]["Score"], batch[0]["Combo_ID"])
+    assert seen == ["C2", "C4", "C3", "C1"]
+
+
+def test_count_rows_is_invalidated_by_insert(db):
+    assert db.count_rows(TableConfig.ANALYTES) == 0
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+    assert db.count_rows(TableConfig.ANALYTES) == 1
+
+
+def test_count_all_rows_single_query(db):
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+    db.insert_analyte({"TA_ID": "TA002", "TA_Name": "Lactate"})
+    counts = db.count_all_rows()
+    assert counts["Analytes"] == 2
+    assert counts["SensorCombinations"] == 0
+    assert set(counts) == {table_config["table"] for table_config in TableConfig}
+
+
+def test_count_and_head_limits_rows(db):
+    for i, name in enumerate(["Urea", "Glucose", "Lactate", "Cortisol"]):
+        db.insert_analyte({"TA_ID": f"TA{i}", "TA_Name": name})
+    count, head = db.count_and_head(TableConfig.ANALYTES, k=3)
+    assert count == 4
+    assert [row["TA_Name"] for row in head] == ["Cortisol", "Glucose", "Lactate"]
+
+
+def test_iter_row_batches_yields_tuples_in_batches(db):
+    for i in range(5):
+        db.insert_analyte({"TA_ID": f"TA{i}", "TA_Name": f"Name{i}"})
+    batches = list(db.iter_row_batches(TableConfig.ANALYTES, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[0][0][:2] == ("TA0", "Name0")
+
+
+def test_submit_read_runs_in_pool_thread(db):
+    db.insert_analyte({"TA_ID": "TA001", "TA_Name": "Glucose"})
+    future = db.submit_read(lambda: [len(batch) for batch in db.iter_row_batches(TableConfig.ANALYTES)])
+    assert future.result(timeout=5) == [1]
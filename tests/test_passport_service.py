@@ -61,3 +61,18 @@ def test_duplicate_detection():
     ok, result = service.save_passport(analyte, bio, immob, mem)
     assert ok == False
     assert result[0] == "DUPLICATE"
+
+def test_overwrite_updates_duplicates_in_place(tmp_path):
+    db = DatabaseManager(str(tmp_path / "test.db"))
+    service = PassportService(db)
+    
+    analyte = Analyte(ta_id="TA_OW", ta_name="Before")
+    bio = BioRecognitionLayer(bre_id="BRE_OW", bre_name="Before")
+    immob = ImmobilizationLayer(im_id="IM_OW", im_name="Before")
+    mem = MemristiveLayer(mem_id="MEM_OW", mem_name="Before")
+    service.save_passport(analyte, bio, immob, mem)
+    
+    analyte.ta_name = "After"
+    ok, _ = service.save_passport(analyte, bio, immob, mem, overwrite=True)
+    assert ok == True
+    assert db.get_analyte_by_id("TA_OW")["TA_Name"] == "After"
@@ -1,6 +1,7 @@
 # ui/analysis_page.py
 
 import streamlit as st
+import pandas as pd
 from services.combination_synthesis import CombinationSynthesisService
 from db.manager import DatabaseManager
 
@@ -37,7 +38,6 @@ def show_best_combinations(db: DatabaseManager):
     
     top_n = st.slider("Показать топ N комбинаций", 1, min(50, len(sorted_combos)), 10)
     
-    import pandas as pd
     df = pd.DataFrame(sorted_combos[:top_n])
     st.dataframe(df, use_container_width=True)
     
@@ -56,7 +56,6 @@ def show_statistics(db: DatabaseManager):
         st.info("Нет комбинаций для анализа")
         return
     
-    import pandas as pd
     df = pd.DataFrame(combos)
     
     col1, col2, col3 = st.columns(3)
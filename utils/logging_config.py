@@ -1,6 +1,9 @@
 # utils/logging_config.py
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 
@@ -12,6 +15,11 @@ def setup_logging(log_file: str = "biosensor.log", level: int = logging.INFO):
         log_file: путь к файлу лога
         level: уровень логирования
     """
+    # Streamlit вызывает main() при каждом перезапуске скрипта: обработчики
+    # и поток слушателя создаются только один раз (как и в basicConfig)
+    if logging.getLogger().handlers:
+        return
+    
     # Создаём директорию для логов, если её нет
     log_path = Path(log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
@@ -20,22 +28,36 @@ def setup_logging(log_file: str = "biosensor.log", level: int = logging.INFO):
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     date_format = '%Y-%m-%d %H:%M:%S'
     
-    # Настройка корневого логгера
-    logging.basicConfig(
-        level=level,
-        format=log_format,
-        datefmt=date_format,
-        handlers=[
-            # Вывод в файл
-            logging.FileHandler(log_file, encoding='utf-8'),
-            # Вывод в консоль
-            logging.StreamHandler(sys.stdout)
-        ]
+    formatter = logging.Formatter(log_format, datefmt=date_format)
+    handlers = [
+        # Вывод в файл
+        logging.FileHandler(log_file, encoding='utf-8'),
+        # Вывод в консоль
+        logging.StreamHandler(sys.stdout)
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    # Вызывающий поток только кладёт запись в очередь; запись в файл и
+    # консоль выполняет фоновый поток QueueListener
+    log_queue: queue.Queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
     )
+    listener.start()
+    atexit.register(listener.stop)
+    
+    # QueueHandler подставляет аргументы в сообщение; итоговый формат
+    # применяют обработчики слушателя
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    # Настройка корневого логгера
+    logging.basicConfig(level=level, handlers=[queue_handler])
     
     # Снижаем уровень для сторонних библиотек
     logging.getLogger('urllib3').setLevel(logging.WARNING)
     logging.getLogger('PIL').setLevel(logging.WARNING)
     
     logger = logging.getLogger(__name__)
-    logger.info(f"Логирование инициализировано: {log_file}")
+    logger.info("Логирование инициализировано: %s", log_file)